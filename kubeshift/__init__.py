@@ -2,6 +2,7 @@
 import logging
 
 from kubeshift.config import Config  # noqa
+from kubeshift.informer import Informer  # noqa
 from kubeshift.kubernetes import KubernetesClient  # noqa
 from kubeshift.openshift import OpenshiftClient  # noqa
 
@@ -0,0 +1,499 @@
+"""asyncio clients for Kubernetes and Openshift.
+
+Requires Python 3.6+ and `aiohttp`. The clients share configuration, API
+discovery (performed with the synchronous session when the client is
+constructed), URL generation and validation with the synchronous clients
+while every operation is a coroutine.
+
+.. code-block:: python
+
+    async with AsyncKubernetesClient(config) as client:
+        await client.create(obj)
+        async for pod in client.pods().iter_items():
+            print(pod['metadata']['name'])
+"""
+import asyncio
+import json
+import logging
+import ssl
+import time
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from kubeshift.base import _ClientBase, _status_reason
+from kubeshift.constants import (ACCEPT_TABLE,
+                                 DEFAULT_NAMESPACE,
+                                 DEFAULT_PAGE_SIZE,
+                                 LOGGER_DEFAULT,
+                                 WATCH_ADDED)
+from kubeshift.exceptions import KubeConnectionError, KubeRequestError, KubeShiftError
+from kubeshift.openshift import ShiftDiscoveryMixin, template
+from kubeshift.queries import utils
+from kubeshift.queries.base import _list_headers, _table, LazyQuery, Query, Table, WatchEvent
+from kubeshift.queries.kube_query import KubeQueryMixin
+from kubeshift.queries.shift_query import ShiftQueryMixin
+from kubeshift import validator
+
+logger = logging.getLogger(LOGGER_DEFAULT)
+
+
+class AsyncLazyQuery(LazyQuery):
+    """Compose a query sent to the server as a single request.
+
+    See :py:class:`~kubeshift.queries.base.LazyQuery`; the results are
+    fetched by awaiting the views or iterating the query (`async for`).
+    """
+
+    __iter__ = __len__ = None
+
+    async def __aiter__(self):
+        for item in await self.items():
+            yield item
+
+    async def fetch(self):
+        """Fetch the list once and return it."""
+        if self._snapshot is None:
+            url = self.url
+            headers = _list_headers(self.metadata_only)
+            self._snapshot = (await self.query.client.arequest('get', url, headers=headers) or {}) if url else {}
+        return self._snapshot
+
+    async def items(self):
+        """Select the (projected) resources."""
+        return self._items(await self.fetch())
+
+    async def metadata(self):
+        """Select the metadata of the resources."""
+        return [item.get('metadata', {}) for item in (await self.fetch()).get('items', [])]
+
+    async def filter(self, status=None):
+        """Select the (projected) resources by `status.phase`."""
+        if not status:
+            return []
+        return self._items(await self._with_status().fetch(), status)
+
+
+class AsyncQuery(Query):
+    """Performs queries with filters as coroutines.
+
+    Iterating the query (`async for`) walks the items page by page.
+    """
+
+    def __aiter__(self):
+        """Iterate over the items of the query results page by page."""
+        return self.iter_items()
+
+    def _lazy(self):
+        return AsyncLazyQuery(self, {})
+
+    async def all(self, fields=None):
+        """Perform query with no filters (all results)."""
+        params = self._list_params(None, None, fields)
+        if params is None:
+            return {}
+        return await self.client.arequest('get', utils.add_params(self.url, params)) or {}
+
+    def pages(self, page_size=DEFAULT_PAGE_SIZE, selectors=None, fields=None, metadata_only=False):
+        """Perform query one page at a time using `limit` and `continue`.
+
+        See :py:meth:`~kubeshift.queries.base.Query.pages`.
+        """
+        return self._fetch_pages(self._list_params(page_size, selectors, fields), _list_headers(metadata_only))
+
+    async def _fetch_pages(self, params, headers):
+        while params is not None:
+            data = await self.client.arequest('get', utils.add_params(self.url, params), headers=headers) or {}
+            yield data
+            params = self._next_page(params, data)
+
+    async def iter_items(self, page_size=DEFAULT_PAGE_SIZE, selectors=None, fields=None, metadata_only=False):
+        """Iterate over the items of the query results page by page.
+
+        See :py:meth:`~kubeshift.queries.base.Query.iter_items`.
+        """
+        async for page in self.pages(page_size, selectors, fields, metadata_only):
+            for item in page.get('items', []):
+                yield item
+
+    async def items(self, page_size=None, fields=None):
+        """Select the list of items from the query results."""
+        return [item async for item in self.iter_items(page_size, fields=fields)]
+
+    async def metadata(self, page_size=None, fields=None):
+        """Filter the results to provide only the metadata only."""
+        return [s.get('metadata', {}) async for s in self.iter_items(page_size, fields=fields, metadata_only=True)]
+
+    async def iter_table(self, page_size=DEFAULT_PAGE_SIZE, selectors=None, fields=None):
+        """Render the query results as tables one page at a time.
+
+        See :py:meth:`~kubeshift.queries.base.Query.iter_table`.
+        """
+        columns = None
+        params = self._list_params(page_size, selectors, fields)
+        async for page in self._fetch_pages(params, {'Accept': ACCEPT_TABLE}):
+            table = _table(page, columns)
+            columns = table.columns
+            yield table
+
+    async def table(self, page_size=None, selectors=None, fields=None):
+        """Render the query results as a single table.
+
+        See :py:meth:`~kubeshift.queries.base.Query.table`.
+        """
+        columns, rows = [], []
+        async for table in self.iter_table(page_size, selectors, fields):
+            columns = table.columns
+            rows.extend(table.rows)
+        return Table(columns, rows)
+
+    async def filter(self, status=None, page_size=None, fields=None):
+        """Filter by status and / or fields.
+
+        See :py:meth:`~kubeshift.queries.base.Query.filter`.
+        """
+        if not status:
+            return await self.items(page_size, fields) if fields is not None else []
+
+        phase_fields = self._phase_fields(status, fields)
+        if phase_fields is None:
+            return []
+        try:
+            return [s async for s in self.iter_items(page_size, fields=phase_fields)]
+        except KubeRequestError as ex:
+            if ex.status_code != 400:
+                raise
+            logger.debug('Field selector status.phase rejected by %s; filtering locally', self.url)
+
+        return [s async for s in self.iter_items(page_size, fields=fields)
+                if s.get('status', {}).get('phase') == status]
+
+    async def by_name(self, name):
+        """Fetch resource by name."""
+        if not name:
+            return {}
+        return await self.client.arequest('get', self.url + '/' + name)
+
+    async def delete_all(self, selectors=None, propagation_policy=None):
+        """Delete the resources of the collection with a single request.
+
+        See :py:meth:`~kubeshift.queries.base.Query.delete_all`.
+        """
+        params = self._list_params(None, selectors)
+        if params is None:
+            return {}
+        return await self.client.arequest('delete', utils.add_params(self.url, params),
+                                          data=utils.delete_options(propagation_policy)) or {}
+
+    async def by_selector(self, selectors, page_size=None):
+        """Query resource by labelSelector.
+
+        See :py:meth:`~kubeshift.queries.base.Query.by_selector`.
+        """
+        return [item async for item in self.iter_items(page_size, selectors or [])]
+
+    async def watch(self, resource_version=None, timeout=None, relist=True):
+        """Watch the resources for changes.
+
+        See :py:meth:`~kubeshift.queries.base.Query.watch`.
+        """
+        deadline = time.time() + timeout if timeout else None
+        relisted = False
+        failed = False
+
+        while True:
+            params = self._watch_params(resource_version, deadline)
+            if params is None:
+                return
+
+            received = False
+            try:
+                async for event in self.client.astream('get', utils.add_params(self.url, params)):
+                    event = self._watch_event(event)
+                    received = True
+                    relisted = False
+                    resource_version = event.object.get('metadata', {}).get('resourceVersion', resource_version)
+                    yield event
+
+            except KubeConnectionError:
+                if failed and not received:
+                    raise
+                failed = not received
+                logger.debug('Watch on %s dropped; resuming from %s', self.url, resource_version)
+                continue
+
+            except KubeRequestError as ex:
+                if ex.status_code != 410 or relisted or not relist:
+                    raise
+                relisted = True
+                logger.debug('Watch on %s expired at %s; relisting', self.url, resource_version)
+                resource_version = None
+                async for page in self.pages():
+                    resource_version = resource_version or page.get('metadata', {}).get('resourceVersion')
+                    for item in page.get('items', []):
+                        yield WatchEvent(WATCH_ADDED, item)
+
+            failed = False
+
+
+class AsyncKubeBase(_ClientBase, KubeQueryMixin):
+    """Provide common asyncio base for each provider.
+
+    Requests are sent through an `aiohttp` session using the credentials,
+    transport settings, retry policy and rate limiter of the client.
+    """
+
+    query_class = AsyncQuery
+
+    def __init__(self, config, discovery_cache=None, lazy=False, **kwargs):
+        """Constructor; see :py:class:`~kubeshift.base.KubeBase`.
+
+        Discovery is performed with blocking requests so it can not be
+        lazy: it would stall the event loop on first use of each API version.
+
+        :raises kubeshift.exceptions.KubeShiftError: if aiohttp is not installed or lazy is set
+        """
+        if aiohttp is None:
+            raise KubeShiftError('aiohttp is required by the asyncio clients')
+        if lazy:
+            raise KubeShiftError('Lazy discovery is not supported by the asyncio clients')
+        super(AsyncKubeBase, self).__init__(config, discovery_cache, **kwargs)
+        self._aio_session = None
+
+    async def __aenter__(self):
+        """Enter the async context manager."""
+        return self
+
+    async def __aexit__(self, *exc):
+        """Close the session on exit of the async context manager."""
+        await self.close()
+
+    async def close(self):
+        """Close the underlying aiohttp session."""
+        if self._aio_session is not None:
+            await self._aio_session.close()
+            self._aio_session = None
+
+    def _ssl_context(self):
+        verify = self.session.verify
+        if not verify:
+            return False
+
+        ctx = ssl.create_default_context(cafile=verify if isinstance(verify, str) else None)
+        if self.session.cert:
+            ctx.load_cert_chain(*self.session.cert)
+        return ctx
+
+    def _aio(self):
+        """Return the aiohttp session; created on first use inside the event loop."""
+        if self._aio_session is None:
+            transport = self.transport
+            connector = aiohttp.TCPConnector(ssl=self._ssl_context(),
+                                             limit=transport.pool_connections * transport.pool_maxsize,
+                                             limit_per_host=transport.pool_maxsize,
+                                             force_close=not transport.keep_alive)
+            self._aio_session = aiohttp.ClientSession(connector=connector,
+                                                      headers=dict(self.session.headers))
+        return self._aio_session
+
+    def _aio_timeout(self, read_timeout):
+        return aiohttp.ClientTimeout(total=None,
+                                     sock_connect=self.transport.connect_timeout,
+                                     sock_read=read_timeout)
+
+    async def arequest(self, method, url, data=None, headers=None):
+        """
+        Complete the request to the API and fails if the status_code is != 200/201.
+
+        See :py:meth:`~kubeshift.base._ClientBase.request`.
+        """
+        retry = self.transport.retry
+        limiter = self.transport.rate_limiter
+        timeout = self._aio_timeout(self.transport.read_timeout)
+        attempt = 0
+
+        logger.debug("Request: {0}".format(self._to_curl(method, url, headers)))
+        logger.debug("Request body: {0}".format(data))
+        while True:
+            if limiter:
+                await asyncio.sleep(limiter.reserve(method))
+            try:
+                async with self._aio().request(method, url, json=data, headers=headers, timeout=timeout) as res:
+                    if retry and retry.is_retryable(method, attempt, res.status):
+                        reason = res.status
+                        delay = retry.backoff(attempt, res.status, res.headers.get('Retry-After'))
+                    else:
+                        text = await res.text()
+                        if res.status not in (200, 201, 202):
+                            raise KubeRequestError('Unable to complete request: Status: %s, Error: %s'
+                                                   % (res.status, res.reason), res.status, _status_reason(text))
+                        return json.loads(text) if text else None
+            except aiohttp.ClientSSLError:
+                raise KubeConnectionError('SSL/TLS ERROR: invalid certificate')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retry or not retry.is_retryable(method, attempt):
+                    raise KubeConnectionError('Refused connection to %s' % url)
+                reason = 'connection'
+                delay = retry.backoff(attempt)
+
+            retry.increment(reason)
+            attempt += 1
+            logger.debug('Retry %d of %s %s (%s) in %.2fs', attempt, method.upper(), url, reason, delay)
+            await asyncio.sleep(delay)
+
+    async def astream(self, method, url, headers=None, timeout=None):
+        """
+        Complete a streaming request to the API yielding each line delimited JSON object.
+
+        See :py:meth:`~kubeshift.base._ClientBase.stream`.
+        """
+        logger.debug("Stream request: {0}".format(self._to_curl(method, url, headers)))
+        if self.transport.rate_limiter:
+            await asyncio.sleep(self.transport.rate_limiter.reserve(method))
+        try:
+            async with self._aio().request(method, url, headers=headers, timeout=self._aio_timeout(timeout)) as res:
+                if res.status != 200:
+                    raise KubeRequestError('Unable to complete request: Status: %s, Error: %s'
+                                           % (res.status, res.reason), res.status)
+                buf = b''
+                async for chunk in res.content.iter_any():
+                    buf += chunk
+                    lines = buf.split(b'\n')
+                    buf = lines.pop()
+                    for line in lines:
+                        if line.strip():
+                            yield json.loads(line.decode('utf-8'))
+                if buf.strip():
+                    yield json.loads(buf.decode('utf-8'))
+        except aiohttp.ClientSSLError:
+            raise KubeConnectionError('SSL/TLS ERROR: invalid certificate')
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+            raise KubeConnectionError('Connection dropped while streaming from %s' % url)
+
+    async def _by_file(self, filepath, func):
+        results = []
+        for res in self._load_file(filepath):
+            results.append(await func(res))
+
+        return results
+
+    async def create(self, obj, namespace=DEFAULT_NAMESPACE):
+        """Create an object from the Kubernetes cluster."""
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+        url = self._generate_url(apiver, kind, namespace)
+
+        resp = await self.arequest('post', url, data=obj)
+
+        logger.info('%s `%s` successfully created', kind.capitalize(), name)
+
+        return resp
+
+    async def create_by_file(self, filepath):
+        """Create resource by file."""
+        return await self._by_file(filepath, self.create)
+
+    async def delete(self, obj, namespace=DEFAULT_NAMESPACE, propagation_policy=None):
+        """Delete an object from the Kubernetes cluster.
+
+        See :py:meth:`~kubeshift.base.KubeBase.delete`.
+        """
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+        url = self._generate_url(apiver, kind, namespace, name)
+        options = utils.delete_options(propagation_policy)
+
+        if options is None and kind in ['ReplicationController']:
+            await self.scale(obj, namespace)
+        resp = await self.arequest('delete', url, data=options)
+
+        logger.info('%s `%s` successfully deleted', kind.capitalize(), name)
+
+        return resp
+
+    async def delete_by_file(self, filepath):
+        """Delete resource by file."""
+        return await self._by_file(filepath, self.delete)
+
+    async def replace(self, obj, namespace=DEFAULT_NAMESPACE):
+        """Replace a resource on the Kubernetes cluster."""
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+        url = self._generate_url(apiver, kind, namespace, name)
+
+        resp = await self.arequest('put', url, data=obj)
+
+        logger.info('%s `%s` successfully replaced', kind.capitalize(), name)
+
+        return resp
+
+    async def replace_by_file(self, filepath):
+        """Replace resource by file."""
+        return await self._by_file(filepath, self.replace)
+
+    async def modify(self, partial, namespace=DEFAULT_NAMESPACE):
+        """Modify a resource using a strategic merge patch."""
+        apiver, kind, name = validator.validate(partial)
+        namespace = validator.check_namespace(partial, namespace)
+        url = self._generate_url(apiver, kind, namespace, name)
+
+        headers = {'Content-Type': 'application/strategic-merge-patch+json'}
+        resp = await self.arequest('patch', url, data=partial, headers=headers)
+
+        logger.info('%s `%s` successfully modified', kind.capitalize(), name)
+
+        return resp
+
+    async def modify_by_file(self, filepath):
+        """Modify resource by file."""
+        return await self._by_file(filepath, self.modify)
+
+    async def scale(self, obj, namespace=DEFAULT_NAMESPACE, replicas=0):
+        """Scale replicas up or down."""
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+        url = self._generate_url(apiver, kind, namespace, name)
+
+        headers = {'Content-Type': 'application/json-patch+json'}
+        patch = [{'op': 'replace',
+                  'path': '/spec/replicas',
+                  'value': replicas}]
+        await self.arequest('patch', url, data=patch, headers=headers)
+
+        logger.info('`%s` successfully scaled to %s', name, replicas)
+
+
+class AsyncKubernetesClient(AsyncKubeBase):
+    """asyncio Kubernetes Provider client that provides access to APIs."""
+
+    pass
+
+
+class AsyncOpenshiftClient(ShiftDiscoveryMixin, AsyncKubeBase, ShiftQueryMixin):
+    """asyncio Openshift Provider client that provides access to APIs."""
+
+    @template(action='post')
+    async def create(self, obj, namespace=DEFAULT_NAMESPACE):
+        """Create an object from the Openshift cluster."""
+        return await super(AsyncOpenshiftClient, self).create(obj, namespace)
+
+    @template(action='delete')
+    async def delete(self, obj, namespace=DEFAULT_NAMESPACE, propagation_policy=None):
+        """Delete an object from the Openshift cluster."""
+        return await super(AsyncOpenshiftClient, self).delete(obj, namespace, propagation_policy)
+
+    async def _process_template(self, apiver, kind, method, obj, namespace):
+        url = self._generate_url(apiver, kind, namespace)
+        data = await self.arequest('post', url, data=obj) or {}
+
+        for o in data.get('objects', []):
+            apiver, kind, name = validator.validate(o)
+            object_url = self._generate_url(apiver, kind, namespace)
+            await self.arequest(method, object_url, data=o)
+            logger.debug('%sd template object: %s', method, name)
+
+        logger.debug('Processed template with %d objects successfully',
+                     len(data.get('objects', [])))
+        return data
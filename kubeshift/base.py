@@ -1,23 +1,41 @@
 """Base class for providers."""
 import abc
+import copy
+import functools
+import json
 import logging
-import os
+from multiprocessing.pool import ThreadPool
+import threading
+import time
 
 import requests
 import six
 import six.moves.urllib.parse as urlparse
-import yaml
 
 from kubeshift.config import Config
-from kubeshift.constants import (DEFAULT_NAMESPACE,
+from kubeshift.constants import (DEFAULT_DISCOVERY_WORKERS,
+                                 DEFAULT_NAMESPACE,
+                                 DEFAULT_PARSE_WORKERS,
                                  LOGGER_DEFAULT)
 from kubeshift.exceptions import KubeConnectionError, KubeRequestError, KubeShiftError
+from kubeshift.queries import utils
+from kubeshift.queries.base import Query
 from kubeshift.queries.kube_query import KubeQueryMixin
-from kubeshift import validator
+from kubeshift.transport import TransportConfig
+from kubeshift import bulk, diff, fingerprint, manifest, validator
 
 logger = logging.getLogger(LOGGER_DEFAULT)
 
 
+def _status_reason(text):
+    """Return the reason of a Status response body."""
+    try:
+        data = json.loads(text) if text else None
+    except ValueError:
+        return None
+    return data.get('reason') if isinstance(data, dict) else None
+
+
 def _format_url(urlbase, urlpath):
     if not urlbase.endswith('/'):
         urlbase += '/'
@@ -30,10 +48,25 @@ def _format_url(urlbase, urlpath):
 class _ClientBase(object):
     """Base Client."""
 
-    def __init__(self, config):
+    #: maximum number of API groups discovered concurrently
+    discovery_workers = DEFAULT_DISCOVERY_WORKERS
+
+    #: maximum number of processes parsing manifest files concurrently
+    parse_workers = DEFAULT_PARSE_WORKERS
+
+    #: class of the queries returned by the named query APIs
+    query_class = Query
+
+    def __init__(self, config, discovery_cache=None, lazy=False, transport=None, manifest_cache=None,
+                 parse_workers=None):
         """Establish session using configurations.
 
         :param Config config: An object of the .kube/config configuration
+        :param DiscoveryCache discovery_cache: cache for API discovery documents
+        :param bool lazy: skip start up discovery; discover each API version on first use
+        :param TransportConfig transport: connection pool, keep-alive and timeout settings
+        :param ManifestCache manifest_cache: cache of the parsed files of the *_by_file methods
+        :param int parse_workers: processes parsing the files of the *_by_file methods (default: 1, in process)
         """
         if isinstance(config, dict):
             config = Config(config)
@@ -43,6 +76,14 @@ class _ClientBase(object):
         if not isinstance(config, Config):
             config = Config.from_file(config)
         self.kubeconfig = config
+        self.discovery_cache = discovery_cache
+        self.manifest_cache = manifest_cache
+        if parse_workers is not None:
+            self.parse_workers = parse_workers
+        self.lazy = lazy
+        self.transport = transport or TransportConfig()
+        # retries of writes rejected with 409 Conflict; counts them in `retries` and `counters`
+        self.conflict_retry = self.transport.conflict_retry
 
         # Check the API url
         self.base_url = self.kubeconfig.cluster.get('server', 'http://localhost:8080')
@@ -51,17 +92,71 @@ class _ClientBase(object):
         # Initialize the connection using all the .kube/config credentials
         self.session = self._connection()
 
+        self.api_resources = {}
+        self._discovered = set()
+        # serializes lazy discovery between the threads sharing the client
+        self._discovery_lock = threading.RLock()
+        if self.lazy:
+            return
+
         # Test the connection before proceeding
         self._test_connection(self.base_url + '/api/')
 
-        self.api_resources = {}
         # Load API Resources
+        self._load_api_resources()
+
+    def _load_api_resources(self):
+        """Discover the API resources of the server."""
         self._load_resources('api/v1/', 'v1')
         self._load_group_resources('apis/')
 
+    def invalidate_discovery(self):
+        """Drop cached discovery documents for the server and discover again."""
+        if self.discovery_cache:
+            self.discovery_cache.invalidate(self.base_url)
+        with self._discovery_lock:
+            self.api_resources = {}
+            self._discovered = set()
+            if not self.lazy:
+                self._load_api_resources()
+
+    def _version_paths(self, api_version):
+        """Return the discovery paths serving an API version."""
+        if api_version == 'v1':
+            return ['api/v1/']
+        return ['apis/' + api_version]
+
+    def _load_version(self, api_version):
+        """Discover the resources of a single API version (lazy discovery).
+
+        The version is only marked as discovered once its resources are
+        loaded; a connection failure leaves it to be discovered on next use.
+        """
+        with self._discovery_lock:
+            if api_version in self._discovered:
+                return
+            for path in self._version_paths(api_version):
+                try:
+                    self._load_resources(path, api_version)
+                except KubeRequestError as ex:
+                    logger.debug('Unable to discover %s: %s', path, ex)
+            self._discovered.add(api_version)
+
+    def _get_discovery(self, url):
+        """Get a discovery document, served from the discovery cache when available."""
+        if self.discovery_cache:
+            data = self.discovery_cache.get(url)
+            if data is not None:
+                return data
+
+        data = self.request('get', url)
+        if data and self.discovery_cache:
+            self.discovery_cache.set(url, data)
+        return data
+
     def _get_groups(self, url):
         """Get the groups of APIs available."""
-        data = self.request('get', url)
+        data = self._get_discovery(url)
         if not data:
             return []
 
@@ -78,19 +173,24 @@ class _ClientBase(object):
 
         This is a list of all available API calls that can be made to the API.
         """
-        data = self.request('get', url)
+        data = self._get_discovery(url)
         return data.get('resources', []) if data else []
 
-    def _add_resources(self, base_url, version):
-        self.api_resources.setdefault(version, {})
+    def _add_resources(self, base_url, version, resources=None):
+        if resources is None:
+            resources = self._get_resources(base_url)
 
-        for res in self._get_resources(base_url) or []:
+        # build the endpoints of the version before publishing them so other
+        # threads never see a partially loaded version
+        endpoints = dict(self.api_resources.get(version, {}))
+        for res in resources or []:
             if '/' in res['name']:
                 continue
             ep = res['name']
             if res['namespaced']:
                 ep = 'namespaces/{namespace}/' + ep
-            self.api_resources[version][res['kind']] = _format_url(base_url, ep)
+            endpoints[res['kind']] = _format_url(base_url, ep)
+        self.api_resources[version] = endpoints
 
     def _load_resources(self, resource_path, version):
         # Gather what end-points we will be using
@@ -101,8 +201,24 @@ class _ClientBase(object):
         base_res_api = _format_url(self.base_url, group_path)
 
         # Gather the group names from which resource names will be derived
-        for group in self._get_groups(base_res_api):
-            self._add_resources(_format_url(base_res_api, group), group)
+        groups = self._get_groups(base_res_api)
+        urls = [_format_url(base_res_api, group) for group in groups]
+
+        # Fetch the groups concurrently but merge them in discovery order
+        for group, url, resources in zip(groups, urls, self._fetch_all(self._get_resources, urls)):
+            self._add_resources(url, group, resources)
+
+    def _fetch_all(self, func, urls):
+        """Call func for each url using a bounded pool of threads sharing the session."""
+        if len(urls) < 2 or self.discovery_workers < 2:
+            return [func(url) for url in urls]
+
+        pool = ThreadPool(min(self.discovery_workers, len(urls)))
+        try:
+            return pool.map(func, urls)
+        finally:
+            pool.close()
+            pool.join()
 
     def _test_connection(self, url):
         """Provide way to validate connection is viable."""
@@ -134,6 +250,9 @@ class _ClientBase(object):
             if opt:
                 setattr(connection, opt, session_opts[opt])
 
+        # Pool connections so each request reuses a warm connection
+        self.transport.apply(connection)
+
         return connection
 
     def _generate_url(self, api_version, kind, namespace=None, name=None, params=None):
@@ -149,8 +268,14 @@ class _ClientBase(object):
 
         Returns:
             url (str): The URL to be used / artifact URL
+
+        Raises:
+            KubeShiftError: no API matches, in lazy mode after discovering the api_version
         """
         url = self.api_resources.get(api_version, {}).get(kind)
+        if not url and self.lazy:
+            self._load_version(api_version)
+            url = self.api_resources.get(api_version, {}).get(kind)
         if not url:
             raise KubeShiftError('No API matching version={} kind={}'.format(api_version, kind))
 
@@ -164,6 +289,46 @@ class _ClientBase(object):
 
         return url
 
+    def _send(self, method, url, **kwargs):
+        """Send the request using the session and translate connection failures.
+
+        Failures are retried as allowed by the transport retry policy and each
+        attempt waits for the transport rate limiter.
+        """
+        retry = self.transport.retry
+        limiter = self.transport.rate_limiter
+        attempt = 0
+        while True:
+            if limiter:
+                limiter.acquire(method)
+            try:
+                res = self.session.request(method, url, **kwargs)
+            except requests.exceptions.SSLError:
+                raise KubeConnectionError('SSL/TLS ERROR: invalid certificate')
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as ex:
+                if not retry or not retry.is_retryable(method, attempt):
+                    raise self._connection_error(ex, url)
+                reason = 'connection'
+                delay = retry.backoff(attempt)
+            else:
+                if not retry or not retry.is_retryable(method, attempt, res.status_code):
+                    return res
+                reason = res.status_code
+                delay = retry.backoff(attempt, res.status_code, res.headers.get('Retry-After'))
+                res.close()
+
+            retry.increment(reason)
+            attempt += 1
+            logger.debug('Retry %d of %s %s (%s) in %.2fs', attempt, method.upper(), url, reason, delay)
+            time.sleep(delay)
+
+    def _connection_error(self, ex, url):
+        if isinstance(ex, requests.exceptions.ConnectTimeout):
+            return KubeConnectionError('Timeout when connecting to  %s' % url)
+        if isinstance(ex, requests.exceptions.ReadTimeout):
+            return KubeConnectionError('Timeout when reading from %s' % url)
+        return KubeConnectionError('Refused connection to %s' % url)
+
     def request(self, method, url, data=None, headers=None):
         """
         Complete the request to the API and fails if the status_code is != 200/201.
@@ -173,41 +338,68 @@ class _ClientBase(object):
         :param dict data: object of the data that is being passed (will be converted to json)
         :param dict headers: request header
         """
-        status_code = None
         return_data = None
 
         logger.debug("Request: {0}".format(self._to_curl(method, url, headers)))
         logger.debug("Request body: {0}".format(data))
-        try:
-            res = self.session.request(method, url, headers=headers, json=data)
-            status_code = res.status_code
-            logger.debug("Response headers: {0}".format(res.headers))
-            if res.ok and res.text:
-                return_data = res.json()
-            logger.debug("Response data: {0}".format(res.json()))
-        except requests.exceptions.SSLError:
-            raise KubeConnectionError('SSL/TLS ERROR: invalid certificate')
-        except requests.exceptions.ConnectTimeout:
-            raise KubeConnectionError('Timeout when connecting to  %s' % url)
-        except requests.exceptions.ReadTimeout:
-            raise KubeConnectionError('Timeout when reading from %s' % url)
-        except requests.exceptions.ConnectionError:
-            raise KubeConnectionError('Refused connection to %s' % url)
+        res = self._send(method, url, headers=headers, json=data, timeout=self.transport.timeout)
+        logger.debug("Response headers: {0}".format(res.headers))
+        if res.ok and res.text:
+            return_data = res.json()
+        logger.debug("Response data: {0}".format(return_data))
 
         # 200 = OK
         # 201 = PENDING
+        # 202 = ACCEPTED (e.g. deletion waiting on finalizers)
         # EVERYTHING ELSE == FAIL
-        if status_code is not 200 and status_code is not 201:
+        if res.status_code not in (200, 201, 202):
             raise KubeRequestError('Unable to complete request: Status: %s, Error: %s'
-                                   % (status_code, res.reason))
+                                   % (res.status_code, res.reason), res.status_code, _status_reason(res.text))
         return return_data
 
+    def stream(self, method, url, headers=None, timeout=None):
+        """
+        Complete a streaming request to the API yielding each line delimited JSON object.
+
+        The connection is kept open until the server closes the response.
+
+        :param str method: put/get/post/patch
+        :param str url: url of the api call
+        :param dict headers: request header
+        :param float timeout: seconds to wait for data before giving up (default: no read timeout)
+        :raises kubeshift.exceptions.KubeConnectionError: if the connection fails or drops
+        :raises kubeshift.exceptions.KubeRequestError: if the status_code is != 200
+        """
+        logger.debug("Stream request: {0}".format(self._to_curl(method, url, headers)))
+        if timeout is None and self.transport.connect_timeout is not None:
+            timeout = (self.transport.connect_timeout, None)
+        res = self._send(method, url, headers=headers, stream=True, timeout=timeout)
+        try:
+            if res.status_code != 200:
+                raise KubeRequestError('Unable to complete request: Status: %s, Error: %s'
+                                       % (res.status_code, res.reason), res.status_code)
+            for line in res.iter_lines():
+                if line:
+                    yield json.loads(line.decode('utf-8'))
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+            raise KubeConnectionError('Connection dropped while streaming from %s' % url)
+        finally:
+            res.close()
+
+    def _load_file(self, filepath):
+        """Parse the resources of YAML / JSON files yielding each as it is parsed.
+
+        :param filepath: file, directory, glob pattern, `-` for stdin or a list of them
+        """
+        return manifest.load_paths(filepath, self.parse_workers, self.manifest_cache)
+
     def _to_curl(self, method, url, headers):
         if headers:
-            hdr_array = [ '-H "'+ k + ': ' + v + '"' for k,v in headers.iteritems()]
+            hdr_array = ['-H "' + k + ': ' + v + '"' for k, v in six.iteritems(headers)]
             return "curl -k -v -X%s %s %s" % (method.upper(), ' '.join(hdr_array), url)
         return "curl -k -v -X%s %s" % (method.upper(), url)
 
+
 class KubeBase(_ClientBase, KubeQueryMixin):
     """Provide common base for each provider.
 
@@ -216,18 +408,152 @@ class KubeBase(_ClientBase, KubeQueryMixin):
     Kubernetes-based APIs (OpenShift/Kubernetes).
     """
 
-    def _by_file(self, filepath, func):
-        if not os.path.isfile(filepath):
-            raise KubeShiftError('File not found: %s' % filepath)
+    #: operations supported by :py:meth:`bulk`
+    bulk_operations = ('create', 'delete', 'replace', 'modify', 'apply', 'upsert')
+
+    def _by_file(self, filepath, func, concurrency=1, ordered=True, reverse=False):
+        results = bulk.execute(func, self._load_file(filepath), concurrency,
+                               fail_fast=True, ordered=ordered, reverse=reverse)
+        return [r.result for r in results]
+
+    def bulk(self, op, objects, namespace=DEFAULT_NAMESPACE, concurrency=1, fail_fast=False, ordered=True):
+        """Apply an operation to many objects.
+
+        Up to `concurrency` requests are sent at once sharing the connection
+        pool of the client; size `TransportConfig.pool_maxsize` accordingly.
+
+        When `ordered` the objects are processed in dependency waves by kind
+        (namespaces, custom resource definitions, service accounts, RBAC...
+        then workloads, see :py:func:`kubeshift.bulk.plan`); the waves run in
+        reverse order for `delete`.
+
+        For `apply` the live objects are read with one list per kind and
+        namespace holding several objects instead of one read per object.
+
+        .. code-block:: python
+
+            for res in client.bulk('create', objects, concurrency=10):
+                if res.error:
+                    print(res.object['metadata']['name'], res.error)
+
+        :param str op: one of create, delete, replace, modify, apply or upsert
+        :param iterable objects: objects to process
+        :param str namespace: namespace used by objects without one
+        :param int concurrency: maximum number of requests in flight
+        :param bool fail_fast: stop at the first failure and raise it
+        :param bool ordered: process the objects in dependency waves
+        :returns: a :py:class:`~kubeshift.bulk.BulkResult` per object in input order
+        :rtype: list
+        :raises kubeshift.exceptions.KubeShiftError: if the operation is not supported
+        """
+        if op not in self.bulk_operations:
+            raise KubeShiftError('Unsupported bulk operation: %s' % op)
+        func = getattr(self, op)
+        if op == 'apply':
+            objects = list(objects)
+            live = self._list_live(objects, namespace, concurrency)
+            return bulk.execute(lambda obj: self.apply(obj, namespace, live=live.get(self._live_key(obj, namespace))),
+                                objects, concurrency, fail_fast, ordered=ordered)
+
+        return bulk.execute(lambda obj: func(obj, namespace), objects, concurrency, fail_fast,
+                            ordered=ordered, reverse=op == 'delete')
+
+    def _live_key(self, obj, namespace):
+        try:
+            apiver, kind, name = validator.validate(obj)
+        except KubeShiftError:
+            return None
+        return (apiver, kind, validator.check_namespace(obj, namespace), name)
+
+    def _list_live(self, objects, namespace, concurrency=1):
+        """Read the live copies of objects with one list per kind and namespace.
 
-        with open(filepath, 'r') as fd:
-            resources = yaml.safe_load_all(fd.read())
+        Kinds with a single object in a namespace are left to a read of the
+        object itself, as are the kinds which cannot be listed.
 
-        results = []
-        for res in resources:
-            results.append(func(res))
+        :returns: live objects ({} when missing) keyed by apiVersion, kind, namespace and name
+        :rtype: dict
+        """
+        groups = {}
+        for obj in objects:
+            key = self._live_key(obj, namespace)
+            if key:
+                groups.setdefault(key[:3], set()).add(key[3])
+        groups = [(group, names) for group, names in groups.items() if len(names) > 1]
+
+        def list_group(entry):
+            (apiver, kind, ns), _ = entry
+            url = self._generate_url(apiver, kind, ns)
+            return dict((item['metadata']['name'], item) for item in self.query_class(self, url).iter_items())
+
+        live = {}
+        for res in bulk.execute(list_group, groups, concurrency):
+            (group, names), found = res.object, res.result
+            if res.error:
+                logger.debug('Unable to list %s: %s', group, res.error)
+                continue
+            for name in names:
+                live[group + (name,)] = found.get(name, {})
+        return live
+
+    def _get_live(self, apiver, kind, namespace, name):
+        url = self._generate_url(apiver, kind, namespace, name)
+        try:
+            return self.request('get', url) or {}
+        except KubeRequestError as ex:
+            if ex.status_code == 404:
+                return {}
+            raise
+
+    def apply(self, obj, namespace=DEFAULT_NAMESPACE, live=None):
+        """Create or update an object, skipping it when unchanged.
+
+        The normalized content hash of the object is recorded in the
+        `kubeshift.io/applied-hash` annotation. No request is sent when the
+        live object carries the same hash; a missing object is created and
+        a changed one patched.
+
+        :param dict obj: desired state of the object
+        :param str namespace: namespace used when the object has none
+        :param dict live: live copy of the object, `{}` when it does not exist (default: read it)
+        :returns: the live object when unchanged, the server response otherwise
+        """
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+        digest = fingerprint.content_hash(obj)
+
+        if live is None:
+            live = self._get_live(apiver, kind, namespace, name)
+        if live and fingerprint.applied_hash(live) == digest:
+            logger.info('%s `%s` unchanged', kind.capitalize(), name)
+            return live
+
+        desired = fingerprint.annotate(obj, digest)
+        if not live:
+            return self.create(desired, namespace)
+
+        patch_type, patch = self._diff(live, desired)
+        url = self._generate_url(apiver, kind, namespace, name)
+        headers = {'Content-Type': diff.PATCH_CONTENT_TYPES[patch_type]}
+        resp = self.request('patch', url, data=patch, headers=headers)
 
-        return results
+        logger.info('%s `%s` successfully applied', kind.capitalize(), name)
+
+        return resp
+
+    def apply_by_file(self, filepath, concurrency=1, ordered=True):
+        """Apply resource by file.
+
+        :params str filepath: file, directory (recursive), glob pattern or `-` for stdin
+        :params int concurrency: maximum number of requests in flight
+        :params bool ordered: process the resources in dependency waves
+        :returns: applied resource(s)
+        :rtype: list
+        :raises kubeshift.exceptions.KubeShiftError: if file not found
+        """
+        results = self.bulk('apply', self._load_file(filepath), concurrency=concurrency,
+                            fail_fast=True, ordered=ordered)
+        return [r.result for r in results]
 
     def create(self, obj, namespace=DEFAULT_NAMESPACE):
         """Create an object from the Kubernetes cluster."""
@@ -241,50 +567,61 @@ class KubeBase(_ClientBase, KubeQueryMixin):
 
         return resp
 
-    def create_by_file(self, filepath):
+    def create_by_file(self, filepath, concurrency=1, ordered=True):
         """Create resource by file.
 
-        :params str filepath: file location
+        :params str filepath: file, directory (recursive), glob pattern or `-` for stdin
+        :params int concurrency: maximum number of requests in flight
+        :params bool ordered: process the resources in dependency waves
         :returns: created resource(s)
         :rtype: list
         :raises kubeshift.exceptions.KubeShiftError: if file not found
         """
-        return self._by_file(filepath, self.create)
+        return self._by_file(filepath, self.create, concurrency, ordered)
 
-    def delete(self, obj, namespace=DEFAULT_NAMESPACE):
+    def delete(self, obj, namespace=DEFAULT_NAMESPACE, propagation_policy=None):
         """Delete an object from the Kubernetes cluster.
 
         .. note::
 
-            Replication controllers must scale to 0 in order to delete pods.
-            Kubernetes 1.3 will implement server-side cascading deletion, but
-            until then, it's mandatory to scale to 0
+            Without a propagation policy, replication controllers are scaled
+            to 0 first in order to delete pods as servers before Kubernetes 1.3
+            do not implement server-side cascading deletion.
             https://github.com/kubernetes/kubernetes/blob/master/docs/proposals/garbage-collection.md
 
         :param dict obj: Object of the artifact being modified
         :param str namesapce: Namespace of the kubernetes cluster to be used
+        :param str propagation_policy: server-side deletion of dependents; Foreground, Background or Orphan
+        :raises kubeshift.exceptions.KubeShiftError: if the propagation policy is unknown
         """
         apiver, kind, name = validator.validate(obj)
         namespace = validator.check_namespace(obj, namespace)
         url = self._generate_url(apiver, kind, namespace, name)
+        options = utils.delete_options(propagation_policy)
 
-        if kind in ['ReplicationController']:
+        if options is None and kind in ['ReplicationController']:
             self.scale(obj, namespace)
-        resp = self.request('delete', url)
+        resp = self.request('delete', url, data=options)
 
         logger.info('%s `%s` successfully deleted', kind.capitalize(), name)
 
         return resp
 
-    def delete_by_file(self, filepath):
+    def delete_by_file(self, filepath, concurrency=1, ordered=True, propagation_policy=None):
         """Delete resource by file.
 
-        :params str filepath: file location
+        :params str filepath: file, directory (recursive), glob pattern or `-` for stdin
+        :params int concurrency: maximum number of requests in flight
+        :params bool ordered: process the resources in dependency waves
+        :params str propagation_policy: server-side deletion of dependents; Foreground, Background or Orphan
         :returns: deleted resource(s)
         :rtype: list
         :raises kubeshift.exceptions.KubeShiftError: if file not found
         """
-        return self._by_file(filepath, self.delete)
+        func = self.delete
+        if propagation_policy:
+            func = functools.partial(self.delete, propagation_policy=propagation_policy)
+        return self._by_file(filepath, func, concurrency, ordered, reverse=True)
 
     def replace(self, obj, namespace=DEFAULT_NAMESPACE):
         """Replace a resource on the Kubernetes cluster."""
@@ -298,46 +635,203 @@ class KubeBase(_ClientBase, KubeQueryMixin):
 
         return resp
 
-    def replace_by_file(self, filepath):
+    def replace_by_file(self, filepath, concurrency=1, ordered=True):
         """Replace resource by file.
 
-        :params str filepath: file location
+        :params str filepath: file, directory (recursive), glob pattern or `-` for stdin
+        :params int concurrency: maximum number of requests in flight
+        :params bool ordered: process the resources in dependency waves
         :returns: replaced resource(s)
         :rtype: list
         :raises kubeshift.exceptions.KubeShiftError: if file not found
         """
-        return self._by_file(filepath, self.replace)
+        return self._by_file(filepath, self.replace, concurrency, ordered)
+
+    def _diff(self, live, desired):
+        """Compute the minimal patch; list items do not carry apiVersion and kind."""
+        live = dict(live, apiVersion=live.get('apiVersion', desired.get('apiVersion')),
+                    kind=live.get('kind', desired.get('kind')))
+        return diff.minimal_patch(live, desired)
+
+    def patch(self, obj, patch, namespace=DEFAULT_NAMESPACE, patch_type='json'):
+        """Patch a resource.
+
+        :param dict obj: the resource (at least apiVersion, kind and metadata)
+        :param patch: RFC 6902 operations (json), merge patch or strategic merge patch
+        :param str namespace: object name and auth scope, such as for teams and projects
+        :param str patch_type: one of json, merge or strategic
+        :raises kubeshift.exceptions.KubeShiftError: if the patch type is not supported
+        """
+        if patch_type not in diff.PATCH_CONTENT_TYPES:
+            raise KubeShiftError('Unsupported patch type: %s' % patch_type)
 
-    def modify(self, partial, namespace=DEFAULT_NAMESPACE):
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+        url = self._generate_url(apiver, kind, namespace, name)
+
+        headers = {'Content-Type': diff.PATCH_CONTENT_TYPES[patch_type]}
+        resp = self.request('patch', url, data=patch, headers=headers)
+
+        logger.info('%s `%s` successfully patched', kind.capitalize(), name)
+
+        return resp
+
+    def upsert(self, obj, namespace=DEFAULT_NAMESPACE):
+        """Create a resource or replace it when it already exists.
+
+        The object is created without reading it first; when the server
+        answers 409 AlreadyExists it is replaced instead. When the replace
+        requires the current `metadata.resourceVersion` (422 for custom
+        resources, which do not allow unconditional updates) or is rejected
+        with 409 Conflict, the resourceVersion is read and the replace
+        retried, after a jittered backoff on further conflicts, up to
+        :py:attr:`conflict_retry` `max_retries` times.
+
+        :param dict obj: desired state of the resource
+        :param str namespace: namespace used when the object has none
+        :returns: created or replaced resource
+        """
+        try:
+            return self.create(obj, namespace)
+        except KubeRequestError as ex:
+            if ex.status_code != 409 or ex.reason != 'AlreadyExists':
+                raise
+
+        try:
+            return self.replace(obj, namespace)
+        except KubeRequestError as ex:
+            if ex.status_code not in (409, 422):
+                raise
+        return self._replace_on_conflict(obj, namespace)
+
+    def _replace_on_conflict(self, obj, namespace):
+        apiver, kind, name = validator.validate(obj)
+        namespace = validator.check_namespace(obj, namespace)
+
+        attempt = 0
+        while True:
+            live = self._get_live(apiver, kind, namespace, name)
+            if not live:
+                return self.create(obj, namespace)
+            meta = dict(obj.get('metadata') or {}, resourceVersion=live['metadata'].get('resourceVersion'))
+            try:
+                return self.replace(dict(obj, metadata=meta), namespace)
+            except KubeRequestError as ex:
+                if ex.status_code != 409 or not self.conflict_retry.is_retryable('put', attempt, 409):
+                    raise
+
+            self.conflict_retry.increment(409)
+            time.sleep(self.conflict_retry.backoff(attempt))
+            attempt += 1
+            logger.debug('%s `%s` changed concurrently since resourceVersion %s; retrying',
+                         kind.capitalize(), name, meta['resourceVersion'])
+
+    def update(self, obj_ref, mutate, namespace=DEFAULT_NAMESPACE, cache=None):
+        """Read-modify-write a resource with optimistic concurrency.
+
+        The resource is read (from `cache` when provided, e.g. an
+        :py:class:`~kubeshift.informer.Informer`), passed to `mutate` and
+        replaced with the `metadata.resourceVersion` it was read at. When
+        another writer changed it meanwhile (409 Conflict) it is read again
+        from the server and mutated again after a jittered backoff, up to
+        :py:attr:`conflict_retry` `max_retries` times.
+
+        .. code-block:: python
+
+            def scale_up(deployment):
+                deployment['spec']['replicas'] += 1
+
+            client.update(deployment, scale_up, cache=informer)
+
+        :param dict obj_ref: the resource (at least apiVersion, kind and metadata)
+        :param callable mutate: modifies a copy of the resource in place or returns the new content
+        :param str namespace: namespace used when the object has none
+        :param cache: Informer or Store read instead of the server on the first attempt
+        :returns: the updated resource (the current one when mutate changes nothing)
+        """
+        apiver, kind, name = validator.validate(obj_ref)
+        namespace = validator.check_namespace(obj_ref, namespace)
+        url = self._generate_url(apiver, kind, namespace, name)
+
+        current = None
+        if cache is not None:
+            # cluster scoped resources are cached by name only
+            namespaced = '{namespace}' in self.api_resources[apiver][kind]
+            current = cache.get(name, namespace if namespaced else None)
+        attempt = 0
+        while True:
+            if current is None:
+                current = self.request('get', url) or {}
+
+            desired = copy.deepcopy(current)
+            desired = mutate(desired) or desired
+            if desired == current:
+                logger.info('%s `%s` unchanged', kind.capitalize(), name)
+                return current
+
+            desired.setdefault('apiVersion', apiver)
+            desired.setdefault('kind', kind)
+            desired.setdefault('metadata', {})['resourceVersion'] = current.get('metadata', {}).get('resourceVersion')
+            try:
+                resp = self.request('put', url, data=desired)
+                logger.info('%s `%s` successfully updated', kind.capitalize(), name)
+                return resp
+            except KubeRequestError as ex:
+                if ex.status_code != 409 or not self.conflict_retry.is_retryable('put', attempt, 409):
+                    raise
+
+            self.conflict_retry.increment(409)
+            time.sleep(self.conflict_retry.backoff(attempt))
+            attempt += 1
+            current = None
+            logger.debug('%s `%s` changed concurrently; reading it again', kind.capitalize(), name)
+
+    def modify(self, partial, namespace=DEFAULT_NAMESPACE, live=None):
         """Modify a resource.
 
         The partial object provided will be strategically merged with the existing
         resource content. The top level meta data is required to enable modifying
         the correct resource instance.
 
+        When the live resource is provided (fetched or from an
+        :py:class:`~kubeshift.informer.Informer`) only the differences are sent
+        as the smallest of a JSON patch or merge patch, and nothing is sent when
+        the partial object matches.
+
         :param dict partial: changes to be applied to existing resource content
         :param str namespace: object name and auth scope, such as for teams and projects
+        :param dict live: current content of the resource
         """
         apiver, kind, name = validator.validate(partial)
         namespace = validator.check_namespace(partial, namespace)
         url = self._generate_url(apiver, kind, namespace, name)
 
-        headers = {'Content-Type': 'application/strategic-merge-patch+json'}
-        resp = self.request('patch', url, data=partial, headers=headers)
+        if live is None:
+            patch_type, patch = 'strategic', partial
+        else:
+            patch_type, patch = self._diff(live, partial)
+            if not patch:
+                logger.info('%s `%s` unchanged', kind.capitalize(), name)
+                return live
+
+        headers = {'Content-Type': diff.PATCH_CONTENT_TYPES[patch_type]}
+        resp = self.request('patch', url, data=patch, headers=headers)
 
         logger.info('%s `%s` successfully modified', kind.capitalize(), name)
 
         return resp
 
-    def modify_by_file(self, filepath):
+    def modify_by_file(self, filepath, concurrency=1, ordered=True):
         """Modify resource by file.
 
-        :params str filepath: file location
+        :params str filepath: file, directory (recursive), glob pattern or `-` for stdin
+        :params int concurrency: maximum number of requests in flight
+        :params bool ordered: process the resources in dependency waves
         :returns: modified resource(s)
         :rtype: list
         :raises kubeshift.exceptions.KubeShiftError: if file not found
         """
-        return self._by_file(filepath, self.modify)
+        return self._by_file(filepath, self.modify, concurrency, ordered)
 
     def scale(self, obj, namespace=DEFAULT_NAMESPACE, replicas=0):
         """Scale replicas up or down.
@@ -353,7 +847,7 @@ class KubeBase(_ClientBase, KubeQueryMixin):
         namespace = validator.check_namespace(obj, namespace)
         url = self._generate_url(apiver, kind, namespace, name)
 
-        headers = {'Content-Type': 'application/json-patch+json'}
+        headers = {'Content-Type': diff.PATCH_CONTENT_TYPES['json']}
         patch = [{'op': 'replace',
                   'path': '/spec/replicas',
                   'value': replicas}]
@@ -0,0 +1,130 @@
+"""Run an operation on many objects using a bounded pool of threads.
+
+Objects can be ordered in dependency waves by kind: the objects of a wave
+are processed concurrently and a wave starts once the previous one is done.
+"""
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+import threading
+
+from kubeshift.exceptions import KubeConnectionError, KubeRequestError, KubeShiftError
+
+#: errors reported per object instead of aborting the whole run
+ERRORS = (KubeShiftError, KubeConnectionError, KubeRequestError)
+
+#: outcome of a bulk operation on one object; `error` is None on success
+BulkResult = namedtuple('BulkResult', ['object', 'result', 'error'])
+
+#: kinds created in successive waves ahead of every other kind
+DEPENDENCY_WAVES = (
+    ('Namespace', 'Project', 'ProjectRequest'),
+    ('CustomResourceDefinition', 'ThirdPartyResource', 'StorageClass', 'PodSecurityPolicy'),
+    ('ServiceAccount', 'Secret', 'ConfigMap', 'Role', 'ClusterRole',
+     'LimitRange', 'ResourceQuota', 'PersistentVolume', 'NetworkPolicy'),
+    ('RoleBinding', 'ClusterRoleBinding', 'PersistentVolumeClaim', 'Service'),
+)
+
+_KIND_WAVES = dict((kind, wave) for wave, kinds in enumerate(DEPENDENCY_WAVES) for kind in kinds)
+
+
+def plan(objects, reverse=False):
+    """Group objects into dependency waves.
+
+    Objects of kinds not listed in :py:data:`DEPENDENCY_WAVES` (workloads,
+    custom resources...) make up the last wave. The input order is kept
+    within a wave.
+
+    :param iterable objects: objects to process
+    :param bool reverse: order the waves for deletion
+    :returns: a list of (index, object) pairs per non empty wave in execution order
+    :rtype: list
+    """
+    waves = [[] for _ in range(len(DEPENDENCY_WAVES) + 1)]
+    for index, obj in enumerate(objects):
+        kind = obj.get('kind') if isinstance(obj, dict) else None
+        waves[_KIND_WAVES.get(kind, len(DEPENDENCY_WAVES))].append((index, obj))
+
+    waves = [wave for wave in waves if wave]
+    if reverse:
+        waves.reverse()
+    return waves
+
+
+def execute(func, objects, concurrency=1, fail_fast=False, ordered=False, reverse=False):
+    """Call func for each object with at most `concurrency` calls in flight.
+
+    Unless `ordered`, objects are consumed from the iterable as workers
+    become free so the first call starts before a generator is exhausted.
+
+    When `fail_fast` is set no new call is started once one has failed; the
+    calls in flight complete and the error which stopped the run is raised.
+
+    :param callable func: operation applied to each object
+    :param iterable objects: objects to process
+    :param int concurrency: maximum number of concurrent calls
+    :param bool fail_fast: stop at the first failure and raise it
+    :param bool ordered: process the objects in dependency waves (see :py:func:`plan`)
+    :param bool reverse: run the waves in reverse order (deletion)
+    :returns: a BulkResult per object in input order
+    :rtype: list
+    """
+    if not ordered:
+        return _execute(func, objects, concurrency, fail_fast)
+
+    objects = list(objects)
+    results = [None] * len(objects)
+    for wave in plan(objects, reverse):
+        indices = [index for index, _ in wave]
+        for index, res in zip(indices, _execute(func, [obj for _, obj in wave], concurrency, fail_fast)):
+            results[index] = res
+    return results
+
+
+def _execute(func, objects, concurrency, fail_fast):
+    errors = []
+
+    def call(obj):
+        try:
+            return BulkResult(obj, func(obj), None)
+        except ERRORS as ex:
+            if fail_fast:
+                errors.append(ex)
+            return BulkResult(obj, None, ex)
+
+    workers = min(concurrency, len(objects)) if isinstance(objects, list) else concurrency
+    if workers < 2:
+        results = []
+        for obj in objects:
+            results.append(call(obj))
+            if errors:
+                break
+    else:
+        results = _execute_pool(call, objects, workers, errors)
+
+    if errors:
+        raise errors[0]
+    return results
+
+
+def _execute_pool(call, objects, workers, errors):
+    """Submit calls as workers become free so no more than `workers` objects are pending."""
+    slots = threading.BoundedSemaphore(workers)
+
+    def run(obj):
+        try:
+            return call(obj)
+        finally:
+            slots.release()
+
+    pool = ThreadPool(workers)
+    pending = []
+    try:
+        for obj in objects:
+            slots.acquire()
+            if errors:
+                break
+            pending.append(pool.apply_async(run, (obj,)))
+        return [p.get() for p in pending]
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,261 @@
+"""Thread-safe local object cache."""
+import threading
+
+#: name of the index by `metadata.namespace`
+INDEX_NAMESPACE = 'namespace'
+
+#: name of the index by `key=value` of each label
+INDEX_LABEL = 'label'
+
+#: name of the index by `spec.nodeName`
+INDEX_NODE = 'node'
+
+#: name of the index by `metadata.ownerReferences[].uid`
+INDEX_OWNER = 'owner'
+
+
+def object_key(obj):
+    """Key an object by `namespace/name` (or `name` when not namespaced).
+
+    :param dict obj: an instance of a kubernetes / openshift types.
+    :returns: cache key
+    :rtype: str
+    """
+    meta = obj.get('metadata', {})
+    if meta.get('namespace'):
+        return '{}/{}'.format(meta['namespace'], meta.get('name'))
+    return meta.get('name')
+
+
+def index_by_namespace(obj):
+    """Index function returning the namespace of an object."""
+    ns = obj.get('metadata', {}).get('namespace')
+    return [ns] if ns else []
+
+
+def index_by_label(obj):
+    """Index function returning `key=value` for each label of an object."""
+    labels = obj.get('metadata', {}).get('labels') or {}
+    return ['{}={}'.format(k, v) for k, v in labels.items()]
+
+
+def index_by_node(obj):
+    """Index function returning the node an object (pod) is scheduled on."""
+    node = (obj.get('spec') or {}).get('nodeName')
+    return [node] if node else []
+
+
+def index_by_owner(obj):
+    """Index function returning the uid of each owner of an object."""
+    refs = obj.get('metadata', {}).get('ownerReferences') or []
+    return [ref['uid'] for ref in refs if ref.get('uid')]
+
+
+#: indexers used by default
+DEFAULT_INDEXERS = {
+    INDEX_NAMESPACE: index_by_namespace,
+    INDEX_LABEL: index_by_label,
+    INDEX_NODE: index_by_node,
+    INDEX_OWNER: index_by_owner,
+}
+
+
+class Store(object):
+    """Store objects in memory keyed by `namespace/name`.
+
+    Named indexers map each object to a list of index values; the indices are
+    maintained as objects are added, updated or deleted so lookups by index
+    value do not scan the store.
+
+    .. warning::
+
+        Objects are returned as stored and must not be modified by the caller.
+    """
+
+    def __init__(self, indexers=None):
+        """Constructor.
+
+        :param dict indexers: index functions keyed by index name
+        """
+        self._lock = threading.RLock()
+        self._items = {}
+        self._indexers = {}
+        self._indices = {}
+
+        for name, func in (indexers or {}).items():
+            self.add_indexer(name, func)
+
+    def __len__(self):
+        """Number of objects stored."""
+        with self._lock:
+            return len(self._items)
+
+    def __contains__(self, key):
+        """Check if the key is stored."""
+        with self._lock:
+            return key in self._items
+
+    def add(self, obj):
+        """Add or update an object.
+
+        :param dict obj: object to store
+        :returns: the previously stored object if any
+        :rtype: dict|None
+        """
+        key = object_key(obj)
+        with self._lock:
+            old = self._items.get(key)
+            if old is not None:
+                self._unindex(key, old)
+            self._items[key] = obj
+            self._index(key, obj)
+        return old
+
+    def delete(self, obj):
+        """Delete an object.
+
+        :param dict obj: object to remove
+        :returns: the previously stored object if any
+        :rtype: dict|None
+        """
+        key = object_key(obj)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._unindex(key, old)
+        return old
+
+    def replace(self, objs):
+        """Replace the full content of the store.
+
+        :param list objs: objects that make up the new content
+        :returns: added objects, updated (old, new) pairs and deleted objects
+        :rtype: tuple
+        """
+        added, updated = [], []
+        with self._lock:
+            # build the new content aside and swap it in one step so readers
+            # never see a partially filled store
+            items = {}
+            indices = dict((name, {}) for name in self._indexers)
+            ordered = []
+            for obj in objs:
+                key = object_key(obj)
+                items[key] = obj
+                ordered.append((key, obj))
+                for name in self._indexers:
+                    self._index_one(name, key, obj, indices)
+            previous = dict(self._items)
+            self._items, self._indices = items, indices
+
+        for key, obj in ordered:
+            if key in previous:
+                updated.append((previous.pop(key), obj))
+            else:
+                added.append(obj)
+        return added, updated, list(previous.values())
+
+    def get(self, name, namespace=None):
+        """Get an object by name.
+
+        :param str name: name of the object
+        :param str namespace: namespace of the object
+        :returns: stored object
+        :rtype: dict|None
+        """
+        key = '{}/{}'.format(namespace, name) if namespace else name
+        with self._lock:
+            return self._items.get(key)
+
+    def list(self, namespace=None):
+        """List stored objects.
+
+        :param str namespace: only list objects of the namespace
+        :returns: stored objects
+        :rtype: list
+        """
+        if namespace and INDEX_NAMESPACE in self._indexers:
+            return self.by_index(INDEX_NAMESPACE, namespace)
+
+        with self._lock:
+            items = list(self._items.values())
+        if namespace:
+            items = [i for i in items if i.get('metadata', {}).get('namespace') == namespace]
+        return items
+
+    def add_indexer(self, name, func):
+        """Add a named indexer and index the stored objects.
+
+        :param str name: name of the index
+        :param callable func: returns the list of index values of an object
+        """
+        with self._lock:
+            self._indexers[name] = func
+            self._indices[name] = {}
+            for key, obj in self._items.items():
+                self._index_one(name, key, obj)
+
+    def by_index(self, name, value):
+        """List stored objects by index value.
+
+        :param str name: name of the index
+        :param str value: index value
+        :returns: stored objects
+        :rtype: list
+        :raises KeyError: if the index does not exist
+        """
+        with self._lock:
+            return [self._items[key] for key in self._indices[name].get(value, ())]
+
+    def index_keys(self, name, value):
+        """Get the keys of stored objects by index value.
+
+        :param str name: name of the index
+        :param str value: index value
+        :returns: object keys
+        :rtype: set
+        :raises KeyError: if the index does not exist
+        """
+        with self._lock:
+            return set(self._indices[name].get(value, ()))
+
+    def index_values(self, name):
+        """List the values of an index.
+
+        :param str name: name of the index
+        :returns: index values
+        :rtype: list
+        :raises KeyError: if the index does not exist
+        """
+        with self._lock:
+            return list(self._indices[name].keys())
+
+    def items(self, keys):
+        """Get stored objects by key.
+
+        :param iterable keys: object keys
+        :returns: stored objects
+        :rtype: list
+        """
+        with self._lock:
+            return [self._items[key] for key in keys if key in self._items]
+
+    def _index_one(self, name, key, obj, indices=None):
+        index = (self._indices if indices is None else indices)[name]
+        for value in self._indexers[name](obj):
+            index.setdefault(value, set()).add(key)
+
+    def _index(self, key, obj):
+        for name in self._indexers:
+            self._index_one(name, key, obj)
+
+    def _unindex(self, key, obj):
+        for name, func in self._indexers.items():
+            index = self._indices[name]
+            for value in func(obj):
+                keys = index.get(value)
+                if keys is None:
+                    continue
+                keys.discard(key)
+                if not keys:
+                    del index[value]
@@ -8,6 +8,7 @@ import tempfile
 import yaml
 
 from kubeshift.constants import LOGGER_DEFAULT
+from kubeshift import manifest
 
 logger = logging.getLogger(LOGGER_DEFAULT)
 
@@ -339,7 +340,7 @@ class Config(object):
         logger.debug("Parsing %s", filepath)
 
         with open(filepath) as f:
-            content = yaml.safe_load(f.read())
+            content = manifest.load(f)
         return cls(content, filepath)
 
     @classmethod
@@ -5,3 +5,55 @@ LOGGER_DEFAULT = "kubeshift"
 
 #: default namespace value `default`
 DEFAULT_NAMESPACE = "default"
+
+#: default number of items requested per page when paginating lists `500`
+DEFAULT_PAGE_SIZE = 500
+
+#: watch event type for a newly added object `ADDED`
+WATCH_ADDED = "ADDED"
+
+#: watch event type for an updated object `MODIFIED`
+WATCH_MODIFIED = "MODIFIED"
+
+#: watch event type for a removed object `DELETED`
+WATCH_DELETED = "DELETED"
+
+#: watch event type reporting a server side error `ERROR`
+WATCH_ERROR = "ERROR"
+
+#: seconds an informer watch stays open before it is re-established `300`
+DEFAULT_WATCH_TIMEOUT = 300
+
+#: maximum number of API groups discovered concurrently `8`
+DEFAULT_DISCOVERY_WORKERS = 8
+
+#: maximum number of processes parsing manifest files concurrently `1` (parse in process)
+DEFAULT_PARSE_WORKERS = 1
+
+#: total size of the manifest files below which they are parsed in process whatever the workers `1048576`
+PARSE_POOL_MIN_BYTES = 1048576
+
+#: annotation holding the content hash of the last applied object `kubeshift.io/applied-hash`
+APPLIED_HASH_ANNOTATION = "kubeshift.io/applied-hash"
+
+#: delete dependents in the background after the owner is deleted `Background`
+PROPAGATION_BACKGROUND = "Background"
+
+#: delete the owner once its dependents are deleted `Foreground`
+PROPAGATION_FOREGROUND = "Foreground"
+
+#: keep the dependents of the deleted owner `Orphan`
+PROPAGATION_ORPHAN = "Orphan"
+
+#: retries of an update rejected because the object changed concurrently (409 Conflict) `5`
+DEFAULT_CONFLICT_RETRIES = 5
+
+#: Accept header requesting lists of PartialObjectMetadata (metadata only), full objects otherwise
+ACCEPT_PARTIAL_METADATA = ("application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,"
+                           "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1beta1,"
+                           "application/json")
+
+#: Accept header requesting lists rendered as a Table of printable columns, full objects otherwise
+ACCEPT_TABLE = ("application/json;as=Table;g=meta.k8s.io;v=v1,"
+                "application/json;as=Table;g=meta.k8s.io;v=v1beta1,"
+                "application/json")
@@ -0,0 +1,177 @@
+"""Compute the patch turning a live object into the desired one.
+
+Only the fields of the desired object are compared unless `prune` is set:
+fields populated by the server (defaults, status...) are not reverted.
+
+Lists whose items are all objects with a unique `name` (containers,
+volumes, env...) are matched by name; other lists are compared by position
+when their length is unchanged and replaced otherwise. JSON patch operations
+on an item of such a list are preceded by a `test` of its name so a patch
+computed from a stale copy fails instead of changing another item.
+"""
+import copy
+import json
+
+#: content type of each patch type
+PATCH_CONTENT_TYPES = {
+    'json': 'application/json-patch+json',
+    'merge': 'application/merge-patch+json',
+    'strategic': 'application/strategic-merge-patch+json',
+}
+
+#: key identifying the items of lists of objects
+LIST_KEY = 'name'
+
+
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _equal(live, desired):
+    return live == desired and isinstance(live, bool) == isinstance(desired, bool)
+
+
+def _keyed(items, key):
+    index = {}
+    for item in items:
+        if not isinstance(item, dict) or item.get(key) is None or item[key] in index:
+            return None
+        index[item[key]] = item
+    return index
+
+
+def _diff_dict(live, desired, path, ops, prune, key):
+    for name in sorted(desired):
+        item_path = path + '/' + _escape(name)
+        if name not in live:
+            ops.append({'op': 'add', 'path': item_path, 'value': copy.deepcopy(desired[name])})
+        else:
+            _diff(live[name], desired[name], item_path, ops, prune, key)
+
+    if prune:
+        for name in sorted(set(live) - set(desired)):
+            ops.append({'op': 'remove', 'path': path + '/' + _escape(name)})
+
+
+def _test_key(item_path, key, value):
+    return {'op': 'test', 'path': item_path + '/' + _escape(key), 'value': value}
+
+
+def _diff_list(live, desired, path, ops, prune, key):
+    live_index = _keyed(live, key)
+    desired_index = _keyed(desired, key)
+
+    if live_index is not None and desired_index is not None:
+        positions = dict((item[key], i) for i, item in enumerate(live))
+        for item in desired:
+            if item[key] in positions:
+                item_path = '%s/%d' % (path, positions[item[key]])
+                item_ops = []
+                _diff(live[positions[item[key]]], item, item_path, item_ops, prune, key)
+                if item_ops:
+                    ops.append(_test_key(item_path, key, item[key]))
+                    ops.extend(item_ops)
+        if prune:
+            removed = sorted((positions[name] for name in live_index if name not in desired_index), reverse=True)
+            for pos in removed:
+                item_path = '%s/%d' % (path, pos)
+                ops.append(_test_key(item_path, key, live[pos][key]))
+                ops.append({'op': 'remove', 'path': item_path})
+        ops.extend({'op': 'add', 'path': path + '/-', 'value': copy.deepcopy(item)}
+                   for item in desired if item[key] not in positions)
+    elif len(live) == len(desired):
+        for pos, (live_item, item) in enumerate(zip(live, desired)):
+            _diff(live_item, item, '%s/%d' % (path, pos), ops, prune, key)
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': copy.deepcopy(desired)})
+
+
+def _diff(live, desired, path, ops, prune, key):
+    if isinstance(live, dict) and isinstance(desired, dict):
+        _diff_dict(live, desired, path, ops, prune, key)
+    elif isinstance(live, list) and isinstance(desired, list):
+        _diff_list(live, desired, path, ops, prune, key)
+    elif not _equal(live, desired):
+        ops.append({'op': 'replace', 'path': path, 'value': copy.deepcopy(desired)})
+
+
+def json_patch(live, desired, prune=False, key=LIST_KEY):
+    """Compute the RFC 6902 JSON patch turning live into desired.
+
+    :param dict live: live object
+    :param dict desired: desired object
+    :param bool prune: remove the fields of live missing from desired
+    :param str key: key matching the items of lists of objects
+    :returns: patch operations (empty when there is no change)
+    :rtype: list
+    """
+    ops = []
+    _diff(live, desired, '', ops, prune, key)
+    return ops
+
+
+def merge_patch(live, desired, prune=False, key=LIST_KEY):
+    """Compute the RFC 7386 JSON merge patch turning live into desired.
+
+    Merge patches replace lists as a whole so a changed list is sent in full.
+
+    :param dict live: live object
+    :param dict desired: desired object
+    :param bool prune: remove the fields of live missing from desired
+    :param str key: key matching the items of lists of objects
+    :returns: the merge patch (empty when there is no change)
+    :rtype: dict
+    """
+    return _merge_patch(live, desired, prune, key)[0]
+
+
+def _merge_patch(live, desired, prune, key):
+    """Return the merge patch and whether it has the same effect as the JSON patch.
+
+    Both only differ on lists: the JSON patch updates the items of a list in
+    place, keeping what desired does not mention, where the merge patch
+    replaces it. They agree when the JSON patch replaces the list too.
+    """
+    patch = {}
+    same = True
+    for name in desired:
+        if name not in live:
+            patch[name] = copy.deepcopy(desired[name])
+        elif isinstance(live[name], dict) and isinstance(desired[name], dict):
+            sub, sub_same = _merge_patch(live[name], desired[name], prune, key)
+            if sub:
+                patch[name] = sub
+                same = same and sub_same
+        else:
+            ops = json_patch(live[name], desired[name], prune, key)
+            if ops:
+                patch[name] = copy.deepcopy(desired[name])
+                same = same and len(ops) == 1 and ops[0]['op'] == 'replace' and ops[0]['path'] == ''
+
+    if prune:
+        for name in set(live) - set(desired):
+            patch[name] = None
+    return patch, same
+
+
+def minimal_patch(live, desired, prune=False, key=LIST_KEY):
+    """Compute the smallest of the JSON patch and merge patch turning live into desired.
+
+    The merge patch is only used when it has the same effect as the JSON
+    patch: never when it would replace a list the JSON patch updates in place.
+
+    :param dict live: live object
+    :param dict desired: desired object
+    :param bool prune: remove the fields of live missing from desired
+    :param str key: key matching the items of lists of objects
+    :returns: patch type (`json` or `merge`) and patch; the patch is empty when there is no change
+    :rtype: tuple
+    """
+    ops = json_patch(live, desired, prune, key)
+    if not ops:
+        return 'json', ops
+
+    merge, same = _merge_patch(live, desired, prune, key)
+    if same and len(json.dumps(merge)) < len(json.dumps(ops)):
+        return 'merge', merge
+    return 'json', ops
@@ -0,0 +1,87 @@
+"""Discovery cache persists API discovery documents on disk."""
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import six.moves.urllib.parse as urlparse
+
+from kubeshift.constants import LOGGER_DEFAULT
+
+logger = logging.getLogger(LOGGER_DEFAULT)
+
+DEFAULT_CACHE_DIR = os.path.expanduser(os.path.join('~', '.kube', 'cache', 'discovery'))
+DEFAULT_TTL = 600
+
+
+def _safe(value):
+    return re.sub(r'[^A-Za-z0-9._-]', '_', value)
+
+
+class DiscoveryCache(object):
+    """Cache discovery documents keyed by server and API path.
+
+    Each document is written to
+    `<directory>/<host_port>/<api path>/serverresources.json` and considered
+    stale once older than `ttl` seconds.
+    """
+
+    def __init__(self, directory=None, ttl=DEFAULT_TTL):
+        """Constructor.
+
+        :param str directory: cache location (default: $HOME/.kube/cache/discovery)
+        :param int ttl: seconds before a cached document expires
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.ttl = ttl
+
+    def _server_dir(self, url):
+        return os.path.join(self.directory, _safe(urlparse.urlparse(url).netloc))
+
+    def _path(self, url):
+        parts = urlparse.urlparse(url)
+        segments = [_safe(p) for p in parts.path.split('/') if p]
+        return os.path.join(self._server_dir(url), *(segments + ['serverresources.json']))
+
+    def get(self, url):
+        """Read a cached discovery document.
+
+        :param str url: url of the discovery document
+        :returns: the document or None when missing or expired
+        :rtype: dict|None
+        """
+        path = self._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'r') as fd:
+                return json.load(fd)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def set(self, url, data):
+        """Write a discovery document to the cache.
+
+        :param str url: url of the discovery document
+        :param dict data: the document
+        """
+        path = self._path(url)
+        try:
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), delete=False) as fd:
+                json.dump(data, fd)
+            os.rename(fd.name, path)
+        except (IOError, OSError) as ex:
+            logger.debug('Unable to cache discovery document %s: %s', url, ex)
+
+    def invalidate(self, url=None):
+        """Remove cached documents.
+
+        :param str url: server url whose documents are removed (default: all servers)
+        """
+        path = self._server_dir(url) if url else self.directory
+        shutil.rmtree(path, ignore_errors=True)
@@ -7,4 +7,9 @@ class KubeConnectionError(Exception):
 
 
 class KubeRequestError(Exception):
-    pass
+
+    def __init__(self, message, status_code=None, reason=None):
+        super(KubeRequestError, self).__init__(message)
+        self.status_code = status_code
+        # machine readable reason of the Status returned by the server (e.g. AlreadyExists, Conflict)
+        self.reason = reason
@@ -0,0 +1,66 @@
+"""Content hash of objects used to detect unchanged objects on apply."""
+import copy
+import hashlib
+import json
+
+from kubeshift.constants import APPLIED_HASH_ANNOTATION
+
+#: metadata fields populated by the server
+SERVER_METADATA = ('uid', 'resourceVersion', 'generation', 'creationTimestamp', 'selfLink',
+                   'managedFields', 'deletionTimestamp', 'deletionGracePeriodSeconds')
+
+
+def normalize(obj):
+    """Return a copy of an object without server populated fields and the hash annotation.
+
+    :param dict obj: an instance of a kubernetes / openshift types.
+    :rtype: dict
+    """
+    obj = copy.deepcopy(obj)
+    obj.pop('status', None)
+
+    meta = obj.get('metadata') or {}
+    for field in SERVER_METADATA:
+        meta.pop(field, None)
+
+    annotations = meta.get('annotations')
+    if annotations is not None:
+        annotations.pop(APPLIED_HASH_ANNOTATION, None)
+        if not annotations:
+            del meta['annotations']
+    return obj
+
+
+def content_hash(obj):
+    """Hash the normalized content of an object independently of the key order.
+
+    :param dict obj: an instance of a kubernetes / openshift types.
+    :returns: SHA-256 hex digest
+    :rtype: str
+    """
+    data = json.dumps(normalize(obj), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def applied_hash(obj):
+    """Return the content hash recorded on a (live) object.
+
+    :param dict obj: an instance of a kubernetes / openshift types.
+    :rtype: str|None
+    """
+    return ((obj.get('metadata') or {}).get('annotations') or {}).get(APPLIED_HASH_ANNOTATION)
+
+
+def annotate(obj, digest):
+    """Return a copy of an object recording the content hash in its annotations.
+
+    :param dict obj: an instance of a kubernetes / openshift types.
+    :param str digest: content hash of the object
+    :rtype: dict
+    """
+    obj = copy.deepcopy(obj)
+    meta = obj.setdefault('metadata', {})
+    annotations = meta.get('annotations') or {}
+    annotations[APPLIED_HASH_ANNOTATION] = digest
+    meta['annotations'] = annotations
+    return obj
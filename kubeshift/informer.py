@@ -0,0 +1,215 @@
+"""Keep a local cache of resources in sync with the cluster."""
+import logging
+import threading
+
+from kubeshift.cache import DEFAULT_INDEXERS, INDEX_LABEL, Store
+from kubeshift.constants import (DEFAULT_PAGE_SIZE,
+                                 DEFAULT_WATCH_TIMEOUT,
+                                 LOGGER_DEFAULT,
+                                 WATCH_DELETED)
+from kubeshift.exceptions import KubeConnectionError, KubeRequestError
+from kubeshift.queries import utils
+
+logger = logging.getLogger(LOGGER_DEFAULT)
+
+
+class Informer(object):
+    """Serve reads of a query from a local store kept in sync by list+watch.
+
+    The resources are listed once and then watched for changes from a
+    background thread. When the watch can not be resumed the resources are
+    listed again and the differences are reported to the handlers.
+
+    .. code-block:: python
+
+        informer = Informer(client.pods('default'))
+        informer.add_handler(on_add=lambda obj: print(obj['metadata']['name']))
+        informer.start()
+        informer.wait_for_sync()
+        informer.get('mypod', 'default')
+    """
+
+    def __init__(self, query, page_size=DEFAULT_PAGE_SIZE, watch_timeout=DEFAULT_WATCH_TIMEOUT, indexers=None):
+        """Constructor.
+
+        The store is indexed by namespace, label, node and owner in addition
+        to any of the provided `indexers`.
+
+        :param query: :py:class:`~kubeshift.queries.base.Query` to keep in sync
+        :param int page_size: maximum number of items requested per page when listing
+        :param int watch_timeout: seconds each watch connection stays open
+        :param dict indexers: additional index functions keyed by index name
+        """
+        self.query = query
+        self.page_size = page_size
+        self.watch_timeout = watch_timeout
+
+        all_indexers = dict(DEFAULT_INDEXERS)
+        all_indexers.update(indexers or {})
+        self.store = Store(all_indexers)
+
+        self._handlers = {'add': [], 'update': [], 'delete': []}
+        self._thread = None
+        self._stopped = threading.Event()
+        self._synced = threading.Event()
+
+    def add_handler(self, on_add=None, on_update=None, on_delete=None):
+        """Register callbacks for changes to the store.
+
+        Callbacks are invoked from the informer thread.
+
+        :param callable on_add: called with the added object
+        :param callable on_update: called with the old and the new object
+        :param callable on_delete: called with the deleted object
+        """
+        for event, func in (('add', on_add), ('update', on_update), ('delete', on_delete)):
+            if func:
+                self._handlers[event].append(func)
+
+    def start(self):
+        """Start syncing in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, name='kubeshift-informer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop syncing; the thread exits once the current watch returns."""
+        self._stopped.set()
+
+    def wait_for_sync(self, timeout=None):
+        """Wait for the initial list to complete.
+
+        :param float timeout: seconds to wait
+        :returns: True if the store has been synced
+        :rtype: bool
+        """
+        return self._synced.wait(timeout)
+
+    @property
+    def synced(self):
+        """Return whether the initial list completed."""
+        return self._synced.is_set()
+
+    def run(self):
+        """List and watch until stopped."""
+        resource_version = None
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._list()
+
+                for event in self.query.watch(resource_version, timeout=self.watch_timeout, relist=False):
+                    resource_version = event.object.get('metadata', {}).get('resourceVersion', resource_version)
+                    self._process(event)
+                    if self._stopped.is_set():
+                        break
+
+            except (KubeConnectionError, KubeRequestError) as ex:
+                logger.debug('Informer for %s failed: %s; relisting', self.query.url, ex)
+                resource_version = None
+                # back off before hitting the server again
+                self._stopped.wait(1)
+
+    def _list(self):
+        objs = []
+        resource_version = None
+        for page in self.query.pages(self.page_size):
+            resource_version = resource_version or page.get('metadata', {}).get('resourceVersion')
+            objs.extend(page.get('items', []))
+
+        added, updated, deleted = self.store.replace(objs)
+        self._synced.set()
+        for obj in added:
+            self._notify('add', obj)
+        for old, new in updated:
+            self._notify('update', old, new)
+        for obj in deleted:
+            self._notify('delete', obj)
+
+        return resource_version
+
+    def _process(self, event):
+        if event.type == WATCH_DELETED:
+            old = self.store.delete(event.object)
+            self._notify('delete', old or event.object)
+            return
+
+        old = self.store.add(event.object)
+        if old is None:
+            self._notify('add', event.object)
+        else:
+            self._notify('update', old, event.object)
+
+    def _notify(self, event, *args):
+        for handler in self._handlers[event]:
+            try:
+                handler(*args)
+            except Exception:
+                logger.exception('Informer handler failed')
+
+    def get(self, name, namespace=None):
+        """Get a resource by name from the local store.
+
+        :param str name: name of a resource
+        :param str namespace: namespace of a resource
+        :returns: a resource object
+        :rtype: dict|None
+        """
+        return self.store.get(name, namespace)
+
+    def list(self, namespace=None):
+        """List resources from the local store.
+
+        :param str namespace: only list resources of the namespace
+        :returns: list of resources
+        :rtype: list
+        """
+        return self.store.list(namespace)
+
+    def by_index(self, name, value):
+        """List resources from the local store by index value.
+
+        .. code-block:: python
+
+            informer.by_index('node', 'node-1')
+            informer.by_index('owner', replicaset['metadata']['uid'])
+
+        :param str name: name of the index (namespace, label, node, owner or custom)
+        :param str value: index value
+        :returns: list of resources
+        :rtype: list
+        """
+        return self.store.by_index(name, value)
+
+    def by_selector(self, selectors):
+        """Query resources from the local store by labelSelector.
+
+        See :py:meth:`~kubeshift.queries.base.Query.by_selector` for the selector attributes.
+        Equality and set based selectors are resolved through the label index;
+        only the resulting candidates are checked against the remaining selectors.
+
+        :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :returns: list of resources that match selector criteria
+        :rtype: list
+        """
+        if not isinstance(selectors, list) or not selectors:
+            return []
+
+        keys = None
+        for s in selectors:
+            val = s.get('value')
+            if not s.get('key') or val is None or s.get('op', '=') not in ['=', '==', 'in']:
+                continue
+            if not isinstance(val, list):
+                val = [val]
+            matched = set()
+            for v in val:
+                matched |= self.store.index_keys(INDEX_LABEL, '{}={}'.format(s['key'], v))
+            keys = matched if keys is None else keys & matched
+
+        candidates = self.store.list() if keys is None else self.store.items(keys)
+        return [obj for obj in candidates
+                if utils.match_selectors(obj.get('metadata', {}).get('labels'), selectors)]
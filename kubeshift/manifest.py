@@ -0,0 +1,300 @@
+"""Parse kubernetes / openshift manifests (YAML or JSON)."""
+import glob
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+
+import six
+import yaml
+
+from kubeshift.constants import LOGGER_DEFAULT, PARSE_POOL_MIN_BYTES
+from kubeshift.exceptions import KubeShiftError
+
+logger = logging.getLogger(LOGGER_DEFAULT)
+
+DEFAULT_CACHE_DIR = os.path.expanduser(os.path.join('~', '.kube', 'cache', 'manifests'))
+
+#: YAML loader; the libyaml based CSafeLoader when PyYAML was built with it
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+#: extensions of the manifest files collected from directories
+EXTENSIONS = ('.yaml', '.yml', '.json')
+
+#: path reading the manifests from standard input
+STDIN = '-'
+
+_GLOB_CHARS = re.compile(r'[*?[]')
+
+
+def load(stream):
+    """Parse the single document of a stream.
+
+    :param stream: string or file object
+    :returns: parsed document
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_all(stream):
+    """Parse the documents of a stream lazily.
+
+    Documents are yielded as soon as they are parsed; file objects are
+    read incrementally.
+
+    :param stream: string or file object
+    :returns: generator of parsed documents
+    """
+    return yaml.load_all(stream, Loader=SafeLoader)
+
+
+def load_file(filepath):
+    """Parse the documents of a file lazily keeping it open until exhausted.
+
+    :param str filepath: file location
+    :returns: generator of parsed documents
+    """
+    with open(filepath, 'r') as fd:
+        for doc in load_all(fd):
+            yield doc
+
+
+def _glob(pattern):
+    if sys.version_info < (3, 5):
+        return glob.glob(pattern)
+    return glob.glob(pattern, recursive=True)
+
+
+def _walk(directory):
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        found.extend(os.path.join(root, f) for f in sorted(files)
+                     if os.path.splitext(f)[1].lower() in EXTENSIONS)
+    return found
+
+
+def expand(paths):
+    """Expand files, directories and glob patterns into the list of manifest files.
+
+    Directories are traversed recursively collecting the files with one of
+    the :py:data:`EXTENSIONS`; `**` in a glob pattern matches any number of
+    directories (Python 3.5+). :py:data:`STDIN` is kept as is.
+
+    :param paths: a path or a list of paths
+    :returns: file paths in a stable order
+    :rtype: list
+    :raises kubeshift.exceptions.KubeShiftError: if a path does not match any file
+    """
+    if isinstance(paths, six.string_types):
+        paths = [paths]
+
+    files = []
+    for path in paths:
+        if path == STDIN or os.path.isfile(path):
+            found = [path]
+        elif os.path.isdir(path):
+            found = _walk(path)
+        elif _GLOB_CHARS.search(path):
+            found = []
+            for match in sorted(_glob(path)):
+                found.extend(_walk(match) if os.path.isdir(match) else [match])
+        else:
+            found = None
+
+        if not found:
+            raise KubeShiftError('File not found: %s' % path)
+        files.extend(found)
+    return files
+
+
+def _json_safe(value):
+    """Whether value is stored as JSON without loss (no dates, binary or non string keys)."""
+    if isinstance(value, dict):
+        return all(isinstance(k, six.string_types) and _json_safe(v) for k, v in six.iteritems(value))
+    if isinstance(value, list):
+        return all(_json_safe(v) for v in value)
+    return value is None or isinstance(value, six.string_types + six.integer_types + (float,))
+
+
+def _digest(filepath):
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ManifestCache(object):
+    """Cache parsed manifest files on disk.
+
+    Entries are keyed by the absolute file path and stored as JSON along
+    with the file mtime, size and SHA-256 content hash. An entry is used when
+    the file mtime and size are unchanged or, failing that, when the content
+    hash matches so a fresh checkout of unchanged files is not parsed again.
+
+    Files with documents JSON can not represent as parsed (e.g. YAML
+    timestamps or binary values) are not cached.
+    """
+
+    def __init__(self, directory=None):
+        """Constructor.
+
+        :param str directory: cache location (default: $HOME/.kube/cache/manifests)
+        """
+        self.directory = directory or DEFAULT_CACHE_DIR
+
+    def _path(self, filepath):
+        key = hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, filepath):
+        """Read the cached documents of a file.
+
+        :param str filepath: manifest file location
+        :returns: the documents or None when missing or stale
+        :rtype: list|None
+        """
+        try:
+            stat = os.stat(filepath)
+            with open(self._path(filepath), 'r') as fd:
+                entry = json.load(fd)
+            if (entry['mtime'], entry['size']) == (stat.st_mtime, stat.st_size):
+                return entry['documents']
+            if entry['digest'] != _digest(filepath):
+                return None
+        except (IOError, OSError, KeyError, TypeError, ValueError):
+            return None
+
+        self._write(filepath, stat, entry['digest'], entry['documents'])
+        return entry['documents']
+
+    def set(self, filepath, documents):
+        """Write the parsed documents of a file to the cache.
+
+        :param str filepath: manifest file location
+        :param list documents: parsed documents
+        """
+        if not _json_safe(documents):
+            logger.debug('Unable to cache manifest %s: not representable as JSON', filepath)
+            return
+        try:
+            self._write(filepath, os.stat(filepath), _digest(filepath), documents)
+        except (IOError, OSError) as ex:
+            logger.debug('Unable to cache manifest %s: %s', filepath, ex)
+
+    def _write(self, filepath, stat, digest, documents):
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'digest': digest, 'documents': documents}
+        path = self._path(filepath)
+        try:
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+            with tempfile.NamedTemporaryFile('w', dir=self.directory, delete=False) as fd:
+                json.dump(entry, fd)
+            os.rename(fd.name, path)
+        except (IOError, OSError) as ex:
+            logger.debug('Unable to cache manifest %s: %s', filepath, ex)
+
+    def invalidate(self, filepath=None):
+        """Remove cached entries.
+
+        :param str filepath: manifest file whose entry is removed (default: all entries)
+        """
+        if filepath:
+            paths = [self._path(filepath)]
+        elif os.path.isdir(self.directory):
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith('.json')]
+        else:
+            paths = []
+
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _parse_file(filepath):
+    return list(load_file(filepath))
+
+
+def _parse_files(files, workers):
+    pool = multiprocessing.Pool(workers)
+    try:
+        for docs in pool.imap(_parse_file, files):
+            yield docs
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _pool_worth(files, workers):
+    """Whether parsing files in a pool of processes outweighs starting it."""
+    if min(workers, len(files)) < 2 or STDIN in files:
+        return False
+    try:
+        return sum(os.path.getsize(f) for f in files) >= PARSE_POOL_MIN_BYTES
+    except OSError:
+        return False
+
+
+def _caching(cache, filepath, docs):
+    parsed = []
+    for doc in docs:
+        parsed.append(doc)
+        yield doc
+    cache.set(filepath, parsed)
+
+
+def _load_files(files, workers, cache):
+    cached = {}
+    if cache is not None:
+        for filepath in files:
+            docs = cache.get(filepath) if filepath != STDIN else None
+            if docs is not None:
+                cached[filepath] = docs
+
+    missing = [f for f in files if f not in cached]
+    if _pool_worth(missing, workers):
+        parsed = _parse_files(missing, workers)
+    else:
+        parsed = (load_all(sys.stdin) if f == STDIN else load_file(f) for f in missing)
+
+    for filepath in files:
+        if filepath in cached:
+            docs = cached[filepath]
+        else:
+            docs = next(parsed)
+            if cache is not None and filepath != STDIN:
+                docs = _caching(cache, filepath, docs)
+        for doc in docs:
+            yield doc
+
+
+def load_paths(paths, workers=None, cache=None):
+    """Parse the documents of files, directories, glob patterns or standard input.
+
+    Files are parsed lazily in process unless `workers` is above 1 and the
+    files add up to :py:data:`~kubeshift.constants.PARSE_POOL_MIN_BYTES`; they
+    are then parsed in a pool of `workers` processes. Documents are yielded
+    in file order. Files found in `cache` are not parsed at all.
+
+    .. note::
+
+        The pool forks the process; avoid it while other threads (informers,
+        bulk operations) are running.
+
+    :param paths: a path or a list of paths (see :py:func:`expand`)
+    :param int workers: maximum number of parsing processes (default: 1, no pool)
+    :param ManifestCache cache: cache of parsed files
+    :returns: generator of parsed documents
+    :raises kubeshift.exceptions.KubeShiftError: if a path does not match any file
+    """
+    files = expand(paths)
+    workers = min(workers or 1, len(files))
+    return _load_files(files, workers, cache)
@@ -21,35 +21,46 @@ def template(action):
     """
     def decorator(func):
         @six.wraps(func)
-        def handler(self, obj, namespace=None):
+        def handler(self, obj, namespace=None, **kwargs):
             apiver, kind, _ = validator.validate(obj)
             if kind == 'Template':
                 return self._process_template(apiver, kind, action, obj, namespace)
             else:
-                return func(self, obj, namespace)
+                return func(self, obj, namespace, **kwargs)
         return handler
     return decorator
 
 
-class OpenshiftClient(KubeBase, ShiftQueryMixin):
-    """Openshift Provider client that provides access to APIs."""
+class ShiftDiscoveryMixin(object):
+    """Add the Openshift (oapi) API resources to the discovery of a client."""
 
-    def __init__(self, *args, **kwargs):
-        """Constructor."""
-        super(OpenshiftClient, self).__init__(*args, **kwargs)
+    def _load_api_resources(self):
+        """Discover the Kubernetes and Openshift API resources of the server."""
+        super(ShiftDiscoveryMixin, self)._load_api_resources()
 
         # Load API Resources
         self._load_resources('oapi/v1/', 'v1')
 
+    def _version_paths(self, api_version):
+        """Return the discovery paths serving an API version including oapi."""
+        paths = super(ShiftDiscoveryMixin, self)._version_paths(api_version)
+        if api_version == 'v1':
+            paths.append('oapi/v1/')
+        return paths
+
+
+class OpenshiftClient(ShiftDiscoveryMixin, KubeBase, ShiftQueryMixin):
+    """Openshift Provider client that provides access to APIs."""
+
     @template(action='post')
     def create(self, obj, namespace=DEFAULT_NAMESPACE):
         """Create an object from the Openshift cluster."""
         return super(OpenshiftClient, self).create(obj, namespace)
 
     @template(action='delete')
-    def delete(self, obj, namespace=DEFAULT_NAMESPACE):
+    def delete(self, obj, namespace=DEFAULT_NAMESPACE, propagation_policy=None):
         """Delete an object from the Openshift cluster."""
-        return super(OpenshiftClient, self).delete(obj, namespace)
+        return super(OpenshiftClient, self).delete(obj, namespace, propagation_policy)
 
     def _process_template(self, apiver, kind, method, obj, namespace):
         url = self._generate_url(apiver, kind, namespace)
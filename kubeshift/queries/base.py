@@ -1,9 +1,53 @@
 """Perform API query for any provider with filtering features."""
+import collections
+import logging
+import math
+import time
+
 import six
 
-from kubeshift.constants import DEFAULT_NAMESPACE
+from kubeshift.constants import (ACCEPT_PARTIAL_METADATA,
+                                 ACCEPT_TABLE,
+                                 DEFAULT_NAMESPACE,
+                                 DEFAULT_PAGE_SIZE,
+                                 LOGGER_DEFAULT,
+                                 WATCH_ADDED,
+                                 WATCH_ERROR)
+from kubeshift.exceptions import KubeConnectionError, KubeRequestError
 from kubeshift.queries import utils
 
+logger = logging.getLogger(LOGGER_DEFAULT)
+
+#: A change notification; `type` is one of ADDED, MODIFIED or DELETED.
+WatchEvent = collections.namedtuple('WatchEvent', ['type', 'object'])
+
+#: Printable columns of resources; `rows` hold the `cells` of each resource in column order.
+Table = collections.namedtuple('Table', ['columns', 'rows'])
+
+#: columns of the tables built locally when the server does not render tables
+FALLBACK_COLUMNS = [
+    {'name': 'Name', 'type': 'string', 'format': 'name', 'description': 'Name of the resource'},
+    {'name': 'Created At', 'type': 'date', 'format': '', 'description': 'Creation timestamp of the resource'},
+]
+
+
+def _list_headers(metadata_only):
+    """Return the headers of a list request."""
+    return {'Accept': ACCEPT_PARTIAL_METADATA} if metadata_only else None
+
+
+def _table(page, columns):
+    """Return the Table of a list page; columns are reused when the page omits them."""
+    if page.get('kind') == 'Table':
+        return Table(page.get('columnDefinitions') or columns or [], page.get('rows') or [])
+
+    rows = []
+    for item in page.get('items') or []:
+        metadata = item.get('metadata', {})
+        rows.append({'cells': [metadata.get('name'), metadata.get('creationTimestamp')],
+                     'object': {'metadata': metadata}})
+    return Table(FALLBACK_COLUMNS, rows)
+
 
 class Query(object):
     """Performs queries with filters."""
@@ -17,27 +61,192 @@ class Query(object):
         self.client = client
         self.url = url
 
-    def all(self):
-        """Perform query with no filters (all results)."""
-        return self.client.request('get', self.url) or {}
+    def all(self, fields=None):
+        """Perform query with no filters (all results).
 
-    def items(self):
-        """Select the list of items from the query results."""
-        return self.all().get('items', [])
+        :param str|dict|list fields: field selectors evaluated by the server (see :py:meth:`pages`)
+        """
+        params = self._list_params(None, None, fields)
+        if params is None:
+            return {}
+        return self.client.request('get', utils.add_params(self.url, params)) or {}
 
-    def metadata(self):
-        """Filter the results to provide only the metadata only."""
-        return [s.get('metadata', {}) for s in self.items()]
+    def pages(self, page_size=DEFAULT_PAGE_SIZE, selectors=None, fields=None, metadata_only=False):
+        """Perform query one page at a time using `limit` and `continue`.
 
-    def filter(self, status=None):
-        """Filter by status.
+        Each page is the raw list response from the server. When `page_size` is
+        not provided the full result is returned as a single page.
+
+        Field selectors are sent as `fieldSelector`, e.g.
+        `{'status.phase': 'Running'}` or `'spec.nodeName=node1'` (see
+        :py:func:`~kubeshift.queries.utils.fields_to_str`); invalid field
+        selectors match nothing.
+
+        With `metadata_only` the server is asked for a PartialObjectMetadataList
+        whose items only hold their `metadata`; servers which do not support it
+        return the full objects.
+
+        :param int page_size: maximum number of items requested per page
+        :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :param str|dict|list fields: field selectors evaluated by the server
+        :param bool metadata_only: request the metadata of the resources only
+        :returns: generator of list results
+        """
+        return self._fetch_pages(self._list_params(page_size, selectors, fields), _list_headers(metadata_only))
+
+    def _fetch_pages(self, params, headers):
+        while params is not None:
+            data = self.client.request('get', utils.add_params(self.url, params), headers=headers) or {}
+            yield data
+            params = self._next_page(params, data)
+
+    def _list_params(self, page_size, selectors, fields=None):
+        """Return the list query parameters; None when nothing can match."""
+        params = {'limit': page_size or None}
+        if selectors is not None:
+            params['labelSelector'] = utils.selectors_to_str(selectors)
+            if params['labelSelector'] is None:
+                # invalid selectors never match anything
+                return None
+        if fields is not None:
+            params['fieldSelector'] = utils.fields_to_str(fields)
+            if params['fieldSelector'] is None:
+                return None
+        return params
+
+    def _next_page(self, params, data):
+        """Return the query parameters of the page following data; None when done."""
+        token = data.get('metadata', {}).get('continue')
+        if not params.get('limit') or not token:
+            return None
+        return dict(params, **{'continue': token})
+
+    def iter_items(self, page_size=DEFAULT_PAGE_SIZE, selectors=None, fields=None, metadata_only=False):
+        """Iterate over the items of the query results page by page.
+
+        Only a single page of results is held in memory at any time.
+
+        :param int page_size: maximum number of items requested per page
+        :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :param str|dict|list fields: field selectors evaluated by the server
+        :param bool metadata_only: request the metadata of the resources only (see :py:meth:`pages`)
+        :returns: generator of resources
+        """
+        for page in self.pages(page_size, selectors, fields, metadata_only):
+            for item in page.get('items', []):
+                yield item
+
+    def items(self, page_size=None, fields=None):
+        """Select the list of items from the query results.
+
+        :param int page_size: paginate the query using pages of the given size
+        :param str|dict|list fields: field selectors evaluated by the server
+        """
+        return list(self.iter_items(page_size, fields=fields))
+
+    def metadata(self, page_size=None, fields=None):
+        """Filter the results to provide only the metadata only.
+
+        Only the metadata is transferred when the server supports it.
+
+        :param int page_size: paginate the query using pages of the given size
+        :param str|dict|list fields: field selectors evaluated by the server
+        """
+        return [s.get('metadata', {}) for s in self.iter_items(page_size, fields=fields, metadata_only=True)]
+
+    def iter_table(self, page_size=DEFAULT_PAGE_SIZE, selectors=None, fields=None):
+        """Render the query results as tables one page at a time.
+
+        The server is asked to render each page as a Table holding the
+        printable columns of the resources (those shown by `kubectl get`).
+        Servers which do not render tables return the full objects; their
+        name and creation timestamp are tabulated locally instead.
+
+        :param int page_size: maximum number of resources requested per page
+        :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :param str|dict|list fields: field selectors evaluated by the server
+        :returns: generator of :py:class:`~kubeshift.queries.base.Table`
+        """
+        columns = None
+        params = self._list_params(page_size, selectors, fields)
+        for page in self._fetch_pages(params, {'Accept': ACCEPT_TABLE}):
+            table = _table(page, columns)
+            columns = table.columns
+            yield table
+
+    def table(self, page_size=None, selectors=None, fields=None):
+        """Render the query results as a single table.
+
+        See :py:meth:`iter_table`.
+
+        :param int page_size: paginate the query using pages of the given size
+        :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :param str|dict|list fields: field selectors evaluated by the server
+        :rtype: :py:class:`~kubeshift.queries.base.Table`
+        """
+        columns, rows = [], []
+        for table in self.iter_table(page_size, selectors, fields):
+            columns = table.columns
+            rows.extend(table.rows)
+        return Table(columns, rows)
+
+    def _phase_fields(self, status, fields):
+        """Return the field selectors including `status.phase`; None if fields are invalid."""
+        selector = utils.fields_to_str(fields) if fields is not None else ''
+        if selector is None:
+            return None
+        return ','.join(f for f in (selector, 'status.phase=' + status) if f)
+
+    def filter(self, status=None, page_size=None, fields=None):
+        """Filter by status and / or fields.
+
+        The `status.phase` value is sent as a field selector; servers which
+        do not support it for the resource (400) are filtered client side.
 
         :param str status: filter by `status.phace` value
+        :param int page_size: paginate the query using pages of the given size
+        :param str|dict|list fields: field selectors evaluated by the server
         """
-        if status:
-            return [s for s in self.items() if s.get('status', {}).get('phase') == status]
+        if not status:
+            return self.items(page_size, fields) if fields is not None else []
 
-        return []
+        phase_fields = self._phase_fields(status, fields)
+        if phase_fields is None:
+            return []
+        try:
+            return list(self.iter_items(page_size, fields=phase_fields))
+        except KubeRequestError as ex:
+            if ex.status_code != 400:
+                raise
+            logger.debug('Field selector status.phase rejected by %s; filtering locally', self.url)
+
+        return [s for s in self.iter_items(page_size, fields=fields) if s.get('status', {}).get('phase') == status]
+
+    def _lazy(self):
+        return LazyQuery(self, {})
+
+    def where(self, labels=None, fields=None):
+        """Start a lazy query selecting resources by label(s) and / or field(s).
+
+        See :py:class:`LazyQuery`.
+
+        :param list labels: a list of selectors (dict) that filters resources by label(s)
+        :param str|dict|list fields: field selectors evaluated by the server
+        :rtype: LazyQuery
+        """
+        return self._lazy().where(labels, fields)
+
+    def limit(self, count):
+        """Start a lazy query returning at most `count` resources (see :py:class:`LazyQuery`)."""
+        return self._lazy().limit(count)
+
+    def at(self, resource_version):
+        """Start a lazy query listing the resources at `resource_version` (see :py:class:`LazyQuery`)."""
+        return self._lazy().at(resource_version)
+
+    def only(self, *keys):
+        """Start a lazy query projecting the resources to `keys` (see :py:class:`LazyQuery`)."""
+        return self._lazy().only(*keys)
 
     def by_name(self, name):
         """Fetch resource by name.
@@ -49,7 +258,7 @@ class Query(object):
             return {}
         return self.client.request('get', self.url + '/' + name)
 
-    def by_selector(self, selectors):
+    def by_selector(self, selectors, page_size=None):
         """Query resource by labelSelector.
 
         selector attributes:
@@ -68,13 +277,276 @@ class Query(object):
             http://kubernetes.io/docs/user-guide/labels/#label-selectors
 
         :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :param int page_size: paginate the query using pages of the given size
         :returns: list of resources that match selector criteria
         :rtype: list
         """
-        qs = utils.selectors_to_qs(selectors)
-        if not qs:
+        return list(self.iter_items(page_size, selectors or []))
+
+    def delete_all(self, selectors=None, propagation_policy=None):
+        """Delete the resources of the collection with a single request.
+
+        Only the resources matching the label selectors are deleted when
+        provided (see :py:meth:`by_selector`); invalid selectors delete nothing.
+
+        :param list selectors: a list of selectors (dict) that filters resources by label(s)
+        :param str propagation_policy: server-side deletion of dependents; Foreground, Background or Orphan
+        :returns: the deleted resources (list or status as returned by the server)
+        :rtype: dict
+        :raises kubeshift.exceptions.KubeShiftError: if the propagation policy is unknown
+        """
+        params = self._list_params(None, selectors)
+        if params is None:
+            return {}
+        return self.client.request('delete', utils.add_params(self.url, params),
+                                   data=utils.delete_options(propagation_policy)) or {}
+
+    def watch(self, resource_version=None, timeout=None, relist=True):
+        """Watch the resources for changes.
+
+        Changes are streamed from the server as they happen. When the connection
+        drops the watch resumes from the last seen `resourceVersion`. When the
+        server reports that version as expired (410 Gone) the resources are listed
+        once more and reported as ADDED before watching resumes.
+
+        .. note::
+
+            Without a `resource_version` the server first reports every existing
+            resource as ADDED.
+
+        :param str resource_version: resourceVersion to start watching from
+        :param int timeout: seconds after which the watch stops (default: never)
+        :param bool relist: relist on 410 Gone instead of raising KubeRequestError
+        :returns: generator of :py:class:`~kubeshift.queries.base.WatchEvent`
+        :raises kubeshift.exceptions.KubeRequestError: if the watch fails or the relist is also expired
+        """
+        deadline = time.time() + timeout if timeout else None
+        relisted = False
+        failed = False
+
+        while True:
+            params = self._watch_params(resource_version, deadline)
+            if params is None:
+                return
+
+            received = False
+            try:
+                for event in self.client.stream('get', utils.add_params(self.url, params)):
+                    event = self._watch_event(event)
+                    received = True
+                    relisted = False
+                    resource_version = event.object.get('metadata', {}).get('resourceVersion', resource_version)
+                    yield event
+
+            except KubeConnectionError:
+                if failed and not received:
+                    raise
+                failed = not received
+                logger.debug('Watch on %s dropped; resuming from %s', self.url, resource_version)
+                continue
+
+            except KubeRequestError as ex:
+                if ex.status_code != 410 or relisted or not relist:
+                    raise
+                relisted = True
+                logger.debug('Watch on %s expired at %s; relisting', self.url, resource_version)
+                resource_version = None
+                for page in self.pages():
+                    resource_version = resource_version or page.get('metadata', {}).get('resourceVersion')
+                    for item in page.get('items', []):
+                        yield WatchEvent(WATCH_ADDED, item)
+
+            failed = False
+
+    def _watch_params(self, resource_version, deadline):
+        """Return the watch query parameters; None once the deadline passed."""
+        params = {'watch': 'true', 'resourceVersion': resource_version}
+        if deadline:
+            remaining = int(math.ceil(deadline - time.time()))
+            if remaining <= 0:
+                return None
+            params['timeoutSeconds'] = remaining
+        return params
+
+    def _watch_event(self, event):
+        """Convert a streamed event to a WatchEvent raising on ERROR events."""
+        obj = event.get('object') or {}
+        if event.get('type') == WATCH_ERROR:
+            raise KubeRequestError('Watch failed: %s' % obj.get('message'), obj.get('code'))
+        return WatchEvent(event.get('type'), obj)
+
+
+class LazyQuery(object):
+    """Compose a query sent to the server as a single request.
+
+    Each step returns a new query; nothing is requested until the results
+    are used. The list is then fetched once and kept as a snapshot from which
+    every view (iteration, :py:meth:`items`, :py:meth:`metadata`,
+    :py:meth:`filter`...) is computed.
+
+    .. code-block:: python
+
+        pods = client.pods('default').where(labels=[{'key': 'app', 'value': 'web'}],
+                                            fields={'status.phase': 'Running'}).limit(500)
+        for pod in pods.only('metadata'):
+            print(pod['metadata']['name'])
+
+    .. note::
+
+        A limited query returns the first `count` resources; the remaining
+        pages are not requested.
+
+    A query projected to `metadata` only requests the metadata of the
+    resources (see :py:meth:`Query.pages`).
+    """
+
+    def __init__(self, query, params=None, keys=None, snapshot=None):
+        """Constructor.
+
+        :param query: :py:class:`Query` of the resources
+        :param dict params: list query parameters; None when nothing can match
+        :param tuple keys: keys the resources are projected to
+        :param dict snapshot: list already fetched with the parameters
+        """
+        self.query = query
+        self.params = params
+        self.keys = keys
+        self._snapshot = snapshot
+        self._full = None
+
+    def _derive(self, **params):
+        if self.params is None:
+            return self
+        return self.__class__(self.query, dict(self.params, **params), self.keys)
+
+    def where(self, labels=None, fields=None):
+        """Select the resources by label(s) and / or field(s).
+
+        Selectors add up to those of previous calls; invalid selectors match
+        nothing (see :py:meth:`Query.by_selector` and :py:meth:`Query.pages`).
+
+        :param list labels: a list of selectors (dict) that filters resources by label(s)
+        :param str|dict|list fields: field selectors evaluated by the server
+        :rtype: LazyQuery
+        """
+        if self.params is None:
+            return self
+
+        params = {}
+        if labels is not None:
+            params['labelSelector'] = utils.selectors_to_str(labels)
+        if fields is not None:
+            params['fieldSelector'] = utils.fields_to_str(fields)
+        if None in params.values():
+            return self.__class__(self.query, None, self.keys)
+
+        for name, selector in params.items():
+            params[name] = ','.join(s for s in (self.params.get(name), selector) if s)
+        return self._derive(**params)
+
+    def limit(self, count):
+        """Return at most `count` resources.
+
+        :param int count: maximum number of resources
+        :rtype: LazyQuery
+        """
+        return self._derive(limit=count)
+
+    def at(self, resource_version):
+        """List the resources at `resource_version`.
+
+        :param str resource_version: resourceVersion the list is served at
+        :rtype: LazyQuery
+        """
+        return self._derive(resourceVersion=resource_version)
+
+    def only(self, *keys):
+        """Project the resources to the given top level keys.
+
+        The projection is applied to the snapshot so a query already fetched
+        is not requested again.
+
+        :param str keys: keys kept in each resource (e.g. `metadata`)
+        :rtype: LazyQuery
+        """
+        keys = keys or None
+        snapshot = self._snapshot
+        if self.metadata_only and not self._metadata_only(keys):
+            # the snapshot lacks the other keys
+            snapshot = None
+        return self.__class__(self.query, self.params, keys, snapshot)
+
+    @staticmethod
+    def _metadata_only(keys):
+        return bool(keys) and set(keys) == set(['metadata'])
+
+    @property
+    def metadata_only(self):
+        """Whether only the metadata of the resources is requested."""
+        return self._metadata_only(self.keys)
+
+    @property
+    def url(self):
+        """URL of the request; None when nothing can match."""
+        if self.params is None:
+            return None
+        return utils.add_params(self.query.url, self.params)
+
+    def fetch(self):
+        """Fetch the list once and return it.
+
+        :returns: the list as returned by the server
+        :rtype: dict
+        """
+        if self._snapshot is None:
+            url = self.url
+            headers = _list_headers(self.metadata_only)
+            self._snapshot = (self.query.client.request('get', url, headers=headers) or {}) if url else {}
+        return self._snapshot
+
+    def _project(self, item):
+        if not self.keys:
+            return item
+        return dict((k, item[k]) for k in self.keys if k in item)
+
+    def _items(self, snapshot, status=None):
+        return [self._project(item) for item in snapshot.get('items', [])
+                if status is None or item.get('status', {}).get('phase') == status]
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def __len__(self):
+        return len(self.fetch().get('items', []))
+
+    def items(self):
+        """Select the (projected) resources."""
+        return self._items(self.fetch())
+
+    def metadata(self):
+        """Select the metadata of the resources."""
+        return [item.get('metadata', {}) for item in self.fetch().get('items', [])]
+
+    def _with_status(self):
+        """Return the query whose snapshot holds the `status` of the resources."""
+        if not self.metadata_only:
+            return self
+        if self._full is None:
+            # metadata only snapshots lack the status; list the full resources once
+            self._full = self.__class__(self.query, self.params)
+        return self._full
+
+    def filter(self, status=None):
+        """Select the (projected) resources by `status.phase`.
+
+        A query projected to `metadata` lists the full resources (once) to
+        filter them.
+
+        :param str status: filter by `status.phase` value
+        """
+        if not status:
             return []
-        return self.client.request('get', self.url + qs).get('items', [])
+        return self._items(self._with_status().fetch(), status)
 
 
 def queryapi(version, kind, nsarg=True):
@@ -92,6 +564,6 @@ def queryapi(version, kind, nsarg=True):
             url = self._generate_url(api_version=version,
                                      kind=kind,
                                      namespace=namespace)
-            return Query(self, url)
+            return self.query_class(self, url)
         return handler
     return decorator
@@ -1,17 +1,53 @@
 """Query helpers."""
+import six
 import six.moves.urllib.parse as url_parse
 
+from kubeshift.constants import (PROPAGATION_BACKGROUND,
+                                 PROPAGATION_FOREGROUND,
+                                 PROPAGATION_ORPHAN)
+from kubeshift.exceptions import KubeShiftError
+
+
+def add_params(url, params):
+    """Append query parameters to a URL.
+
+    :param str url: url which may or may not already include a querystring
+    :param dict params: query parameters; `None` values are skipped
+    :returns: url including the encoded parameters
+    :rtype: str
+    """
+    params = sorted((k, v) for k, v in (params or {}).items() if v is not None)
+    if not params:
+        return url
+    sep = '&' if '?' in url else '?'
+    return url + sep + url_parse.urlencode(params)
 
-def selectors_to_qs(selectors):
-    """Convert list of selector dict to query string.
+
+def delete_options(propagation_policy=None):
+    """Build the DeleteOptions body of a delete request.
+
+    :param str propagation_policy: one of Foreground, Background or Orphan
+    :returns: DeleteOptions or None when no option is set
+    :rtype: dict|None
+    :raises kubeshift.exceptions.KubeShiftError: if the propagation policy is unknown
+    """
+    if propagation_policy is None:
+        return None
+    if propagation_policy not in (PROPAGATION_BACKGROUND, PROPAGATION_FOREGROUND, PROPAGATION_ORPHAN):
+        raise KubeShiftError('Unknown propagation policy: %s' % propagation_policy)
+    return {'kind': 'DeleteOptions', 'apiVersion': 'v1', 'propagationPolicy': propagation_policy}
+
+
+def selectors_to_str(selectors):
+    """Convert list of selector dict to a labelSelector value.
 
     :param list selectors: list of dicts representing selectors
-    :returns: querystring
+    :returns: labelSelector value
     :rtype: str|None
     """
-    qs = None
+    sel = None
     if not isinstance(selectors, list) or not selectors:
-        return qs
+        return sel
 
     qs_list = []
     for s in selectors:
@@ -47,7 +83,88 @@ def selectors_to_qs(selectors):
             # unknown op
             break
     else:
-        # successfully processed each selector; format as proper query string
-        qs = '?labelSelector=' + url_parse.quote_plus(','.join(qs_list))
+        # successfully processed each selector
+        sel = ','.join(qs_list)
+
+    return sel
+
+
+def fields_to_str(fields):
+    """Convert field selectors to a fieldSelector value.
+
+    Fields are given as a fieldSelector string, a dict of `field: value`
+    (equality) or a list of dicts with `key`, `value` and an optional `op`
+    (one of `=`, `==`, `!=`; default `=`).
+
+    :param str|dict|list fields: field selectors
+    :returns: fieldSelector value; None if empty or invalid
+    :rtype: str|None
+    """
+    if isinstance(fields, six.string_types):
+        return fields or None
+    if isinstance(fields, dict):
+        fields = [{'key': k, 'value': v} for k, v in sorted(fields.items())]
+    if not isinstance(fields, list) or not fields:
+        return None
+
+    qs_list = []
+    for f in fields:
+        key = f.get('key')
+        val = f.get('value')
+        op = f.get('op', '=')
+        if not key or val is None or op not in ['=', '==', '!=']:
+            return None
+        qs_list.append('{}{}{}'.format(key, op, val))
+    return ','.join(qs_list)
+
+
+def selectors_to_qs(selectors):
+    """Convert list of selector dict to query string.
+
+    :param list selectors: list of dicts representing selectors
+    :returns: querystring
+    :rtype: str|None
+    """
+    sel = selectors_to_str(selectors)
+    if sel is None:
+        return None
+    return '?labelSelector=' + url_parse.quote_plus(sel)
+
+
+def match_selectors(labels, selectors):
+    """Check labels against a list of selector dict.
+
+    Follows the same rules as :py:func:`selectors_to_qs`; missing key or unknown
+    op never matches.
+
+    :param dict labels: labels of a resource
+    :param list selectors: list of dicts representing selectors
+    :returns: True if all selectors match
+    :rtype: bool
+    """
+    if not isinstance(selectors, list) or not selectors:
+        return False
+
+    labels = labels or {}
+    for s in selectors:
+        key = s.get('key')
+        if not key:
+            return False
+        val = s.get('value')
+        if val is not None and not isinstance(val, list):
+            val = [val]
+        op = s.get('op', '=')
+
+        if op in ['=', '==', 'in']:
+            if key not in labels or (val is not None and labels[key] not in val):
+                return False
+        elif op in ['!=', 'notin']:
+            if val is None:
+                if key in labels:
+                    return False
+            elif labels.get(key) in val:
+                return False
+        else:
+            return False
 
-    return qs
+    return True
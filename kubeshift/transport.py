@@ -0,0 +1,271 @@
+"""Transport settings of the HTTP connections used by clients."""
+import calendar
+import email.utils
+import random
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import HTTPConnection
+
+from kubeshift.constants import DEFAULT_CONFLICT_RETRIES
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter enabling TCP keep-alive probes on pooled sockets."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super(_KeepAliveAdapter, self).init_poolmanager(*args, **kwargs)
+
+
+def _parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP-date) to seconds."""
+    if not value:
+        return None
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    parsed = email.utils.parsedate_tz(value)
+    if not parsed:
+        return None
+    if parsed[9] is None:
+        parsed = parsed[:9] + (0,)
+    return max(0, email.utils.mktime_tz(parsed) - calendar.timegm(time.gmtime()))
+
+
+class RetryPolicy(object):
+    """Retry failed requests with jittered exponential backoff.
+
+    Connection failures and responses with a retryable status are retried
+    for idempotent methods; POST is only retried when `retry_post` is set.
+    The `Retry-After` header of 429 and 503 responses is honoured.
+
+    Retries are counted in :py:attr:`retries` and per reason (status code or
+    `connection`) in :py:attr:`counters`.
+    """
+
+    #: methods which are safe to retry
+    IDEMPOTENT_METHODS = frozenset(['get', 'head', 'options', 'put', 'delete'])
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30,
+                 status_forcelist=(429, 500, 502, 503, 504), retry_post=False):
+        """Constructor.
+
+        :param int max_retries: maximum number of retries per request
+        :param float backoff_factor: base delay in seconds; doubled for each retry
+        :param float max_backoff: upper limit of the delay in seconds
+        :param tuple status_forcelist: status codes which are retried
+        :param bool retry_post: retry POST requests as well
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_forcelist = frozenset(status_forcelist)
+        self.methods = self.IDEMPOTENT_METHODS | (frozenset(['post']) if retry_post else frozenset())
+
+        self.retries = 0
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def is_retryable(self, method, attempt, status_code=None):
+        """Check if a request should be retried.
+
+        :param str method: request method
+        :param int attempt: number of retries done so far
+        :param int status_code: response status code (None for a connection failure)
+        :rtype: bool
+        """
+        if attempt >= self.max_retries or method.lower() not in self.methods:
+            return False
+        return status_code is None or status_code in self.status_forcelist
+
+    def backoff(self, attempt, status_code=None, retry_after=None):
+        """Return the seconds to wait before the next retry.
+
+        :param int attempt: number of retries done so far
+        :param int status_code: response status code
+        :param str retry_after: value of the Retry-After response header
+        :rtype: float
+        """
+        if status_code in (429, 503):
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def increment(self, reason):
+        """Count a retry.
+
+        :param reason: status code or `connection`
+        """
+        with self._lock:
+            self.retries += 1
+            self.counters[reason] = self.counters.get(reason, 0) + 1
+
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    """Token bucket refilled at `qps` tokens per second holding at most `burst` tokens.
+
+    Callers reserve a token and sleep until it is available, so threads
+    sharing a bucket are spread evenly at the configured rate.
+    """
+
+    def __init__(self, qps, burst=1):
+        """Constructor.
+
+        :param float qps: sustained requests per second
+        :param int burst: requests allowed at once above the sustained rate
+        """
+        self.qps = float(qps)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = _clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token returning the seconds to wait before it may be used.
+
+        :rtype: float
+        """
+        with self._lock:
+            now = _clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.qps)
+            self._last = now
+            self._tokens -= 1
+            return -self._tokens / self.qps if self._tokens < 0 else 0
+
+    def acquire(self):
+        """Take a token waiting for it when the bucket is empty.
+
+        :returns: seconds waited
+        :rtype: float
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class RateLimiter(object):
+    """Client-side rate limiter shared by all threads using a client.
+
+    Reads and writes share a single bucket unless `write_qps` is provided in
+    which case writes (post, put, patch, delete) are limited separately.
+
+    .. code-block:: python
+
+        limiter = RateLimiter(qps=20, burst=40, write_qps=5, write_burst=10)
+        client = KubernetesClient(config, transport=TransportConfig(rate_limiter=limiter))
+    """
+
+    #: methods limited by the write bucket
+    WRITE_METHODS = frozenset(['post', 'put', 'patch', 'delete'])
+
+    def __init__(self, qps=5, burst=10, write_qps=None, write_burst=None):
+        """Constructor.
+
+        :param float qps: sustained requests per second
+        :param int burst: requests allowed at once above the sustained rate
+        :param float write_qps: sustained write requests per second (default: share qps)
+        :param int write_burst: write requests allowed at once (default: burst)
+        """
+        self.read = TokenBucket(qps, burst)
+        self.write = self.read
+        if write_qps:
+            self.write = TokenBucket(write_qps, write_burst or burst)
+
+    def _bucket(self, method):
+        return self.write if method.lower() in self.WRITE_METHODS else self.read
+
+    def reserve(self, method):
+        """Take a token of the bucket matching the method without waiting.
+
+        :param str method: request method
+        :returns: seconds to wait before the token may be used
+        :rtype: float
+        """
+        return self._bucket(method).reserve()
+
+    def acquire(self, method):
+        """Wait for a token of the bucket matching the method.
+
+        :param str method: request method
+        :returns: seconds waited
+        :rtype: float
+        """
+        return self._bucket(method).acquire()
+
+
+class TransportConfig(object):
+    """Connection pooling, keep-alive and timeout settings.
+
+    The settings are applied to the client session through a mounted
+    `HTTPAdapter` so every request reuses warm connections from the pool.
+
+    .. code-block:: python
+
+        transport = TransportConfig(pool_maxsize=50, connect_timeout=5, read_timeout=30)
+        client = KubernetesClient(config, transport=transport)
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False,
+                 connect_timeout=None, read_timeout=None, keep_alive=True, tcp_keepalive=False,
+                 retry=None, rate_limiter=None, conflict_retry=None):
+        """Constructor.
+
+        :param int pool_connections: number of per host connection pools to keep
+        :param int pool_maxsize: maximum number of connections kept per host
+        :param bool pool_block: wait for a free connection instead of opening a new one above pool_maxsize
+        :param float connect_timeout: seconds to wait for a connection (default: no timeout)
+        :param float read_timeout: seconds to wait for response data (default: no timeout)
+        :param bool keep_alive: reuse connections between requests (HTTP keep-alive)
+        :param bool tcp_keepalive: enable TCP keep-alive probes on idle connections
+        :param RetryPolicy retry: retry policy for failed requests (default: no retries)
+        :param RateLimiter rate_limiter: limit the request rate (default: unlimited)
+        :param RetryPolicy conflict_retry: retries of writes rejected with 409 Conflict by upsert and update
+            (default: up to DEFAULT_CONFLICT_RETRIES with a short backoff)
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        self.tcp_keepalive = tcp_keepalive
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.conflict_retry = conflict_retry or RetryPolicy(max_retries=DEFAULT_CONFLICT_RETRIES, backoff_factor=0.1,
+                                                            max_backoff=2, status_forcelist=(409,))
+
+    @property
+    def timeout(self):
+        """Return the requests timeout value."""
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return (self.connect_timeout, self.read_timeout)
+
+    def adapter(self):
+        """Create the HTTPAdapter implementing the pool settings."""
+        cls = _KeepAliveAdapter if self.tcp_keepalive else HTTPAdapter
+        return cls(pool_connections=self.pool_connections,
+                   pool_maxsize=self.pool_maxsize,
+                   pool_block=self.pool_block)
+
+    def apply(self, session):
+        """Mount the adapter on a session for http and https.
+
+        :param session: requests.Session to configure
+        """
+        adapter = self.adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
@@ -36,6 +36,7 @@ setup(
     license="LGPL3",
     packages=find_packages(),
     install_requires=_install_requirements(),
+    extras_require={'async': ['aiohttp; python_version >= "3.6"']},
     keywords=['kubernetes', 'kubeshift', 'openshift', 'docker'],
     classifiers=[]
 )
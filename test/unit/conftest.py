@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+
+if sys.version_info < (3, 6):
+    # async syntax of the asyncio clients can not be compiled
+    collect_ignore.append('test_aio.py')
@@ -102,4 +102,13 @@ def make_response(code, content):
     r.status_code = code
     if content is not None:
         r.raw = six.BytesIO(six.b(json.dumps(content)))
+    else:
+        r.raw = six.BytesIO()
+    return r
+
+
+def make_stream_response(code, events):
+    r = requests.Response()
+    r.status_code = code
+    r.raw = six.BytesIO(six.b('\n'.join(json.dumps(e) for e in events)))
     return r
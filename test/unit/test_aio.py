@@ -0,0 +1,151 @@
+import copy
+import json
+import unittest
+
+from mock import patch
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import AioHTTPTestCase
+    from kubeshift import aio
+except ImportError:  # pragma: no cover
+    aio = None
+    AioHTTPTestCase = unittest.TestCase
+
+from kubeshift.config import Config
+from kubeshift.constants import ACCEPT_PARTIAL_METADATA, ACCEPT_TABLE
+from kubeshift.exceptions import KubeRequestError, KubeShiftError
+
+import helper
+
+
+@unittest.skipIf(aio is None, 'aiohttp is not installed')
+class TestAsyncKubernetesClient(AioHTTPTestCase):
+
+    async def get_application(self):
+        self.received = []
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        return app
+
+    async def handle(self, request):
+        body = await request.text()
+        self.received.append((request.method, request.path_qs, json.loads(body) if body else None))
+        self.accept = request.headers.get('Accept')
+
+        if request.query.get('watch'):
+            resp = web.StreamResponse()
+            await resp.prepare(request)
+            for rv, etype in [('5', 'ADDED'), ('6', 'DELETED')]:
+                event = {'type': etype, 'object': {'metadata': {'name': 'a', 'resourceVersion': rv}}}
+                await resp.write(json.dumps(event).encode('utf-8') + b'\n')
+            return resp
+
+        if request.path.endswith('/missing'):
+            return web.json_response({'kind': 'Status', 'code': 404}, status=404)
+
+        if request.method == 'GET' and request.path.endswith('/pods'):
+            if request.query.get('continue'):
+                return web.json_response({'metadata': {}, 'items': [{'metadata': {'name': 'b'}}]})
+            return web.json_response({'metadata': {'continue': 'next'}, 'items': [{'metadata': {'name': 'a'}}]})
+
+        return web.json_response({'metadata': {'name': 'test'}}, status=201 if request.method == 'POST' else 200)
+
+    def _client(self, cls=None):
+        cfg = copy.deepcopy(helper.TEST_CONFIG)
+        cfg['clusters'][0]['cluster']['server'] = str(self.server.make_url('')).rstrip('/')
+        patches = [
+            patch.object(aio.AsyncKubeBase, '_test_connection', side_effect=helper.test_connection),
+            patch.object(aio.AsyncKubeBase, '_get_groups', side_effect=helper.get_groups),
+            patch.object(aio.AsyncKubeBase, '_get_resources', side_effect=helper.get_resources),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        return (cls or aio.AsyncKubernetesClient)(Config(cfg))
+
+    def test_lazy_rejected(self):
+        with self.assertRaises(KubeShiftError):
+            aio.AsyncKubernetesClient(Config(helper.TEST_CONFIG), lazy=True)
+
+    async def test_create(self):
+        async with self._client() as client:
+            resp = await client.create({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual(resp, {'metadata': {'name': 'test'}})
+        self.assertEqual(self.received[0][:2], ('POST', '/api/v1/namespaces/default/pods'))
+        self.assertEqual(self.received[0][2]['metadata']['name'], 'test')
+
+    async def test_replace_modify_delete(self):
+        obj = {'apiVersion': 'v1', 'kind': 'ReplicationController', 'metadata': {'name': 'test'}}
+        async with self._client() as client:
+            await client.replace(obj)
+            await client.modify(obj)
+            await client.delete(obj)
+        self.assertEqual([r[0] for r in self.received], ['PUT', 'PATCH', 'PATCH', 'DELETE'])
+        self.assertEqual(self.received[0][1], '/api/v1/namespaces/default/replicationcontrollers/test')
+
+    async def test_delete_propagation(self):
+        obj = {'apiVersion': 'v1', 'kind': 'ReplicationController', 'metadata': {'name': 'test'}}
+        async with self._client() as client:
+            await client.delete(obj, propagation_policy='Foreground')
+            await client.pods().delete_all([{'key': 'app', 'value': 'web'}])
+        self.assertEqual([r[0] for r in self.received], ['DELETE', 'DELETE'])
+        self.assertEqual(self.received[0][2]['propagationPolicy'], 'Foreground')
+        self.assertTrue(self.received[1][1].startswith('/api/v1/namespaces/default/pods?labelSelector=app+in+'))
+
+    async def test_request_error(self):
+        async with self._client() as client:
+            with self.assertRaises(KubeRequestError) as ctx:
+                await client.pods().by_name('missing')
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    async def test_query_items(self):
+        async with self._client() as client:
+            query = client.pods()
+            self.assertIsInstance(query, aio.AsyncQuery)
+            names = [p['metadata']['name'] async for p in query]
+            metadata = await client.pods().metadata(page_size=1)
+        self.assertEqual(names, ['a', 'b'])
+        self.assertEqual(metadata, [{'name': 'a'}, {'name': 'b'}])
+        self.assertIn('continue=next', self.received[1][1])
+        self.assertEqual(self.accept, ACCEPT_PARTIAL_METADATA)
+
+    async def test_query_filter_fields(self):
+        async with self._client() as client:
+            items = await client.pods().filter(status='Running', fields={'spec.nodeName': 'node1'})
+        self.assertEqual(items, [{'metadata': {'name': 'a'}}])
+        self.assertTrue(self.received[0][1].startswith('/api/v1/namespaces/default/pods?fieldSelector=spec.nodeName'))
+
+    async def test_lazy_query(self):
+        async with self._client() as client:
+            query = client.pods().where(labels=[{'key': 'app'}]).limit(1).only('metadata')
+            self.assertIsInstance(query, aio.AsyncLazyQuery)
+            names = [p['metadata']['name'] async for p in query]
+            metadata = await query.metadata()
+        self.assertEqual(names, ['a'])
+        self.assertEqual(metadata, [{'name': 'a'}])
+        self.assertEqual(len(self.received), 1)
+        self.assertIn('limit=1', self.received[0][1])
+
+    async def test_table(self):
+        async with self._client() as client:
+            table = await client.pods().table(page_size=1)
+        self.assertEqual([r['cells'][0] for r in table.rows], ['a', 'b'])
+        self.assertEqual(self.accept, ACCEPT_TABLE)
+
+    async def test_watch(self):
+        async with self._client() as client:
+            events = []
+            async for event in client.pods().watch(resource_version='1'):
+                events.append(event)
+                if len(events) == 2:
+                    break
+        self.assertEqual([e.type for e in events], ['ADDED', 'DELETED'])
+        self.assertIn('resourceVersion=1', self.received[0][1])
+
+    async def test_openshift_template(self):
+        template = {'apiVersion': 'v1', 'kind': 'Template', 'metadata': {'name': 'test'}}
+        async with self._client(aio.AsyncOpenshiftClient) as client:
+            self.assertIsInstance(client.buildconfigs(), aio.AsyncQuery)
+            await client.create(template, 'default')
+        self.assertEqual(self.received[0][1], '/oapi/v1/namespaces/default/templates')
@@ -1,3 +1,8 @@
+from multiprocessing.pool import ThreadPool
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 
 from mock import patch
@@ -5,6 +10,8 @@ import requests
 
 from kubeshift.base import KubeBase
 from kubeshift.config import Config
+from kubeshift.discovery import DiscoveryCache
+from kubeshift.transport import RateLimiter, RetryPolicy, TransportConfig
 from kubeshift.exceptions import (KubeConnectionError, KubeRequestError, KubeShiftError)
 
 import helper
@@ -16,6 +23,12 @@ class FakeKubeBase(KubeBase):
 
         self.kubeconfig = Config(helper.TEST_CONFIG)
         self.base_url = self.kubeconfig.cluster.get('server')
+        self.discovery_cache = None
+        self.manifest_cache = None
+        self.transport = TransportConfig()
+        self.lazy = False
+        self._discovered = set()
+        self._discovery_lock = threading.RLock()
 
         self.session = self._connection()
         self.api_resources = {}
@@ -91,6 +104,36 @@ class TestBaseResources(unittest.TestCase):
         url = self.client._generate_url('v1', 'Pod', 'sample', None, [('labelSelector', 'name=test')])
         self.assertEqual(url, 'http://localhost:8080/api/v1/namespaces/sample/pods?labelSelector=name%3Dtest')
 
+    def test_load_group_resources_parallel(self):
+        self.client.discovery_workers = 1
+        self.client._load_group_resources('apis/')
+        sequential = self.client.api_resources
+
+        self.client.api_resources = {}
+        self.client.discovery_workers = 4
+        self.client._load_group_resources('apis/')
+        self.assertEqual(self.client.api_resources, sequential)
+        self.assertEqual(list(self.client.api_resources.keys()), list(sequential.keys()))
+
+    def test_discovery_cache(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.client.discovery_cache = DiscoveryCache(directory)
+
+        with patch.object(self.client, 'request', side_effect=lambda m, url: helper.load_resource(url)) as mock_req:
+            self.client._load_group_resources('apis/')
+            calls = mock_req.call_count
+            self.assertTrue(calls)
+            resources = self.client.api_resources
+
+            self.client.api_resources = {}
+            self.client._load_group_resources('apis/')
+            self.assertEqual(mock_req.call_count, calls)
+            self.assertEqual(self.client.api_resources, resources)
+
+            self.client.invalidate_discovery()
+            self.assertTrue(mock_req.call_count > calls)
+
 
 class TestClientBase(unittest.TestCase):
 
@@ -125,6 +168,130 @@ class TestClientBase(unittest.TestCase):
         client = KubeBase(helper.TEST_CONFIG_NO_VERIFY)
         self.assertTrue(client.api_resources)
 
+    def test_constructor_lazy(self):
+        client = KubeBase(self.config, lazy=True)
+        self.assertEqual(client.api_resources, {})
+        self.assertFalse(self.mock_tc.called)
+        self.assertFalse(self.mock_groups.called)
+        self.assertFalse(self.mock_resources.called)
+
+    def test_lazy_generate_url(self):
+        client = KubeBase(self.config, lazy=True)
+        url = client._generate_url('batch/v1', 'Job', 'default')
+        self.assertEqual(url, 'http://localhost:8080/apis/batch/v1/namespaces/default/jobs')
+        self.assertEqual(self.mock_resources.call_count, 1)
+
+        client._generate_url('batch/v1', 'Job', 'other')
+        self.assertEqual(self.mock_resources.call_count, 1)
+        self.assertEqual(list(client.api_resources.keys()), ['batch/v1'])
+
+    def test_lazy_generate_url_fail(self):
+        client = KubeBase(self.config, lazy=True)
+        with self.assertRaises(KubeShiftError):
+            client._generate_url('batch/v1', 'Fake')
+        with self.assertRaises(KubeShiftError):
+            client._generate_url('batch/v1', 'Fake')
+        self.assertEqual(self.mock_resources.call_count, 1)
+
+    def test_lazy_generate_url_unknown_group(self):
+        client = KubeBase(self.config, lazy=True)
+        with patch.object(KubeBase, '_get_resources', side_effect=KubeRequestError('not found', 404)):
+            with self.assertRaises(KubeShiftError):
+                client._generate_url('fake/v1', 'Fake')
+
+    def test_lazy_generate_url_concurrent(self):
+        client = KubeBase(self.config, lazy=True)
+
+        def slow_resources(url):
+            time.sleep(0.1)
+            return helper.get_resources(url)
+
+        with patch.object(KubeBase, '_get_resources', side_effect=slow_resources) as mock_resources:
+            pool = ThreadPool(4)
+            try:
+                urls = pool.map(lambda _: client._generate_url('v1', 'Pod', 'default'), range(4))
+            finally:
+                pool.close()
+                pool.join()
+        self.assertEqual(set(urls), set(['http://localhost:8080/api/v1/namespaces/default/pods']))
+        self.assertEqual(mock_resources.call_count, 1)
+
+    def test_lazy_generate_url_connection_error(self):
+        client = KubeBase(self.config, lazy=True)
+        with patch.object(KubeBase, '_get_resources', side_effect=KubeConnectionError('refused')):
+            with self.assertRaises(KubeConnectionError):
+                client._generate_url('batch/v1', 'Job')
+        self.assertNotIn('batch/v1', client._discovered)
+        self.assertEqual(client._generate_url('batch/v1', 'Job'), 'http://localhost:8080/apis/batch/v1/namespaces//jobs')
+
+    def test_constructor_transport(self):
+        client = KubeBase(self.config, transport=TransportConfig(pool_maxsize=25, connect_timeout=2, read_timeout=5))
+        self.assertEqual(client.session.get_adapter('http://localhost:8080')._pool_maxsize, 25)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.request('get', 'http://localhost:8080')
+            self.assertEqual(mock_req.call_args[1]['timeout'], (2, 5))
+
+    def _retry_client(self, **kwargs):
+        patched_sleep = patch('kubeshift.base.time.sleep')
+        self.addCleanup(patched_sleep.stop)
+        self.mock_sleep = patched_sleep.start()
+        return KubeBase(self.config, transport=TransportConfig(retry=RetryPolicy(**kwargs)))
+
+    def test_request_retry_status(self):
+        client = self._retry_client()
+        throttled = helper.make_response(429, None)
+        throttled.headers['Retry-After'] = '2'
+        responses = [throttled, helper.make_response(503, None), helper.make_response(200, {})]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            self.assertEqual(client.request('get', 'http://localhost:8080'), {})
+            self.assertEqual(mock_req.call_count, 3)
+        self.assertEqual(self.mock_sleep.call_args_list[0][0][0], 2)
+        self.assertEqual(client.transport.retry.retries, 2)
+        self.assertEqual(client.transport.retry.counters, {429: 1, 503: 1})
+
+    def test_request_retry_exhausted(self):
+        client = self._retry_client(max_retries=2)
+        with patch.object(client.session, 'request', side_effect=lambda *a, **kw: helper.make_response(500, None)) as mock_req:
+            with self.assertRaises(KubeRequestError) as ctx:
+                client.request('get', 'http://localhost:8080')
+            self.assertEqual(ctx.exception.status_code, 500)
+            self.assertEqual(mock_req.call_count, 3)
+
+    def test_request_retry_connection_error(self):
+        client = self._retry_client()
+        responses = [requests.exceptions.ConnectionError, helper.make_response(200, {})]
+        with patch.object(client.session, 'request', side_effect=responses):
+            self.assertEqual(client.request('delete', 'http://localhost:8080'), {})
+        self.assertEqual(client.transport.retry.counters, {'connection': 1})
+
+    def test_request_retry_ssl_error(self):
+        client = self._retry_client()
+        with patch.object(client.session, 'request', side_effect=requests.exceptions.SSLError) as mock_req:
+            with self.assertRaises(KubeConnectionError):
+                client.request('get', 'http://localhost:8080')
+            self.assertEqual(mock_req.call_count, 1)
+
+    def test_request_no_retry_post(self):
+        client = self._retry_client()
+        with patch.object(client.session, 'request', return_value=helper.make_response(503, None)) as mock_req:
+            with self.assertRaises(KubeRequestError):
+                client.request('post', 'http://localhost:8080', {})
+            self.assertEqual(mock_req.call_count, 1)
+
+    def test_request_retry_post(self):
+        client = self._retry_client(retry_post=True)
+        responses = [helper.make_response(503, None), helper.make_response(201, {})]
+        with patch.object(client.session, 'request', side_effect=responses):
+            self.assertEqual(client.request('post', 'http://localhost:8080', {}), {})
+
+    def test_request_rate_limited(self):
+        limiter = RateLimiter(qps=5, burst=5)
+        client = KubeBase(self.config, transport=TransportConfig(rate_limiter=limiter))
+        with patch.object(limiter, 'acquire', return_value=0) as mock_acquire:
+            with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
+                client.request('patch', 'http://localhost:8080', {})
+            mock_acquire.assert_called_once_with('patch')
+
     def test_request_ssl_error(self):
         client = KubeBase(self.config)
         with patch.object(client.session, 'request', side_effect=requests.exceptions.SSLError):
@@ -155,6 +322,15 @@ class TestClientBase(unittest.TestCase):
             with self.assertRaises(KubeRequestError):
                 client.request('get', 'http://localhost:8080')
 
+    def test_request_error_reason(self):
+        client = KubeBase(self.config)
+        status = {'kind': 'Status', 'reason': 'AlreadyExists', 'code': 409}
+        with patch.object(client.session, 'request', return_value=helper.make_response(409, status)):
+            with self.assertRaises(KubeRequestError) as ctx:
+                client.request('post', 'http://localhost/api/v1/namespaces/default/pods')
+        self.assertEqual(ctx.exception.status_code, 409)
+        self.assertEqual(ctx.exception.reason, 'AlreadyExists')
+
     def test_request_no_data(self):
         client = KubeBase(self.config)
         with patch.object(client.session, 'request', return_value=helper.make_response(200, None)):
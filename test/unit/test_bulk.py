@@ -0,0 +1,177 @@
+import threading
+import time
+import unittest
+
+from kubeshift import bulk
+from kubeshift.exceptions import KubeRequestError
+
+
+class TestBulkExecute(unittest.TestCase):
+
+    def test_sequential(self):
+        results = bulk.execute(lambda x: x * 2, [1, 2, 3])
+        self.assertEqual([r.result for r in results], [2, 4, 6])
+        self.assertEqual([r.object for r in results], [1, 2, 3])
+        self.assertTrue(all(r.error is None for r in results))
+
+    def test_concurrent_order(self):
+        def func(x):
+            time.sleep(0.01 * (5 - x))
+            return x
+
+        results = bulk.execute(func, range(5), concurrency=5)
+        self.assertEqual([r.result for r in results], [0, 1, 2, 3, 4])
+
+    def test_concurrency_bound(self):
+        lock = threading.Lock()
+        state = {'current': 0, 'max': 0}
+
+        def func(x):
+            with lock:
+                state['current'] += 1
+                state['max'] = max(state['max'], state['current'])
+            time.sleep(0.01)
+            with lock:
+                state['current'] -= 1
+
+        bulk.execute(func, range(12), concurrency=3)
+        self.assertLessEqual(state['max'], 3)
+        self.assertGreater(state['max'], 1)
+
+    def test_errors_reported(self):
+        def func(x):
+            if x == 1:
+                raise KubeRequestError('failed', 409)
+            return x
+
+        results = bulk.execute(func, [0, 1, 2], concurrency=2)
+        self.assertEqual([r.result for r in results], [0, None, 2])
+        self.assertIsInstance(results[1].error, KubeRequestError)
+
+    def test_fail_fast(self):
+        calls = []
+
+        def func(x):
+            calls.append(x)
+            if x == 1:
+                raise KubeRequestError('failed', 409)
+            return x
+
+        with self.assertRaises(KubeRequestError):
+            bulk.execute(func, [0, 1, 2, 3], fail_fast=True)
+        self.assertEqual(calls, [0, 1])
+
+    def test_streaming(self):
+        events = []
+
+        def objects():
+            for i in range(4):
+                events.append('parsed %d' % i)
+                yield i
+
+        def func(x):
+            events.append('called %d' % x)
+            return x
+
+        results = bulk.execute(func, objects())
+        self.assertEqual([r.result for r in results], [0, 1, 2, 3])
+        self.assertEqual(events[:2], ['parsed 0', 'called 0'])
+
+    def test_streaming_concurrent(self):
+        events = []
+
+        def objects():
+            for i in range(6):
+                events.append('parsed')
+                yield i
+
+        def func(x):
+            events.append('called')
+            return x
+
+        results = bulk.execute(func, objects(), concurrency=2)
+        self.assertEqual([r.result for r in results], list(range(6)))
+        self.assertLessEqual(events.index('called'), 3)
+
+    def test_streaming_fail_fast(self):
+        parsed = []
+
+        def objects():
+            for i in range(4):
+                parsed.append(i)
+                yield i
+
+        def func(x):
+            raise KubeRequestError('failed', 409)
+
+        with self.assertRaises(KubeRequestError):
+            bulk.execute(func, objects(), fail_fast=True)
+        self.assertEqual(parsed, [0])
+
+    def test_unexpected_error_raised(self):
+        def func(x):
+            raise ValueError(x)
+
+        with self.assertRaises(ValueError):
+            bulk.execute(func, [0, 1], concurrency=2)
+
+
+class TestBulkPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.objs = [
+            {'kind': 'Deployment', 'metadata': {'name': 'web'}},
+            {'kind': 'Service', 'metadata': {'name': 'web'}},
+            {'kind': 'RoleBinding', 'metadata': {'name': 'web'}},
+            {'kind': 'ServiceAccount', 'metadata': {'name': 'web'}},
+            {'kind': 'Role', 'metadata': {'name': 'web'}},
+            {'kind': 'CustomResourceDefinition', 'metadata': {'name': 'crontabs'}},
+            {'kind': 'Namespace', 'metadata': {'name': 'web'}},
+            {'kind': 'CronTab', 'metadata': {'name': 'tab'}},
+        ]
+
+    def test_plan(self):
+        waves = bulk.plan(self.objs)
+        kinds = [[obj['kind'] for _, obj in wave] for wave in waves]
+        self.assertEqual(kinds, [['Namespace'],
+                                 ['CustomResourceDefinition'],
+                                 ['ServiceAccount', 'Role'],
+                                 ['Service', 'RoleBinding'],
+                                 ['Deployment', 'CronTab']])
+        self.assertEqual([index for index, _ in waves[2]], [3, 4])
+
+    def test_plan_reverse(self):
+        waves = bulk.plan(self.objs, reverse=True)
+        self.assertEqual(waves[0][0][1]['kind'], 'Deployment')
+        self.assertEqual(waves[-1][0][1]['kind'], 'Namespace')
+
+    def test_plan_skips_empty_waves(self):
+        waves = bulk.plan([{'kind': 'Pod'}, {'kind': 'Namespace'}])
+        self.assertEqual(len(waves), 2)
+
+    def test_execute_ordered(self):
+        calls = []
+        lock = threading.Lock()
+
+        def func(obj):
+            with lock:
+                calls.append(obj['kind'])
+            return obj['kind']
+
+        results = bulk.execute(func, self.objs, concurrency=4, ordered=True)
+        self.assertEqual([r.result for r in results], [obj['kind'] for obj in self.objs])
+        self.assertEqual(calls[0], 'Namespace')
+        self.assertEqual(calls[1], 'CustomResourceDefinition')
+        self.assertEqual(set(calls[-2:]), set(['Deployment', 'CronTab']))
+
+    def test_execute_ordered_fail_fast(self):
+        calls = []
+
+        def func(obj):
+            calls.append(obj['kind'])
+            if obj['kind'] == 'Namespace':
+                raise KubeRequestError('forbidden', 403)
+
+        with self.assertRaises(KubeRequestError):
+            bulk.execute(func, self.objs, concurrency=4, fail_fast=True, ordered=True)
+        self.assertEqual(calls, ['Namespace'])
@@ -0,0 +1,130 @@
+import threading
+import unittest
+
+from kubeshift.cache import DEFAULT_INDEXERS, Store, object_key
+
+
+def _obj(name, namespace=None, rv='1'):
+    meta = {'name': name, 'resourceVersion': rv}
+    if namespace:
+        meta['namespace'] = namespace
+    return {'metadata': meta}
+
+
+class TestStore(unittest.TestCase):
+
+    def test_object_key(self):
+        self.assertEqual(object_key(_obj('a', 'ns')), 'ns/a')
+        self.assertEqual(object_key(_obj('a')), 'a')
+
+    def test_add_get_delete(self):
+        store = Store()
+        self.assertIsNone(store.add(_obj('a', 'ns')))
+        self.assertEqual(len(store), 1)
+        self.assertIn('ns/a', store)
+        self.assertEqual(store.get('a', 'ns'), _obj('a', 'ns'))
+        self.assertIsNone(store.get('a'))
+
+        old = store.add(_obj('a', 'ns', '2'))
+        self.assertEqual(old['metadata']['resourceVersion'], '1')
+
+        self.assertEqual(store.delete(_obj('a', 'ns'))['metadata']['resourceVersion'], '2')
+        self.assertIsNone(store.delete(_obj('a', 'ns')))
+        self.assertEqual(len(store), 0)
+
+    def test_list_namespace(self):
+        store = Store()
+        store.add(_obj('a', 'one'))
+        store.add(_obj('b', 'two'))
+        self.assertEqual(len(store.list()), 2)
+        self.assertEqual(store.list('two'), [_obj('b', 'two')])
+
+    def test_replace(self):
+        store = Store()
+        store.add(_obj('a'))
+        store.add(_obj('b'))
+        added, updated, deleted = store.replace([_obj('b', rv='2'), _obj('c')])
+        self.assertEqual(added, [_obj('c')])
+        self.assertEqual(updated, [(_obj('b'), _obj('b', rv='2'))])
+        self.assertEqual(deleted, [_obj('a')])
+        self.assertEqual(sorted(o['metadata']['name'] for o in store.list()), ['b', 'c'])
+
+    def test_replace_concurrent_reads(self):
+        store = Store(DEFAULT_INDEXERS)
+        objs = [_obj('o%d' % i, 'default') for i in range(200)]
+        store.replace(objs)
+        stop = threading.Event()
+        misses = []
+
+        def read():
+            while not stop.is_set():
+                if store.get('o150', 'default') is None or len(store) != 200 or 'default/o199' not in store:
+                    misses.append(True)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for _ in range(200):
+                store.replace(objs)
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(misses, [])
+
+
+def _pod(name, node=None, labels=None, owner=None):
+    obj = _obj(name, 'default')
+    obj['metadata']['labels'] = labels or {}
+    if owner:
+        obj['metadata']['ownerReferences'] = [{'kind': 'ReplicaSet', 'uid': owner}]
+    obj['spec'] = {'nodeName': node} if node else {}
+    return obj
+
+
+class TestStoreIndexers(unittest.TestCase):
+
+    def setUp(self):
+        self.store = Store(DEFAULT_INDEXERS)
+
+    def _names(self, objs):
+        return sorted(o['metadata']['name'] for o in objs)
+
+    def test_default_indexers(self):
+        self.store.add(_pod('a', node='n1', labels={'app': 'web'}, owner='rs1'))
+        self.store.add(_pod('b', node='n2', labels={'app': 'web'}, owner='rs1'))
+        self.store.add(_pod('c', node='n1', labels={'app': 'db'}))
+
+        self.assertEqual(self._names(self.store.by_index('node', 'n1')), ['a', 'c'])
+        self.assertEqual(self._names(self.store.by_index('owner', 'rs1')), ['a', 'b'])
+        self.assertEqual(self._names(self.store.by_index('label', 'app=web')), ['a', 'b'])
+        self.assertEqual(self._names(self.store.by_index('namespace', 'default')), ['a', 'b', 'c'])
+        self.assertEqual(self._names(self.store.list('default')), ['a', 'b', 'c'])
+        self.assertEqual(self.store.by_index('node', 'n3'), [])
+        self.assertEqual(sorted(self.store.index_values('node')), ['n1', 'n2'])
+
+    def test_update_reindexes(self):
+        self.store.add(_pod('a', node='n1'))
+        self.store.add(_pod('a', node='n2'))
+        self.assertEqual(self.store.by_index('node', 'n1'), [])
+        self.assertEqual(self._names(self.store.by_index('node', 'n2')), ['a'])
+        self.assertEqual(self.store.index_values('node'), ['n2'])
+
+    def test_delete_unindexes(self):
+        self.store.add(_pod('a', node='n1'))
+        self.store.delete(_pod('a'))
+        self.assertEqual(self.store.by_index('node', 'n1'), [])
+        self.assertEqual(self.store.index_values('node'), [])
+
+    def test_replace_reindexes(self):
+        self.store.add(_pod('a', node='n1'))
+        self.store.replace([_pod('b', node='n2')])
+        self.assertEqual(self.store.index_values('node'), ['n2'])
+
+    def test_add_indexer(self):
+        self.store.add(_pod('a', labels={'tier': 'front'}))
+        self.store.add_indexer('tier', lambda o: [o['metadata']['labels'].get('tier')])
+        self.assertEqual(self._names(self.store.by_index('tier', 'front')), ['a'])
+
+    def test_unknown_index(self):
+        with self.assertRaises(KeyError):
+            self.store.by_index('fake', 'x')
@@ -0,0 +1,136 @@
+import unittest
+
+from kubeshift import diff
+
+
+class TestJsonPatch(unittest.TestCase):
+
+    def setUp(self):
+        self.live = {
+            'apiVersion': 'v1', 'kind': 'Pod',
+            'metadata': {'name': 'web', 'resourceVersion': '10',
+                         'annotations': {'kubeshift.io/applied-hash': 'abc'}},
+            'spec': {
+                'containers': [
+                    {'name': 'web', 'image': 'nginx:1.10', 'terminationMessagePath': '/dev/termination-log',
+                     'env': [{'name': 'A', 'value': '1'}, {'name': 'B', 'value': '2'}]},
+                    {'name': 'sidecar', 'image': 'proxy:1', 'args': ['-v']},
+                ],
+                'restartPolicy': 'Always',
+            },
+            'status': {'phase': 'Running'},
+        }
+        self.desired = {
+            'apiVersion': 'v1', 'kind': 'Pod',
+            'metadata': {'name': 'web', 'annotations': {'kubeshift.io/applied-hash': 'abc'}},
+            'spec': {
+                'containers': [
+                    {'name': 'sidecar', 'image': 'proxy:1', 'args': ['-v']},
+                    {'name': 'web', 'image': 'nginx:1.10',
+                     'env': [{'name': 'B', 'value': '2'}, {'name': 'A', 'value': '1'}]},
+                ],
+            },
+        }
+
+    def test_unchanged(self):
+        self.assertEqual(diff.json_patch(self.live, self.desired), [])
+        self.assertEqual(diff.merge_patch(self.live, self.desired), {})
+        self.assertEqual(diff.minimal_patch(self.live, self.desired), ('json', []))
+
+    def test_replace_keyed_list_item(self):
+        self.desired['spec']['containers'][1]['image'] = 'nginx:1.11'
+        self.assertEqual(diff.json_patch(self.live, self.desired),
+                         [{'op': 'test', 'path': '/spec/containers/0/name', 'value': 'web'},
+                          {'op': 'replace', 'path': '/spec/containers/0/image', 'value': 'nginx:1.11'}])
+
+    def test_add_keyed_list_item(self):
+        self.desired['spec']['containers'][1]['env'].append({'name': 'C', 'value': '3'})
+        self.assertEqual(diff.json_patch(self.live, self.desired),
+                         [{'op': 'test', 'path': '/spec/containers/0/name', 'value': 'web'},
+                          {'op': 'add', 'path': '/spec/containers/0/env/-', 'value': {'name': 'C', 'value': '3'}}])
+
+    def test_remove_keyed_list_item(self):
+        del self.desired['spec']['containers'][0]
+        self.assertEqual(diff.json_patch(self.live, self.desired), [])
+        self.assertIn({'op': 'remove', 'path': '/spec/containers/1'},
+                      diff.json_patch(self.live, self.desired, prune=True))
+
+    def test_prune_removes_in_reverse_order(self):
+        live = {'items': [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}]}
+        desired = {'items': [{'name': 'b'}]}
+        self.assertEqual(diff.json_patch(live, desired, prune=True),
+                         [{'op': 'test', 'path': '/items/2/name', 'value': 'c'}, {'op': 'remove', 'path': '/items/2'},
+                          {'op': 'test', 'path': '/items/0/name', 'value': 'a'}, {'op': 'remove', 'path': '/items/0'}])
+
+    def test_unkeyed_list(self):
+        self.desired['spec']['containers'][0]['args'] = ['-v', '-d']
+        self.assertEqual(diff.json_patch(self.live, self.desired)[1:],
+                         [{'op': 'replace', 'path': '/spec/containers/1/args', 'value': ['-v', '-d']}])
+
+        self.desired['spec']['containers'][0]['args'] = ['-d']
+        self.assertEqual(diff.json_patch(self.live, self.desired)[1:],
+                         [{'op': 'replace', 'path': '/spec/containers/1/args/0', 'value': '-d'}])
+
+    def test_add_field(self):
+        self.desired['metadata']['labels'] = {'app': 'web'}
+        self.assertEqual(diff.json_patch(self.live, self.desired),
+                         [{'op': 'add', 'path': '/metadata/labels', 'value': {'app': 'web'}}])
+
+    def test_escape_path(self):
+        self.desired['metadata']['annotations']['kubeshift.io/applied-hash'] = 'def'
+        self.assertEqual(diff.json_patch(self.live, self.desired),
+                         [{'op': 'replace', 'path': '/metadata/annotations/kubeshift.io~1applied-hash',
+                           'value': 'def'}])
+
+    def test_prune(self):
+        ops = diff.json_patch(self.live, self.desired, prune=True)
+        self.assertIn({'op': 'remove', 'path': '/status'}, ops)
+        self.assertIn({'op': 'remove', 'path': '/spec/restartPolicy'}, ops)
+
+    def test_bool_is_not_int(self):
+        self.assertEqual(diff.json_patch({'a': 1}, {'a': True}), [{'op': 'replace', 'path': '/a', 'value': True}])
+
+
+class TestMergePatch(unittest.TestCase):
+
+    def test_merge_patch(self):
+        live = {'data': {'a': '1', 'b': '2'}, 'metadata': {'name': 'cfg', 'uid': '1'}}
+        desired = {'data': {'a': '1', 'b': '3', 'c': '4'}, 'metadata': {'name': 'cfg'}}
+        self.assertEqual(diff.merge_patch(live, desired), {'data': {'b': '3', 'c': '4'}})
+
+    def test_merge_patch_prune(self):
+        live = {'data': {'a': '1', 'b': '2'}}
+        desired = {'data': {'a': '1'}}
+        self.assertEqual(diff.merge_patch(live, desired, prune=True), {'data': {'b': None}})
+
+    def test_merge_patch_list(self):
+        live = {'spec': {'ports': [{'name': 'http', 'port': 80, 'protocol': 'TCP'}]}}
+        desired = {'spec': {'ports': [{'name': 'http', 'port': 8080}]}}
+        self.assertEqual(diff.merge_patch(live, desired), desired)
+
+    def test_minimal_patch(self):
+        live = {'data': dict(('key%d' % i, 'value') for i in range(5))}
+        desired = {'data': dict(('key%d' % i, 'changed') for i in range(5))}
+        self.assertEqual(diff.minimal_patch(live, desired), ('merge', desired))
+
+        desired = {'data': dict(live['data'], key0='changed')}
+        self.assertEqual(diff.minimal_patch(live, desired)[0], 'merge')
+
+        live = {'spec': {'containers': [{'name': 'a', 'image': 'x', 'args': ['1', '2', '3']}]}}
+        desired = {'spec': {'containers': [{'name': 'a', 'image': 'y', 'args': ['1', '2', '3']}]}}
+        self.assertEqual(diff.minimal_patch(live, desired),
+                         ('json', [{'op': 'test', 'path': '/spec/containers/0/name', 'value': 'a'},
+                                   {'op': 'replace', 'path': '/spec/containers/0/image', 'value': 'y'}]))
+
+    def test_minimal_patch_keeps_list_items(self):
+        live = {'spec': {'containers': [{'name': 'a', 'image': 'old', 'ports': [{'containerPort': 80}]},
+                                        {'name': 'b', 'image': 'proxy'}]}}
+        desired = {'spec': {'containers': [{'name': 'a', 'image': 'new'}]}}
+        self.assertEqual(diff.minimal_patch(live, desired),
+                         ('json', [{'op': 'test', 'path': '/spec/containers/0/name', 'value': 'a'},
+                                   {'op': 'replace', 'path': '/spec/containers/0/image', 'value': 'new'}]))
+
+    def test_minimal_patch_replaced_list(self):
+        live = {'spec': {'args': ['-a', '-b', '-c', '-d']}, 'data': dict(('key%d' % i, 'v') for i in range(5))}
+        desired = {'spec': {'args': ['-a']}, 'data': dict(('key%d' % i, 'changed') for i in range(5))}
+        self.assertEqual(diff.minimal_patch(live, desired)[0], 'merge')
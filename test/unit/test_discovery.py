@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from kubeshift.discovery import DiscoveryCache
+
+
+class TestDiscoveryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.cache = DiscoveryCache(self.directory, ttl=60)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('http://localhost:8080/api/v1/'))
+
+    def test_set_get(self):
+        self.cache.set('http://localhost:8080/apis/batch/v1', {'resources': []})
+        self.assertEqual(self.cache.get('http://localhost:8080/apis/batch/v1'), {'resources': []})
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'localhost_8080', 'apis', 'batch', 'v1',
+                                                    'serverresources.json')))
+        self.assertIsNone(self.cache.get('http://otherhost:8080/apis/batch/v1'))
+
+    def test_expired(self):
+        url = 'http://localhost:8080/api/v1/'
+        self.cache.set(url, {'resources': []})
+        path = self.cache._path(url)
+        old = time.time() - 120
+        os.utime(path, (old, old))
+        self.assertIsNone(self.cache.get(url))
+
+    def test_invalidate_server(self):
+        self.cache.set('http://localhost:8080/api/v1/', {'resources': []})
+        self.cache.set('http://otherhost:8080/api/v1/', {'resources': []})
+        self.cache.invalidate('http://localhost:8080')
+        self.assertIsNone(self.cache.get('http://localhost:8080/api/v1/'))
+        self.assertIsNotNone(self.cache.get('http://otherhost:8080/api/v1/'))
+
+    def test_invalidate_all(self):
+        self.cache.set('http://localhost:8080/api/v1/', {'resources': []})
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get('http://localhost:8080/api/v1/'))
+
+    def test_unwritable(self):
+        cache = DiscoveryCache('/dev/null/cache')
+        cache.set('http://localhost:8080/api/v1/', {'resources': []})
+        self.assertIsNone(cache.get('http://localhost:8080/api/v1/'))
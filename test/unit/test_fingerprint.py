@@ -0,0 +1,49 @@
+import unittest
+
+from kubeshift import fingerprint
+from kubeshift.constants import APPLIED_HASH_ANNOTATION
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = {'apiVersion': 'v1', 'kind': 'ConfigMap',
+                    'metadata': {'name': 'test', 'labels': {'app': 'test'}},
+                    'data': {'a': '1', 'b': '2'}}
+
+    def test_normalize(self):
+        live = fingerprint.annotate(self.obj, 'abc')
+        live['metadata'].update({'uid': '1234', 'resourceVersion': '10', 'creationTimestamp': 'now'})
+        live['status'] = {'phase': 'Active'}
+        self.assertEqual(fingerprint.normalize(live), self.obj)
+
+    def test_normalize_copy(self):
+        live = fingerprint.annotate(self.obj, 'abc')
+        fingerprint.normalize(live)
+        self.assertEqual(fingerprint.applied_hash(live), 'abc')
+
+    def test_content_hash_key_order(self):
+        other = {'data': {'b': '2', 'a': '1'}, 'kind': 'ConfigMap', 'apiVersion': 'v1',
+                 'metadata': {'labels': {'app': 'test'}, 'name': 'test'}}
+        self.assertEqual(fingerprint.content_hash(self.obj), fingerprint.content_hash(other))
+
+    def test_content_hash_changed(self):
+        other = fingerprint.normalize(self.obj)
+        other['data']['a'] = '3'
+        self.assertNotEqual(fingerprint.content_hash(self.obj), fingerprint.content_hash(other))
+
+    def test_content_hash_live(self):
+        digest = fingerprint.content_hash(self.obj)
+        live = fingerprint.annotate(self.obj, digest)
+        live['metadata']['resourceVersion'] = '10'
+        self.assertEqual(fingerprint.content_hash(live), digest)
+
+    def test_annotate(self):
+        obj = fingerprint.annotate(self.obj, 'abc')
+        self.assertEqual(obj['metadata']['annotations'], {APPLIED_HASH_ANNOTATION: 'abc'})
+        self.assertNotIn('annotations', self.obj['metadata'])
+        self.assertEqual(fingerprint.applied_hash(obj), 'abc')
+
+    def test_applied_hash_missing(self):
+        self.assertIsNone(fingerprint.applied_hash(self.obj))
+        self.assertIsNone(fingerprint.applied_hash({'metadata': {'annotations': None}}))
@@ -0,0 +1,101 @@
+import unittest
+
+from kubeshift.exceptions import KubeRequestError
+from kubeshift.informer import Informer
+from kubeshift.queries.base import WatchEvent
+
+
+def _obj(name, rv, labels=None):
+    return {'metadata': {'name': name, 'namespace': 'default', 'resourceVersion': rv, 'labels': labels or {}}}
+
+
+class FakeQuery(object):
+
+    url = 'http://localhost:8080/api/v1/namespaces/default/pods'
+
+    def __init__(self, pages, watches):
+        self._pages = list(pages)
+        self._watches = list(watches)
+        self.informer = None
+        self.watched = []
+
+    def pages(self, page_size=None):
+        for page in self._pages.pop(0):
+            yield page
+
+    def watch(self, resource_version=None, timeout=None, relist=True):
+        self.watched.append(resource_version)
+        events = self._watches.pop(0)
+        if isinstance(events, Exception):
+            raise events
+        for event in events:
+            yield event
+        if not self._watches:
+            self.informer.stop()
+
+
+class TestInformer(unittest.TestCase):
+
+    def _informer(self, pages, watches):
+        query = FakeQuery(pages, watches)
+        informer = Informer(query)
+        query.informer = informer
+        return informer
+
+    def test_list_and_watch(self):
+        informer = self._informer(
+            [[{'metadata': {'resourceVersion': '10'}, 'items': [_obj('a', '1', {'app': 'x'}), _obj('b', '2')]}]],
+            [[WatchEvent('MODIFIED', _obj('a', '11', {'app': 'y'})),
+              WatchEvent('DELETED', _obj('b', '12')),
+              WatchEvent('ADDED', _obj('c', '13', {'app': 'y'}))]])
+        seen = []
+        informer.add_handler(on_add=lambda o: seen.append(('add', o['metadata']['name'])),
+                             on_update=lambda old, new: seen.append(('update', new['metadata']['name'])),
+                             on_delete=lambda o: seen.append(('delete', o['metadata']['name'])))
+        informer.run()
+
+        self.assertTrue(informer.synced)
+        self.assertEqual(informer.query.watched, ['10'])
+        self.assertEqual(seen, [('add', 'a'), ('add', 'b'), ('update', 'a'), ('delete', 'b'), ('add', 'c')])
+        self.assertEqual(informer.get('a', 'default')['metadata']['resourceVersion'], '11')
+        self.assertIsNone(informer.get('b', 'default'))
+        self.assertEqual(len(informer.list('default')), 2)
+        self.assertEqual(sorted(o['metadata']['name'] for o in informer.by_selector([{'key': 'app', 'value': 'y'}])),
+                         ['a', 'c'])
+
+    def test_relist_on_gone(self):
+        informer = self._informer(
+            [[{'metadata': {'resourceVersion': '10'}, 'items': [_obj('a', '1'), _obj('b', '2')]}],
+             [{'metadata': {'resourceVersion': '20'}, 'items': [_obj('b', '15')]}]],
+            [KubeRequestError('gone', 410), []])
+        deleted = []
+        informer.add_handler(on_delete=lambda o: deleted.append(o['metadata']['name']))
+        informer._stopped.wait = lambda timeout: None
+        informer.run()
+
+        self.assertEqual(informer.query.watched, ['10', '20'])
+        self.assertEqual(deleted, ['a'])
+        self.assertEqual(informer.get('b', 'default')['metadata']['resourceVersion'], '15')
+
+    def test_handler_errors_ignored(self):
+        informer = self._informer([[{'metadata': {}, 'items': [_obj('a', '1')]}]], [[]])
+
+        def broken(obj):
+            raise ValueError(obj)
+
+        informer.add_handler(on_add=broken)
+        informer.run()
+        self.assertEqual(len(informer.list()), 1)
+
+    def test_by_index_and_selector(self):
+        pods = [_obj('a', '1', {'app': 'web', 'tier': 'front'}), _obj('b', '2', {'app': 'web'}), _obj('c', '3', {'app': 'db'})]
+        pods[0]['spec'] = {'nodeName': 'n1'}
+        informer = self._informer([[{'metadata': {}, 'items': pods}]], [[]])
+        informer.run()
+
+        self.assertEqual([o['metadata']['name'] for o in informer.by_index('node', 'n1')], ['a'])
+        names = lambda objs: sorted(o['metadata']['name'] for o in objs)  # noqa
+        self.assertEqual(names(informer.by_selector([{'key': 'app', 'value': ['web', 'db'], 'op': 'in'}])), ['a', 'b', 'c'])
+        self.assertEqual(names(informer.by_selector([{'key': 'app', 'value': 'web'}, {'key': 'tier', 'op': '!='}])), ['b'])
+        self.assertEqual(names(informer.by_selector([{'key': 'tier'}])), ['a'])
+        self.assertEqual(informer.by_selector(None), [])
@@ -3,9 +3,12 @@ import unittest
 
 from mock import patch
 
+from kubeshift import fingerprint
+from kubeshift.cache import Store
 from kubeshift.kubernetes import KubernetesClient
 from kubeshift.config import Config
 from kubeshift.exceptions import KubeRequestError, KubeShiftError
+from kubeshift.transport import RetryPolicy, TransportConfig
 
 import helper
 
@@ -53,6 +56,33 @@ class TestKubernetesClient(unittest.TestCase):
             except KubeRequestError:
                 self.fail('delete raised KubeRequestError unexpectedly')
 
+    def test_delete_propagation_policy(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.delete({'apiVersion': 'v1', 'kind': 'ReplicationController', 'metadata': {'name': 'test'}},
+                          propagation_policy='Background')
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertEqual(mock_req.call_args[0][0], 'delete')
+        self.assertEqual(mock_req.call_args[1]['json']['propagationPolicy'], 'Background')
+
+    def test_delete_propagation_policy_invalid(self):
+        client = KubernetesClient(self.config)
+        with self.assertRaises(KubeShiftError):
+            client.delete({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}}, propagation_policy='All')
+
+    def test_delete_accepted(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(202, {'kind': 'Pod'})):
+            resp = client.delete({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}},
+                                 propagation_policy='Foreground')
+        self.assertEqual(resp, {'kind': 'Pod'})
+
+    def test_delete_by_file_propagation_policy(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.delete_by_file(os.path.join(FIXTURE_DIR, 'yaml', 'es-rc.yaml'), propagation_policy='Foreground')
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['delete', 'delete'])
+
     def test_scale(self):
         client = KubernetesClient(self.config)
         with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
@@ -102,6 +132,347 @@ class TestKubernetesClient(unittest.TestCase):
             except KubeRequestError:
                 self.fail('create raised KubeRequestError unexpectedly')
 
+    def test_create_by_file_directory(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            resp = client.create_by_file(os.path.join(FIXTURE_DIR, 'json'))
+            self.assertEqual(len(resp), 2)
+            self.assertEqual(mock_req.call_count, 2)
+
+    def test_create_by_file_glob(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            resp = client.create_by_file(os.path.join(FIXTURE_DIR, 'yaml', '*.yaml'))
+            self.assertEqual(len(resp), 3)
+            self.assertEqual(mock_req.call_count, 3)
+
+    def test_parse_workers(self):
+        self.assertEqual(KubernetesClient(self.config).parse_workers, 1)
+        client = KubernetesClient(self.config, parse_workers=4)
+        self.assertEqual(client.parse_workers, 4)
+        with patch('kubeshift.manifest.load_paths', return_value=iter([])) as mock_load:
+            client.create_by_file(os.path.join(FIXTURE_DIR, 'yaml', '*.yaml'))
+        self.assertEqual(mock_load.call_args[0][1], 4)
+
+    def test_create_by_file_concurrency(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            resp = client.create_by_file(os.path.join(FIXTURE_DIR, 'yaml', 'es-rc.yaml'), concurrency=2)
+            self.assertEqual(len(resp), 2)
+            self.assertEqual(mock_req.call_count, 2)
+
+    def test_create_by_file_request_error(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(409, {})) as mock_req:
+            with self.assertRaises(KubeRequestError):
+                client.create_by_file(os.path.join(FIXTURE_DIR, 'yaml', 'es-rc.yaml'))
+            self.assertEqual(mock_req.call_count, 1)
+
+    def test_bulk(self):
+        client = KubernetesClient(self.config)
+        objs = [{'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test%d' % i}} for i in range(4)]
+        responses = [helper.make_response(200, {'n': 0}), helper.make_response(409, {}),
+                     helper.make_response(200, {'n': 2}), helper.make_response(200, {'n': 3})]
+        with patch.object(client.session, 'request', side_effect=responses):
+            results = client.bulk('create', objs)
+        self.assertEqual([r.object for r in results], objs)
+        self.assertEqual(results[0].result, {'n': 0})
+        self.assertIsInstance(results[1].error, KubeRequestError)
+        self.assertEqual(results[3].result, {'n': 3})
+
+    def test_bulk_concurrency(self):
+        client = KubernetesClient(self.config)
+        objs = [{'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test%d' % i}} for i in range(6)]
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            results = client.bulk('delete', objs, namespace='test', concurrency=3)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(mock_req.call_count, 6)
+        self.assertTrue(all(r.error is None for r in results))
+
+    def test_bulk_delete_ordered(self):
+        client = KubernetesClient(self.config)
+        objs = [{'apiVersion': 'v1', 'kind': 'Namespace', 'metadata': {'name': 'test'}},
+                {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test', 'namespace': 'test'}}]
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.bulk('delete', objs)
+        urls = [c[0][1] for c in mock_req.call_args_list]
+        self.assertEqual(urls, ['http://localhost:8080/api/v1/namespaces/test/pods/test',
+                                'http://localhost:8080/api/v1/namespaces/test'])
+
+    def test_apply_create(self):
+        client = KubernetesClient(self.config)
+        obj = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}}
+        with patch.object(client.session, 'request',
+                          side_effect=[helper.make_response(404, {}), helper.make_response(201, {})]) as mock_req:
+            client.apply(obj)
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['get', 'post'])
+        sent = mock_req.call_args[1]['json']
+        self.assertEqual(fingerprint.applied_hash(sent), fingerprint.content_hash(obj))
+
+    def test_apply_unchanged(self):
+        client = KubernetesClient(self.config)
+        obj = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}}
+        live = fingerprint.annotate(obj, fingerprint.content_hash(obj))
+        live['metadata']['resourceVersion'] = '10'
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, live)) as mock_req:
+            self.assertEqual(client.apply(obj), live)
+        self.assertEqual(mock_req.call_count, 1)
+
+    def test_apply_changed(self):
+        client = KubernetesClient(self.config)
+        obj = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}}
+        live = fingerprint.annotate(obj, 'outdated')
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.apply(obj, live=live)
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertEqual(mock_req.call_args[0][0], 'patch')
+
+    def test_apply_minimal_patch(self):
+        client = KubernetesClient(self.config)
+        obj = {'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': 'test'}, 'data': {'a': '2'}}
+        live = {'metadata': {'name': 'test', 'uid': '1', 'annotations': {}}, 'data': {'a': '1'}}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.apply(obj, live=live)
+        headers = mock_req.call_args[1]['headers']
+        self.assertEqual(headers['Content-Type'], 'application/merge-patch+json')
+        self.assertEqual(mock_req.call_args[1]['json'], {
+            'data': {'a': '2'},
+            'metadata': {'annotations': {'kubeshift.io/applied-hash': fingerprint.content_hash(obj)}}})
+
+    def test_patch(self):
+        client = KubernetesClient(self.config)
+        ops = [{'op': 'replace', 'path': '/spec/replicas', 'value': 2}]
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.patch({'apiVersion': 'v1', 'kind': 'ReplicationController', 'metadata': {'name': 'test'}}, ops)
+        self.assertEqual(mock_req.call_args[1]['json'], ops)
+        self.assertEqual(mock_req.call_args[1]['headers'], {'Content-Type': 'application/json-patch+json'})
+
+    def test_patch_unsupported(self):
+        client = KubernetesClient(self.config)
+        with self.assertRaises(KubeShiftError):
+            client.patch({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}}, {}, patch_type='xml')
+
+    def test_modify_live(self):
+        client = KubernetesClient(self.config)
+        partial = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test', 'labels': {'a': 'b'}}}
+        live = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test', 'uid': '1'}}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.modify(partial, live=live)
+        self.assertEqual(mock_req.call_args[1]['json'], {'metadata': {'labels': {'a': 'b'}}})
+        self.assertEqual(mock_req.call_args[1]['headers'], {'Content-Type': 'application/merge-patch+json'})
+
+    def test_modify_live_keeps_other_containers(self):
+        client = KubernetesClient(self.config)
+        partial = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'},
+                   'spec': {'containers': [{'name': 'a', 'image': 'new'}]}}
+        live = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test', 'uid': '1'},
+                'spec': {'containers': [{'name': 'a', 'image': 'old', 'ports': [{'containerPort': 80}]},
+                                        {'name': 'b', 'image': 'proxy'}]}}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.modify(partial, live=live)
+        self.assertEqual(mock_req.call_args[1]['json'],
+                         [{'op': 'test', 'path': '/spec/containers/0/name', 'value': 'a'},
+                          {'op': 'replace', 'path': '/spec/containers/0/image', 'value': 'new'}])
+        self.assertEqual(mock_req.call_args[1]['headers'], {'Content-Type': 'application/json-patch+json'})
+
+    def test_modify_live_unchanged(self):
+        client = KubernetesClient(self.config)
+        partial = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}}
+        with patch.object(client.session, 'request') as mock_req:
+            client.modify(partial, live={'metadata': {'name': 'test', 'uid': '1'}})
+        self.assertFalse(mock_req.called)
+
+    def test_apply_error(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(403, {})):
+            with self.assertRaises(KubeRequestError):
+                client.apply({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+
+    def test_bulk_apply(self):
+        client = KubernetesClient(self.config)
+        objs = [{'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test%d' % i}} for i in range(3)]
+        items = [fingerprint.annotate(o, fingerprint.content_hash(o)) for o in objs[:2]]
+        with patch.object(client.session, 'request',
+                          side_effect=[helper.make_response(200, {'items': items, 'metadata': {}}),
+                                       helper.make_response(201, {})]) as mock_req:
+            results = client.bulk('apply', objs, namespace='test')
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['get', 'post'])
+        self.assertTrue(mock_req.call_args_list[0][0][1].startswith(
+            'http://localhost:8080/api/v1/namespaces/test/pods?'))
+        self.assertEqual([r.result for r in results[:2]], items)
+
+    def test_bulk_apply_list_forbidden(self):
+        client = KubernetesClient(self.config)
+        objs = [{'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test%d' % i}} for i in range(2)]
+        live = [fingerprint.annotate(o, fingerprint.content_hash(o)) for o in objs]
+        with patch.object(client.session, 'request',
+                          side_effect=[helper.make_response(403, {})] +
+                          [helper.make_response(200, o) for o in live]) as mock_req:
+            results = client.bulk('apply', objs)
+        self.assertEqual(mock_req.call_count, 3)
+        self.assertEqual([r.result for r in results], live)
+
+    def test_apply_by_file(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
+            resp = client.apply_by_file(os.path.join(FIXTURE_DIR, 'yaml', 'es-rc.yaml'))
+            self.assertEqual(len(resp), 2)
+
+    def test_upsert_create(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(201, {})) as mock_req:
+            client.upsert({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['post'])
+
+    def test_upsert_replace(self):
+        client = KubernetesClient(self.config)
+        exists = helper.make_response(409, {'kind': 'Status', 'reason': 'AlreadyExists', 'code': 409})
+        with patch.object(client.session, 'request',
+                          side_effect=[exists, helper.make_response(200, {'kind': 'Pod'})]) as mock_req:
+            resp = client.upsert({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual(resp, {'kind': 'Pod'})
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['post', 'put'])
+        self.assertNotIn('resourceVersion', mock_req.call_args[1]['json']['metadata'])
+
+    def test_upsert_replace_requires_resource_version(self):
+        client = KubernetesClient(self.config)
+        exists = helper.make_response(409, {'kind': 'Status', 'reason': 'AlreadyExists', 'code': 409})
+        invalid = helper.make_response(422, {'kind': 'Status', 'reason': 'Invalid', 'code': 422})
+        live = helper.make_response(200, {'metadata': {'name': 'test', 'resourceVersion': '5'}})
+        with patch.object(client.session, 'request',
+                          side_effect=[exists, invalid, live, helper.make_response(200, {'kind': 'Pod'})]) as mock_req:
+            resp = client.upsert({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual(resp, {'kind': 'Pod'})
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['post', 'put', 'get', 'put'])
+        self.assertEqual(mock_req.call_args[1]['json']['metadata']['resourceVersion'], '5')
+
+    def test_upsert_other_conflict(self):
+        client = KubernetesClient(self.config)
+        conflict = helper.make_response(409, {'kind': 'Status', 'reason': 'Conflict', 'code': 409})
+        with patch.object(client.session, 'request', return_value=conflict) as mock_req:
+            with self.assertRaises(KubeRequestError) as ctx:
+                client.upsert({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual(ctx.exception.reason, 'Conflict')
+        self.assertEqual(mock_req.call_count, 1)
+
+    @patch('kubeshift.base.time.sleep')
+    def test_upsert_conflict(self, mock_sleep):
+        client = KubernetesClient(self.config)
+        obj = {'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test', 'resourceVersion': '1'}}
+        conflict = {'kind': 'Status', 'reason': 'Conflict', 'code': 409}
+        responses = [helper.make_response(409, {'reason': 'AlreadyExists'}),
+                     helper.make_response(409, conflict),
+                     helper.make_response(200, {'metadata': {'name': 'test', 'resourceVersion': '5'}}),
+                     helper.make_response(409, conflict),
+                     helper.make_response(200, {'metadata': {'name': 'test', 'resourceVersion': '7'}}),
+                     helper.make_response(200, {'kind': 'Pod'})]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            resp = client.upsert(obj)
+        self.assertEqual(resp, {'kind': 'Pod'})
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['post', 'put', 'get', 'put', 'get', 'put'])
+        self.assertEqual(mock_req.call_args[1]['json']['metadata']['resourceVersion'], '7')
+        self.assertEqual(obj['metadata']['resourceVersion'], '1')
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @patch('kubeshift.base.time.sleep')
+    def test_upsert_conflict_exhausted(self, mock_sleep):
+        client = KubernetesClient(self.config)
+        client.conflict_retry = RetryPolicy(max_retries=2, status_forcelist=(409,))
+        exists = helper.make_response(409, {'reason': 'AlreadyExists'})
+        live = helper.make_response(200, {'metadata': {'name': 'test', 'resourceVersion': '7'}})
+        conflict = helper.make_response(409, {'reason': 'Conflict'})
+        with patch.object(client.session, 'request',
+                          side_effect=[exists, conflict, live, conflict, live, conflict, live, conflict]) as mock_req:
+            with self.assertRaises(KubeRequestError) as ctx:
+                client.upsert({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual(ctx.exception.reason, 'Conflict')
+        self.assertEqual(mock_req.call_count, 8)
+        self.assertEqual(client.conflict_retry.retries, 2)
+
+    def test_conflict_retry_per_client(self):
+        policy = RetryPolicy(max_retries=1, status_forcelist=(409,))
+        client = KubernetesClient(self.config, transport=TransportConfig(conflict_retry=policy))
+        self.assertIs(client.conflict_retry, policy)
+
+        first, second = KubernetesClient(self.config), KubernetesClient(self.config)
+        self.assertIsNot(first.conflict_retry, second.conflict_retry)
+        self.assertEqual(first.conflict_retry.status_forcelist, frozenset([409]))
+
+    def test_upsert_error(self):
+        client = KubernetesClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(403, {})) as mock_req:
+            with self.assertRaises(KubeRequestError):
+                client.upsert({'apiVersion': 'v1', 'kind': 'Pod', 'metadata': {'name': 'test'}})
+        self.assertEqual(mock_req.call_count, 1)
+
+    def test_update(self):
+        client = KubernetesClient(self.config)
+        live = {'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': 'cfg', 'resourceVersion': '3'},
+                'data': {'count': '1'}}
+
+        def mutate(obj):
+            obj['data']['count'] = '2'
+
+        with patch.object(client.session, 'request',
+                          side_effect=[helper.make_response(200, live), helper.make_response(200, {})]) as mock_req:
+            client.update({'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': 'cfg'}}, mutate)
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['get', 'put'])
+        sent = mock_req.call_args[1]['json']
+        self.assertEqual(sent['data'], {'count': '2'})
+        self.assertEqual(sent['metadata']['resourceVersion'], '3')
+
+    def test_update_cache_cluster_scoped(self):
+        client = KubernetesClient(self.config)
+        cache = Store()
+        cache.add({'apiVersion': 'v1', 'kind': 'Node', 'metadata': {'name': 'node1', 'resourceVersion': '3'}})
+
+        def mutate(obj):
+            obj['metadata']['labels'] = {'role': 'db'}
+
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.update({'apiVersion': 'v1', 'kind': 'Node', 'metadata': {'name': 'node1'}}, mutate, cache=cache)
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['put'])
+        self.assertEqual(mock_req.call_args[0][1], 'http://localhost:8080/api/v1/nodes/node1')
+        self.assertEqual(mock_req.call_args[1]['json']['metadata']['resourceVersion'], '3')
+
+    @patch('kubeshift.base.time.sleep')
+    def test_update_cache_conflict(self, mock_sleep):
+        client = KubernetesClient(self.config)
+        cached = {'metadata': {'name': 'cfg', 'namespace': 'test', 'resourceVersion': '3'}, 'data': {'count': '1'}}
+        cache = Store()
+        cache.add(cached)
+        live = {'metadata': {'name': 'cfg', 'namespace': 'test', 'resourceVersion': '5'}, 'data': {'count': '4'}}
+
+        def mutate(obj):
+            return dict(obj, data={'count': str(int(obj['data']['count']) + 1)})
+
+        responses = [helper.make_response(409, {'reason': 'Conflict'}),
+                     helper.make_response(200, live),
+                     helper.make_response(200, {})]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            client.update({'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': 'cfg', 'namespace': 'test'}},
+                          mutate, cache=cache)
+        self.assertEqual([c[0][0] for c in mock_req.call_args_list], ['put', 'get', 'put'])
+        first, last = mock_req.call_args_list[0][1]['json'], mock_req.call_args[1]['json']
+        self.assertEqual((first['data'], first['metadata']['resourceVersion']), ({'count': '2'}, '3'))
+        self.assertEqual((last['data'], last['metadata']['resourceVersion']), ({'count': '5'}, '5'))
+        self.assertEqual(first['kind'], 'ConfigMap')
+        self.assertEqual(cached['data'], {'count': '1'})
+
+    def test_update_unchanged(self):
+        client = KubernetesClient(self.config)
+        live = {'metadata': {'name': 'cfg', 'resourceVersion': '3'}}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, live)) as mock_req:
+            resp = client.update({'apiVersion': 'v1', 'kind': 'ConfigMap', 'metadata': {'name': 'cfg'}},
+                                 lambda obj: None)
+        self.assertEqual(resp, live)
+        self.assertEqual(mock_req.call_count, 1)
+
+    def test_bulk_unsupported(self):
+        client = KubernetesClient(self.config)
+        with self.assertRaises(KubeShiftError):
+            client.bulk('scale', [])
+
     def test_replace_by_file_error(self):
         client = KubernetesClient(self.config)
         with self.assertRaises(KubeShiftError):
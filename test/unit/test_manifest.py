@@ -0,0 +1,203 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+
+from mock import patch
+import six
+import yaml
+
+from kubeshift import manifest
+from kubeshift.manifest import ManifestCache
+from kubeshift.exceptions import KubeShiftError
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'fixtures')
+
+
+class TestManifest(unittest.TestCase):
+
+    def test_loader(self):
+        if getattr(yaml, '__with_libyaml__', False):
+            self.assertIs(manifest.SafeLoader, yaml.CSafeLoader)
+        else:
+            self.assertIs(manifest.SafeLoader, yaml.SafeLoader)
+
+    def test_load(self):
+        self.assertEqual(manifest.load('kind: Pod'), {'kind': 'Pod'})
+
+    def test_load_all_stream(self):
+        docs = manifest.load_all(six.StringIO('kind: Pod\n---\nkind: Service\n'))
+        self.assertIsInstance(docs, types.GeneratorType)
+        self.assertEqual(next(docs), {'kind': 'Pod'})
+        self.assertEqual(list(docs), [{'kind': 'Service'}])
+
+    def test_load_all_safe(self):
+        with self.assertRaises(yaml.YAMLError):
+            list(manifest.load_all('!!python/object/apply:os.getcwd []'))
+
+    def test_load_file(self):
+        docs = list(manifest.load_file(os.path.join(FIXTURE_DIR, 'yaml', 'es-rc.yaml')))
+        self.assertEqual(len(docs), 2)
+
+    def test_load_file_json(self):
+        docs = list(manifest.load_file(os.path.join(FIXTURE_DIR, 'json', 'redis-master.json')))
+        self.assertEqual(len(docs), 1)
+        self.assertEqual(docs[0]['kind'], 'ReplicationController')
+
+
+class TestManifestPaths(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        os.makedirs(os.path.join(self.tmpdir, 'app', 'db'))
+        self.write('ns.yaml', 'kind: Namespace\n')
+        self.write('app/web.yml', 'kind: Deployment\n---\nkind: Service\n')
+        self.write('app/db/db.json', '{"kind": "StatefulSet"}')
+        self.write('app/README.md', '# not a manifest')
+
+    def write(self, name, content):
+        with open(os.path.join(self.tmpdir, name), 'w') as fd:
+            fd.write(content)
+        return os.path.join(self.tmpdir, name)
+
+    def path(self, *parts):
+        return os.path.join(self.tmpdir, *parts)
+
+    def test_expand_file(self):
+        self.assertEqual(manifest.expand(self.path('app', 'README.md')), [self.path('app', 'README.md')])
+
+    def test_expand_directory(self):
+        self.assertEqual(manifest.expand(self.tmpdir), [self.path('ns.yaml'),
+                                                        self.path('app', 'web.yml'),
+                                                        self.path('app', 'db', 'db.json')])
+
+    def test_expand_glob(self):
+        self.assertEqual(manifest.expand(self.path('app', '*')), [self.path('app', 'README.md'),
+                                                                  self.path('app', 'db', 'db.json'),
+                                                                  self.path('app', 'web.yml')])
+
+    @unittest.skipIf(sys.version_info < (3, 5), 'recursive glob requires Python 3.5')
+    def test_expand_glob_recursive(self):
+        self.assertEqual(manifest.expand(self.path('**', '*.json')), [self.path('app', 'db', 'db.json')])
+
+    def test_expand_list(self):
+        self.assertEqual(manifest.expand(['-', self.path('ns.yaml')]), ['-', self.path('ns.yaml')])
+
+    def test_expand_not_found(self):
+        for path in (self.path('missing.yaml'), self.path('*.txt')):
+            with self.assertRaises(KubeShiftError):
+                manifest.expand(path)
+
+    @patch('kubeshift.manifest.PARSE_POOL_MIN_BYTES', 0)
+    def test_load_paths(self):
+        docs = manifest.load_paths(self.tmpdir, workers=2)
+        self.assertIsInstance(docs, types.GeneratorType)
+        self.assertEqual([d['kind'] for d in docs], ['Namespace', 'Deployment', 'Service', 'StatefulSet'])
+
+    def test_load_paths_small_in_process(self):
+        with patch('multiprocessing.Pool') as mock_pool:
+            docs = list(manifest.load_paths(self.tmpdir, workers=2))
+            self.assertEqual([d['kind'] for d in docs], ['Namespace', 'Deployment', 'Service', 'StatefulSet'])
+            self.assertEqual(list(manifest.load_paths(self.tmpdir)), docs)
+        self.assertFalse(mock_pool.called)
+
+    def test_load_paths_sequential(self):
+        docs = manifest.load_paths([self.path('app'), self.path('ns.yaml')], workers=1)
+        self.assertEqual([d['kind'] for d in docs], ['Deployment', 'Service', 'StatefulSet', 'Namespace'])
+
+    @patch('kubeshift.manifest.PARSE_POOL_MIN_BYTES', 0)
+    def test_load_paths_parse_error(self):
+        self.write('bad.yaml', 'kind: [Pod\n')
+        with self.assertRaises(yaml.YAMLError):
+            list(manifest.load_paths(self.tmpdir, workers=2))
+
+    def test_load_paths_stdin(self):
+        with patch('sys.stdin', six.StringIO('kind: Pod\n---\nkind: Service\n')):
+            docs = list(manifest.load_paths('-'))
+        self.assertEqual([d['kind'] for d in docs], ['Pod', 'Service'])
+
+
+class TestManifestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        cachedir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cachedir)
+        self.cache = ManifestCache(os.path.join(cachedir, 'cache'))
+        self.filepath = os.path.join(self.tmpdir, 'pod.yaml')
+        self.write('kind: Pod\n---\nkind: Service\n')
+
+    def write(self, content, mtime=None):
+        with open(self.filepath, 'w') as fd:
+            fd.write(content)
+        if mtime is not None:
+            os.utime(self.filepath, (mtime, mtime))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get(self.filepath))
+
+    def test_set_get(self):
+        self.cache.set(self.filepath, [{'kind': 'Pod'}])
+        self.assertEqual(self.cache.get(self.filepath), [{'kind': 'Pod'}])
+
+    def test_get_touched(self):
+        self.cache.set(self.filepath, [{'kind': 'Pod'}])
+        os.utime(self.filepath, (1000, 1000))
+        self.assertEqual(self.cache.get(self.filepath), [{'kind': 'Pod'}])
+
+    def test_get_changed(self):
+        self.cache.set(self.filepath, [{'kind': 'Pod'}])
+        self.write('kind: Job\n---\nkind: Service\n', mtime=1000)
+        self.assertIsNone(self.cache.get(self.filepath))
+
+    def test_set_not_json(self):
+        for docs in ([{'kind': 'Pod', 'created': datetime.date(2017, 1, 1)}], [{1: 'a'}], [{'data': b'\x00'}]):
+            self.cache.set(self.filepath, docs)
+            self.assertIsNone(self.cache.get(self.filepath))
+        self.assertFalse(os.path.exists(self.cache._path(self.filepath)))
+
+    def test_load_paths_not_cached(self):
+        self.write('kind: Pod\nmetadata:\n  created: 2017-01-01\n')
+        docs = list(manifest.load_paths(self.filepath, cache=self.cache))
+        self.assertEqual(docs, [{'kind': 'Pod', 'metadata': {'created': datetime.date(2017, 1, 1)}}])
+        self.assertIsNone(self.cache.get(self.filepath))
+
+    def test_get_corrupted(self):
+        self.cache.set(self.filepath, [{'kind': 'Pod'}])
+        with open(self.cache._path(self.filepath), 'wb') as fd:
+            fd.write(b'garbage')
+        self.assertIsNone(self.cache.get(self.filepath))
+
+    def test_invalidate(self):
+        self.cache.set(self.filepath, [{'kind': 'Pod'}])
+        self.cache.invalidate(self.filepath)
+        self.assertIsNone(self.cache.get(self.filepath))
+
+        self.cache.set(self.filepath, [{'kind': 'Pod'}])
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get(self.filepath))
+
+    def test_load_paths_cached(self):
+        docs = list(manifest.load_paths(self.filepath, cache=self.cache))
+        self.assertEqual(docs, [{'kind': 'Pod'}, {'kind': 'Service'}])
+        self.assertEqual(self.cache.get(self.filepath), docs)
+
+        with patch.object(manifest, 'load_all') as mock_load:
+            self.assertEqual(list(manifest.load_paths(self.filepath, cache=self.cache)), docs)
+            self.assertFalse(mock_load.called)
+
+    @patch('kubeshift.manifest.PARSE_POOL_MIN_BYTES', 0)
+    def test_load_paths_cached_pool(self):
+        other = os.path.join(self.tmpdir, 'other.yaml')
+        with open(other, 'w') as fd:
+            fd.write('kind: Namespace\n')
+        self.cache.set(other, [{'kind': 'Namespace', 'cached': True}])
+
+        docs = list(manifest.load_paths(self.tmpdir, workers=2, cache=self.cache))
+        self.assertEqual(docs, [{'kind': 'Namespace', 'cached': True}, {'kind': 'Pod'}, {'kind': 'Service'}])
+        self.assertEqual(self.cache.get(self.filepath), [{'kind': 'Pod'}, {'kind': 'Service'}])
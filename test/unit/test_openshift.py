@@ -54,6 +54,13 @@ class TestOpenshiftClient(unittest.TestCase):
             except KubeRequestError:
                 self.fail('delete raised KubeRequestError unexpectedly')
 
+    def test_delete_propagation_policy(self):
+        client = OpenshiftClient(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.delete({'apiVersion': 'v1', 'kind': 'DeploymentConfig', 'metadata': {'name': 'test'}},
+                          propagation_policy='Orphan')
+        self.assertEqual(mock_req.call_args[1]['json']['propagationPolicy'], 'Orphan')
+
     def test_delete_template(self):
         client = OpenshiftClient(self.config)
         template = {'apiVersion': 'v1', 'kind': 'Template', 'metadata': {'name': 'test'}, 'objects': [
@@ -81,6 +88,15 @@ class TestOpenshiftClient(unittest.TestCase):
             except KubeRequestError:
                 self.fail('scale raised KubeRequestError unexpectedly')
 
+    def test_lazy_discovers_oapi(self):
+        client = OpenshiftClient(self.config, lazy=True)
+        self.assertEqual(client.api_resources, {})
+        url = client._generate_url('v1', 'BuildConfig', 'default')
+        self.assertEqual(url, 'http://localhost:8080/oapi/v1/namespaces/default/buildconfigs')
+        url = client._generate_url('v1', 'Pod', 'default')
+        self.assertEqual(url, 'http://localhost:8080/api/v1/namespaces/default/pods')
+        self.assertEqual(self.mock_resources.call_count, 2)
+
     def test_check_kube_methods_exist(self):
         client = OpenshiftClient(self.config)
 
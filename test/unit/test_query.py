@@ -1,10 +1,14 @@
+import itertools
 import unittest
 
 from mock import patch
+import requests
 
 from kubeshift.base import KubeBase
 from kubeshift.config import Config
-from kubeshift.queries.base import Query
+from kubeshift.constants import ACCEPT_PARTIAL_METADATA, ACCEPT_TABLE
+from kubeshift.exceptions import KubeConnectionError, KubeRequestError
+from kubeshift.queries.base import FALLBACK_COLUMNS, LazyQuery, Query, Table
 
 import helper
 
@@ -80,6 +84,56 @@ class TestQuery(unittest.TestCase):
             data = client.nodes().metadata()
             self.assertEqual(data, [])
 
+    def test_metadata_partial(self):
+        client = KubeBase(self.config)
+        partial = {'kind': 'PartialObjectMetadataList', 'items': [{'metadata': {'name': 'a'}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, partial)) as mock_req:
+            data = client.pods().metadata()
+        self.assertEqual(data, [{'name': 'a'}])
+        self.assertEqual(mock_req.call_args[1]['headers'], {'Accept': ACCEPT_PARTIAL_METADATA})
+
+    def test_metadata_full_objects(self):
+        client = KubeBase(self.config)
+        pods = {'kind': 'PodList', 'items': [{'metadata': {'name': 'a'}, 'spec': {}, 'status': {}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, pods)):
+            data = client.pods().metadata()
+        self.assertEqual(data, [{'name': 'a'}])
+
+    def test_table(self):
+        client = KubeBase(self.config)
+        columns = [{'name': 'Name', 'type': 'string'}, {'name': 'Ready', 'type': 'string'}]
+        pages = [
+            {'kind': 'Table', 'metadata': {'continue': 'next'}, 'columnDefinitions': columns,
+             'rows': [{'cells': ['a', '1/1']}]},
+            {'kind': 'Table', 'metadata': {}, 'columnDefinitions': None, 'rows': [{'cells': ['b', '0/1']}]},
+        ]
+        with patch.object(client.session, 'request',
+                          side_effect=[helper.make_response(200, p) for p in pages]) as mock_req:
+            table = client.pods().table(page_size=1)
+        self.assertIsInstance(table, Table)
+        self.assertEqual(table.columns, columns)
+        self.assertEqual([r['cells'] for r in table.rows], [['a', '1/1'], ['b', '0/1']])
+        self.assertEqual(mock_req.call_count, 2)
+        self.assertEqual(mock_req.call_args[1]['headers'], {'Accept': ACCEPT_TABLE})
+        self.assertIn('continue=next', mock_req.call_args[0][1])
+
+    def test_iter_table_unsupported(self):
+        client = KubeBase(self.config)
+        pods = {'kind': 'PodList', 'metadata': {},
+                'items': [{'metadata': {'name': 'a', 'creationTimestamp': '2016-01-01T00:00:00Z'}, 'spec': {}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, pods)):
+            tables = list(client.pods().iter_table())
+        self.assertEqual(len(tables), 1)
+        self.assertEqual(tables[0].columns, FALLBACK_COLUMNS)
+        self.assertEqual(tables[0].rows, [{'cells': ['a', '2016-01-01T00:00:00Z'],
+                                           'object': {'metadata': pods['items'][0]['metadata']}}])
+
+    def test_table_invalid_selector(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request') as mock_req:
+            self.assertEqual(client.pods().table(selectors=[{'value': 'a'}]), Table([], []))
+        self.assertFalse(mock_req.called)
+
     def test_filters_no_input(self):
         client = KubeBase(self.config)
         with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
@@ -92,6 +146,119 @@ class TestQuery(unittest.TestCase):
             data = client.nodes().filter(status='Running')
             self.assertEqual(data, [])
 
+    def test_filters_status_field_selector(self):
+        client = KubeBase(self.config)
+        pods = {'items': [{'metadata': {'name': 'a'}, 'status': {'phase': 'Running'}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, pods)) as mock_req:
+            data = client.pods('test').filter(status='Running', fields={'spec.nodeName': 'node1'})
+        self.assertEqual(data, pods['items'])
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertEqual(mock_req.call_args[0][1],
+                         'http://localhost:8080/api/v1/namespaces/test/pods'
+                         '?fieldSelector=spec.nodeName%3Dnode1%2Cstatus.phase%3DRunning')
+
+    def test_filters_status_unsupported_field(self):
+        client = KubeBase(self.config)
+        nodes = {'items': [{'metadata': {'name': 'a'}, 'status': {'phase': 'Running'}},
+                           {'metadata': {'name': 'b'}, 'status': {'phase': 'Pending'}}]}
+        responses = [helper.make_response(400, {'kind': 'Status', 'reason': 'BadRequest'}),
+                     helper.make_response(200, nodes)]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            data = client.nodes().filter(status='Running')
+        self.assertEqual(data, nodes['items'][:1])
+        self.assertEqual(mock_req.call_args[0][1], 'http://localhost:8080/api/v1/nodes')
+
+    def test_filters_fields(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            self.assertEqual(client.pods().filter(fields='metadata.name=web'), [])
+            self.assertEqual(client.pods().filter(fields=[{'key': 'metadata.name'}]), [])
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertEqual(mock_req.call_args[0][1],
+                         'http://localhost:8080/api/v1/namespaces/default/pods?fieldSelector=metadata.name%3Dweb')
+
+    def test_all_fields(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.pods().all(fields={'spec.nodeName': 'node1'})
+            list(client.pods().iter_items(page_size=10, fields={'spec.nodeName': 'node1'}))
+        self.assertEqual([c[0][1] for c in mock_req.call_args_list], [
+            'http://localhost:8080/api/v1/namespaces/default/pods?fieldSelector=spec.nodeName%3Dnode1',
+            'http://localhost:8080/api/v1/namespaces/default/pods?fieldSelector=spec.nodeName%3Dnode1&limit=10',
+        ])
+
+    def test_lazy_single_request(self):
+        client = KubeBase(self.config)
+        pods = {'metadata': {'resourceVersion': '10'},
+                'items': [{'metadata': {'name': 'a'}, 'spec': {}, 'status': {'phase': 'Running'}},
+                          {'metadata': {'name': 'b'}, 'spec': {}, 'status': {'phase': 'Pending'}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, pods)) as mock_req:
+            query = client.pods('test').where(labels=[{'key': 'app', 'value': 'web'}],
+                                              fields={'spec.nodeName': 'node1'}).limit(500).at('5')
+            self.assertIsInstance(query, LazyQuery)
+            self.assertFalse(mock_req.called)
+
+            self.assertEqual(len(query), 2)
+            self.assertEqual([p['metadata']['name'] for p in query], ['a', 'b'])
+            self.assertEqual(query.metadata(), [{'name': 'a'}, {'name': 'b'}])
+            self.assertEqual(query.filter('Running'), pods['items'][:1])
+            self.assertEqual(query.filter(), [])
+            self.assertEqual(list(query.only('metadata', 'status')),
+                             [{'metadata': {'name': 'a'}, 'status': {'phase': 'Running'}},
+                              {'metadata': {'name': 'b'}, 'status': {'phase': 'Pending'}}])
+
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertEqual(mock_req.call_args[0][1],
+                         'http://localhost:8080/api/v1/namespaces/test/pods'
+                         '?fieldSelector=spec.nodeName%3Dnode1&labelSelector=app+in+%28web%29'
+                         '&limit=500&resourceVersion=5')
+
+    def test_lazy_where_combines(self):
+        client = KubeBase(self.config)
+        query = client.pods().where(labels=[{'key': 'app'}], fields='metadata.name=a')
+        query = query.where(labels=[{'key': 'tier', 'op': '!='}], fields={'spec.nodeName': 'node1'}).only('metadata')
+        self.assertEqual(query.params, {'labelSelector': 'app,!tier',
+                                        'fieldSelector': 'metadata.name=a,spec.nodeName=node1'})
+        self.assertEqual(query.keys, ('metadata',))
+
+    def test_lazy_only_metadata(self):
+        client = KubeBase(self.config)
+        partial = {'kind': 'PartialObjectMetadataList', 'items': [{'metadata': {'name': 'a'}}]}
+        pods = {'kind': 'PodList', 'items': [{'metadata': {'name': 'a'}, 'spec': {}}]}
+        responses = [helper.make_response(200, partial), helper.make_response(200, pods)]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            query = client.pods().limit(10).only('metadata')
+            self.assertTrue(query.metadata_only)
+            self.assertEqual(list(query), [{'metadata': {'name': 'a'}}])
+            self.assertEqual(query.metadata(), [{'name': 'a'}])
+            self.assertEqual(list(query.only('metadata')), [{'metadata': {'name': 'a'}}])
+            self.assertEqual(mock_req.call_count, 1)
+            self.assertEqual(mock_req.call_args[1]['headers'], {'Accept': ACCEPT_PARTIAL_METADATA})
+
+            self.assertEqual(query.only().items(), pods['items'])
+        self.assertEqual(mock_req.call_count, 2)
+        self.assertIsNone(mock_req.call_args[1]['headers'])
+
+    def test_lazy_only_metadata_filter(self):
+        client = KubeBase(self.config)
+        pods = {'kind': 'PodList', 'items': [{'metadata': {'name': 'a'}, 'status': {'phase': 'Running'}},
+                                             {'metadata': {'name': 'b'}, 'status': {'phase': 'Pending'}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, pods)) as mock_req:
+            query = client.pods().only('metadata')
+            self.assertEqual(query.filter('Running'), [{'metadata': {'name': 'a'}}])
+            self.assertEqual(query.filter('Pending'), [{'metadata': {'name': 'b'}}])
+        self.assertEqual(mock_req.call_count, 1)
+        self.assertIsNone(mock_req.call_args[1]['headers'])
+
+    def test_lazy_invalid_selector(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request') as mock_req:
+            query = client.pods().where(labels=[{'value': 'web'}]).limit(10)
+            self.assertIsNone(query.url)
+            self.assertEqual(query.items(), [])
+            self.assertEqual(client.pods().where(fields=[{'key': 'a'}]).items(), [])
+        self.assertFalse(mock_req.called)
+
     def test_by_selector_empty(self):
         client = KubeBase(self.config)
         with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
@@ -104,6 +271,31 @@ class TestQuery(unittest.TestCase):
             data = client.nodes().by_selector([{'key': 'name'}])
             self.assertEqual(data, [])
 
+    def test_delete_all(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {'items': []})) as mock_req:
+            data = client.pods('test').delete_all([{'key': 'app', 'value': 'web'}], propagation_policy='Foreground')
+        self.assertEqual(data, {'items': []})
+        self.assertEqual(mock_req.call_count, 1)
+        method, url = mock_req.call_args[0]
+        self.assertEqual(method, 'delete')
+        self.assertEqual(url, 'http://localhost:8080/api/v1/namespaces/test/pods?labelSelector=app+in+%28web%29')
+        self.assertEqual(mock_req.call_args[1]['json'],
+                         {'kind': 'DeleteOptions', 'apiVersion': 'v1', 'propagationPolicy': 'Foreground'})
+
+    def test_delete_all_collection(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            client.pods('test').delete_all()
+        self.assertEqual(mock_req.call_args[0][1], 'http://localhost:8080/api/v1/namespaces/test/pods')
+        self.assertIsNone(mock_req.call_args[1]['json'])
+
+    def test_delete_all_invalid_selector(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request') as mock_req:
+            self.assertEqual(client.pods().delete_all([{'value': 'web'}]), {})
+        self.assertFalse(mock_req.called)
+
     def test_by_name_no_inputs(self):
         client = KubeBase(self.config)
         with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
@@ -115,3 +307,100 @@ class TestQuery(unittest.TestCase):
         with patch.object(client.session, 'request', return_value=helper.make_response(200, {})):
             data = client.nodes().by_name('test')
             self.assertEqual(data, {})
+
+    def test_iter_items_single_page(self):
+        client = KubeBase(self.config)
+        page = {'metadata': {}, 'items': [{'metadata': {'name': 'a'}}]}
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, page)) as mock_req:
+            data = list(client.pods().iter_items(page_size=2))
+            self.assertEqual(data, [{'metadata': {'name': 'a'}}])
+            self.assertEqual(mock_req.call_count, 1)
+            self.assertIn('limit=2', mock_req.call_args[0][1])
+
+    def test_iter_items_continue(self):
+        client = KubeBase(self.config)
+        pages = [
+            helper.make_response(200, {'metadata': {'continue': 'abc'}, 'items': [{'metadata': {'name': 'a'}}]}),
+            helper.make_response(200, {'metadata': {}, 'items': [{'metadata': {'name': 'b'}}]}),
+        ]
+        with patch.object(client.session, 'request', side_effect=pages) as mock_req:
+            data = [i['metadata']['name'] for i in client.pods().iter_items(page_size=1)]
+            self.assertEqual(data, ['a', 'b'])
+            self.assertEqual(mock_req.call_count, 2)
+            self.assertIn('continue=abc', mock_req.call_args[0][1])
+
+    def test_items_paginated(self):
+        client = KubeBase(self.config)
+        pages = [
+            helper.make_response(200, {'metadata': {'continue': 'abc'}, 'items': [{'metadata': {'name': 'a'}}]}),
+            helper.make_response(200, {'metadata': {}, 'items': [{'metadata': {'name': 'b'}}]}),
+        ]
+        with patch.object(client.session, 'request', side_effect=pages):
+            data = client.pods().metadata(page_size=1)
+            self.assertEqual(data, [{'name': 'a'}, {'name': 'b'}])
+
+    def test_by_selector_paginated(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request', return_value=helper.make_response(200, {})) as mock_req:
+            data = client.pods().by_selector([{'key': 'name', 'value': 'test'}], page_size=10)
+            self.assertEqual(data, [])
+            url = mock_req.call_args[0][1]
+            self.assertIn('labelSelector=name+in+%28test%29', url)
+            self.assertIn('limit=10', url)
+
+    def _event(self, etype, name, rv):
+        return {'type': etype, 'object': {'metadata': {'name': name, 'resourceVersion': rv}}}
+
+    def test_watch_events(self):
+        client = KubeBase(self.config)
+        events = [self._event('ADDED', 'a', '1'), self._event('MODIFIED', 'a', '2'), self._event('DELETED', 'a', '3')]
+        with patch.object(client.session, 'request', return_value=helper.make_stream_response(200, events)) as mock_req:
+            data = list(itertools.islice(client.pods().watch(resource_version='0'), 3))
+            self.assertEqual([e.type for e in data], ['ADDED', 'MODIFIED', 'DELETED'])
+            self.assertEqual(data[0].object['metadata']['name'], 'a')
+            url = mock_req.call_args[0][1]
+            self.assertIn('watch=true', url)
+            self.assertIn('resourceVersion=0', url)
+
+    def test_watch_resume(self):
+        client = KubeBase(self.config)
+        responses = [
+            helper.make_stream_response(200, [self._event('ADDED', 'a', '5')]),
+            requests.exceptions.ConnectionError,
+            helper.make_stream_response(200, [self._event('MODIFIED', 'a', '6')]),
+        ]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            data = list(itertools.islice(client.pods().watch(), 2))
+            self.assertEqual([e.type for e in data], ['ADDED', 'MODIFIED'])
+            self.assertIn('resourceVersion=5', mock_req.call_args[0][1])
+
+    def test_watch_connection_failure(self):
+        client = KubeBase(self.config)
+        with patch.object(client.session, 'request', side_effect=requests.exceptions.ConnectionError):
+            with self.assertRaises(KubeConnectionError):
+                list(client.pods().watch())
+
+    def test_watch_gone_relists(self):
+        client = KubeBase(self.config)
+        responses = [
+            helper.make_stream_response(410, []),
+            helper.make_response(200, {'metadata': {'resourceVersion': '10'}, 'items': [{'metadata': {'name': 'b'}}]}),
+            helper.make_stream_response(200, [self._event('DELETED', 'b', '11')]),
+        ]
+        with patch.object(client.session, 'request', side_effect=responses) as mock_req:
+            data = list(itertools.islice(client.pods().watch(resource_version='1'), 2))
+            self.assertEqual([e.type for e in data], ['ADDED', 'DELETED'])
+            self.assertIn('resourceVersion=10', mock_req.call_args[0][1])
+
+    def test_watch_gone_event_twice(self):
+        client = KubeBase(self.config)
+        gone = {'type': 'ERROR', 'object': {'kind': 'Status', 'code': 410, 'message': 'too old'}}
+        responses = [
+            helper.make_stream_response(200, [gone]),
+            helper.make_response(200, {'metadata': {'resourceVersion': '10'}, 'items': []}),
+            helper.make_stream_response(200, [gone]),
+        ]
+        with patch.object(client.session, 'request', side_effect=responses):
+            with self.assertRaises(KubeRequestError) as ctx:
+                list(client.pods().watch(resource_version='1'))
+            self.assertEqual(ctx.exception.status_code, 410)
@@ -1,10 +1,18 @@
 import unittest
 
+from kubeshift.exceptions import KubeShiftError
 from kubeshift.queries import utils
 
 
 class TestQueryUtils(unittest.TestCase):
 
+    def test_delete_options(self):
+        self.assertIsNone(utils.delete_options())
+        self.assertEqual(utils.delete_options('Orphan'),
+                         {'kind': 'DeleteOptions', 'apiVersion': 'v1', 'propagationPolicy': 'Orphan'})
+        with self.assertRaises(KubeShiftError):
+            utils.delete_options('Cascade')
+
     def test_invalid_selector_inputs(self):
         self.assertIsNone(utils.selectors_to_qs(None))
         self.assertIsNone(utils.selectors_to_qs({}))
@@ -121,3 +129,40 @@ class TestQueryUtils(unittest.TestCase):
                                    {'key': 'name', 'op': '!=', 'value': 'testapp'}]),
             '?labelSelector=tier+in+%28proxy%2Cweb%29%2Cname+notin+%28testapp%29'
         )
+
+    def test_add_params(self):
+        self.assertEqual(utils.add_params('http://x/pods', None), 'http://x/pods')
+        self.assertEqual(utils.add_params('http://x/pods', {'limit': None}), 'http://x/pods')
+        self.assertEqual(utils.add_params('http://x/pods', {'limit': 5, 'continue': 'a'}),
+                         'http://x/pods?continue=a&limit=5')
+        self.assertEqual(utils.add_params('http://x/pods?watch=true', {'limit': 5}),
+                         'http://x/pods?watch=true&limit=5')
+
+    def test_match_selectors(self):
+        labels = {'app': 'web', 'tier': 'front'}
+        self.assertFalse(utils.match_selectors(labels, None))
+        self.assertFalse(utils.match_selectors(labels, [{}]))
+        self.assertFalse(utils.match_selectors(labels, [{'key': 'app', 'op': 'x'}]))
+        self.assertTrue(utils.match_selectors(labels, [{'key': 'app'}]))
+        self.assertTrue(utils.match_selectors(labels, [{'key': 'app', 'value': 'web'}]))
+        self.assertTrue(utils.match_selectors(labels, [{'key': 'app', 'value': ['db', 'web'], 'op': 'in'}]))
+        self.assertFalse(utils.match_selectors(labels, [{'key': 'app', 'value': 'db'}]))
+        self.assertTrue(utils.match_selectors(labels, [{'key': 'env', 'op': '!='}]))
+        self.assertFalse(utils.match_selectors(labels, [{'key': 'app', 'op': '!='}]))
+        self.assertTrue(utils.match_selectors(labels, [{'key': 'app', 'value': 'db', 'op': 'notin'}]))
+        self.assertFalse(utils.match_selectors(labels, [{'key': 'app', 'value': 'web'}, {'key': 'tier', 'value': 'back'}]))
+        self.assertFalse(utils.match_selectors(None, [{'key': 'app'}]))
+
+    def test_fields_to_str(self):
+        self.assertIsNone(utils.fields_to_str(None))
+        self.assertIsNone(utils.fields_to_str(''))
+        self.assertIsNone(utils.fields_to_str({}))
+        self.assertIsNone(utils.fields_to_str([{'value': 'a'}]))
+        self.assertIsNone(utils.fields_to_str([{'key': 'metadata.name'}]))
+        self.assertIsNone(utils.fields_to_str([{'key': 'metadata.name', 'value': 'a', 'op': 'in'}]))
+        self.assertEqual(utils.fields_to_str('spec.nodeName=node1'), 'spec.nodeName=node1')
+        self.assertEqual(utils.fields_to_str({'status.phase': 'Running', 'spec.nodeName': 'node1'}),
+                         'spec.nodeName=node1,status.phase=Running')
+        self.assertEqual(utils.fields_to_str([{'key': 'metadata.name', 'value': 'a', 'op': '!='},
+                                              {'key': 'status.phase', 'value': 'Running', 'op': '=='}]),
+                         'metadata.name!=a,status.phase==Running')
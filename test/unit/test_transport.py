@@ -0,0 +1,123 @@
+import unittest
+
+from mock import patch
+import requests
+
+from kubeshift.transport import RateLimiter, RetryPolicy, TokenBucket, TransportConfig, _parse_retry_after
+
+
+class TestTransportConfig(unittest.TestCase):
+
+    def test_timeout(self):
+        self.assertIsNone(TransportConfig().timeout)
+        self.assertEqual(TransportConfig(connect_timeout=3).timeout, (3, None))
+        self.assertEqual(TransportConfig(connect_timeout=3, read_timeout=30).timeout, (3, 30))
+
+    def test_apply(self):
+        session = requests.Session()
+        TransportConfig(pool_connections=4, pool_maxsize=40, pool_block=True).apply(session)
+        for prefix in ['http://', 'https://']:
+            adapter = session.get_adapter(prefix + 'localhost')
+            self.assertEqual(adapter._pool_connections, 4)
+            self.assertEqual(adapter._pool_maxsize, 40)
+            self.assertTrue(adapter._pool_block)
+        self.assertIs(session.get_adapter('http://localhost'), session.get_adapter('https://localhost'))
+        self.assertNotEqual(session.headers.get('Connection'), 'close')
+
+    def test_no_keep_alive(self):
+        session = requests.Session()
+        TransportConfig(keep_alive=False).apply(session)
+        self.assertEqual(session.headers['Connection'], 'close')
+
+    def test_tcp_keepalive(self):
+        session = requests.Session()
+        TransportConfig(tcp_keepalive=True).apply(session)
+        adapter = session.get_adapter('https://localhost')
+        self.assertIn('socket_options', adapter.poolmanager.connection_pool_kw)
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_is_retryable(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.is_retryable('get', 0))
+        self.assertTrue(policy.is_retryable('GET', 1, 503))
+        self.assertFalse(policy.is_retryable('get', 2, 503))
+        self.assertFalse(policy.is_retryable('get', 0, 404))
+        self.assertFalse(policy.is_retryable('post', 0, 503))
+        self.assertFalse(policy.is_retryable('patch', 0))
+        self.assertTrue(RetryPolicy(retry_post=True).is_retryable('post', 0, 429))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+        for attempt in range(6):
+            delay = policy.backoff(attempt)
+            self.assertTrue(0 <= delay <= min(5, 2 ** attempt))
+        self.assertEqual(policy.backoff(0, 429, '3'), 3)
+        self.assertEqual(policy.backoff(0, 503, '120'), 5)
+        self.assertTrue(policy.backoff(0, 500, '3') <= 1)
+
+    def test_parse_retry_after(self):
+        self.assertIsNone(_parse_retry_after(None))
+        self.assertIsNone(_parse_retry_after('soon'))
+        self.assertEqual(_parse_retry_after('2'), 2)
+        self.assertEqual(_parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+
+    def test_increment(self):
+        policy = RetryPolicy()
+        policy.increment(503)
+        policy.increment(503)
+        policy.increment('connection')
+        self.assertEqual(policy.retries, 3)
+        self.assertEqual(policy.counters, {503: 2, 'connection': 1})
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patched_clock = patch('kubeshift.transport._clock', self.clock)
+        self.addCleanup(patched_clock.stop)
+        patched_clock.start()
+
+        patched_sleep = patch('kubeshift.transport.time.sleep')
+        self.addCleanup(patched_sleep.stop)
+        self.mock_sleep = patched_sleep.start()
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(qps=2, burst=3)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+        self.clock.now += 10
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_acquire_sleeps(self):
+        bucket = TokenBucket(qps=4, burst=1)
+        self.assertEqual(bucket.acquire(), 0)
+        self.assertFalse(self.mock_sleep.called)
+        self.assertEqual(bucket.acquire(), 0.25)
+        self.mock_sleep.assert_called_once_with(0.25)
+
+    def test_shared_bucket(self):
+        limiter = RateLimiter(qps=1, burst=1)
+        self.assertIs(limiter.read, limiter.write)
+        self.assertEqual(limiter.acquire('get'), 0)
+        self.assertEqual(limiter.acquire('post'), 1)
+
+    def test_split_buckets(self):
+        limiter = RateLimiter(qps=1, burst=1, write_qps=1, write_burst=1)
+        self.assertIsNot(limiter.read, limiter.write)
+        self.assertEqual(limiter.acquire('get'), 0)
+        self.assertEqual(limiter.acquire('PUT'), 0)
+        self.assertEqual(limiter.acquire('delete'), 1)